@@ -4,19 +4,58 @@
 负责使用无头浏览器访问虎扑网站，获取比赛信息内容。
 """
 
+import threading
 import time
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Optional
 from datetime import datetime
+from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 
+import orjson
+import requests
 from loguru import logger
-from playwright.sync_api import Browser, BrowserContext, Page, sync_playwright
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from playwright.sync_api import Browser, TimeoutError as PlaywrightTimeoutError, sync_playwright
 from src.schedule.models import GameInfo
+from src.utils.browser import CHROMIUM_LAUNCH_ARGS
 
 # 设置环境变量，禁用 Playwright 的 asyncio 事件循环检查
 os.environ["PLAYWRIGHT_SKIP_BROWSER_DOWNLOAD"] = "0"
 
+# 评分 API URL 模板的缓存文件，首次捕获成功后写入，后续直接拼接 URL 请求
+API_TEMPLATE_PATH = Path("materials/api_url_template.json")
+# URL 模板中比赛 ID 的占位符
+MATCH_ID_PLACEHOLDER = "{match_id}"
+
+
+def _create_session() -> requests.Session:
+    """
+    创建带连接池和重试策略的 HTTP 会话，模块内所有请求共用
+
+    Returns:
+        requests.Session: HTTP 会话
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=32,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = (
+        "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) "
+        "AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1"
+    )
+    return session
+
+
+# 复用 TCP/TLS 连接，避免每次请求重新握手
+_SESSION = _create_session()
+
 
 class ContentAcquirer:
     """内容采集器 - 负责访问网页并采集内容"""
@@ -29,287 +68,481 @@ class ContentAcquirer:
             headless: 是否使用无头模式，默认为True
         """
         self.headless = headless
-        self.playwright = None
-        self.browser: Optional[Browser] = None
-        self.context: Optional[BrowserContext] = None
+        # Playwright 同步 API 绑定创建它的线程，因此按线程保存浏览器实例
+        self._local = threading.local()
         logger.info(f"内容采集器初始化完成 (headless={headless})")
 
-    def acquire_content(
-        self,
-        game_info: GameInfo,
-    ) -> dict:
+    def _get_browser(self) -> Browser:
+        """
+        获取当前线程复用的浏览器实例，首次调用时启动
 
-        print(game_info, "game_info.game_id")
-
-        with sync_playwright() as playwright:
-
-            # 1. 启动浏览器打开页面
-            browser = playwright.chromium.launch(headless=self.headless)
-
-            maker_sort = 0
-
-            # 确保视频保存目录存在
-            video_dir = Path("materials/videos")
-            video_dir.mkdir(parents=True, exist_ok=True)
-
-            # 生成视频文件名（使用比赛ID和时间戳）
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            video_filename = f"{game_info.match_id}_{timestamp}.webm"
-            final_video_path: Optional[Path] = None
-
-            # 配置为 iPhone SE 移动端设备
-            # iPhone SE 规格: 375x667 分辨率, 2x 设备像素比
-            context = browser.new_context(
-                viewport={
-                    "width": 430,
-                    "height": 932,
-                },
-                user_agent=(
-                    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) "
-                    "AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1"
-                ),
-                device_scale_factor=3,  # Retina 屏幕
-                is_mobile=True,
-                has_touch=True,
-                # 开启视频录制
-                record_video_dir=str(video_dir),
-                # 录制分辨率（约等于 viewport * device_scale_factor）
-                record_video_size={"width": 860, "height": 1864},
+        Returns:
+            Browser: 浏览器实例
+        """
+        browser = getattr(self._local, "browser", None)
+        if browser is None or not browser.is_connected():
+            if getattr(self._local, "playwright", None) is None:
+                self._local.playwright = sync_playwright().start()
+            browser = self._local.playwright.chromium.launch(
+                headless=self.headless, args=CHROMIUM_LAUNCH_ARGS
             )
+            self._local.browser = browser
+            logger.info("浏览器实例已启动")
+        return browser
+
+    def close(self):
+        """关闭当前线程的浏览器实例并停止 Playwright"""
+        browser = getattr(self._local, "browser", None)
+        if browser is not None:
+            try:
+                browser.close()
+            except Exception as e:
+                logger.warning(f"关闭浏览器实例时出错: {e}")
+            self._local.browser = None
 
-            page = context.new_page()
+        playwright = getattr(self._local, "playwright", None)
+        if playwright is not None:
+            try:
+                playwright.stop()
+            except Exception as e:
+                logger.warning(f"停止 Playwright 时出错: {e}")
+            self._local.playwright = None
 
-            # 用于存储捕获的 API URL
-            captured_api_urls = []
+    def __enter__(self):
+        return self
 
-            # 监听网络请求，只捕获特定 API 的 URL
-            def handle_request(request):
-                # 只处理包含 getCurAndSubNodeByBizKey 的请求
-                if "getCurAndSubNodeByBizKey" in request.url:
-                    logger.info(f"捕获到目标 API URL: {request.url}")
-                    captured_api_urls.append(request.url)
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
-            page.on("request", handle_request)
+    def acquire_content(
+        self,
+        game_info: GameInfo,
+    ) -> dict:
 
-            page.goto("https://m.hupu.com/nba/schedule")
+        logger.info(f"开始获取比赛内容，match_id: {game_info.match_id}")
+
+        # 已缓存 URL 模板时直接请求评分 API，无需等待页面发出请求再拦截；
+        # 浏览器仍需打开页面，因为视频录制依赖它。
+        # 该请求与浏览器启动、上下文创建互不依赖，放到后台线程中重叠执行
+        prefetch_executor = ThreadPoolExecutor(max_workers=1)
+        template_future = prefetch_executor.submit(self._fetch_with_template, game_info.match_id)
+        prefetch_executor.shutdown(wait=False)
+
+        # 1. 复用浏览器实例打开页面
+        browser = self._get_browser()
+
+        maker_sort = 0
+
+        # 确保视频保存目录存在
+        video_dir = Path("materials/videos")
+        video_dir.mkdir(parents=True, exist_ok=True)
+
+        # 生成视频文件名（使用比赛ID和时间戳）
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        video_filename = f"{game_info.match_id}_{timestamp}.webm"
+        # 每个任务录制到独立的子目录，关闭上下文后目录中只有这一个视频文件
+        record_dir = video_dir / f"rec_{game_info.match_id}_{timestamp}"
+        record_dir.mkdir(parents=True, exist_ok=True)
+        final_video_path: Optional[Path] = None
+
+        # 配置为 iPhone SE 移动端设备
+        # iPhone SE 规格: 375x667 分辨率, 2x 设备像素比
+        context = browser.new_context(
+            viewport={
+                "width": 430,
+                "height": 932,
+            },
+            user_agent=(
+                "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) "
+                "AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1"
+            ),
+            device_scale_factor=3,  # Retina 屏幕
+            is_mobile=True,
+            has_touch=True,
+            # 开启视频录制
+            record_video_dir=str(record_dir),
+            # 录制分辨率取 viewport 的 1.5 倍：宽度仍满足B站 640px 的下限，
+            # 每帧像素量约为原 860x1864 的一半，浏览器编码和后续转码都更省时
+            record_video_size={"width": 645, "height": 1398},
+        )
+
+        page = context.new_page()
+
+        modified_api_data = template_future.result()
+
+        # 用于存储捕获的 API URL
+        captured_api_urls = []
+
+        # 通过 URL glob 在浏览器侧过滤，只有目标 API 的请求才会回调到 Python
+        def handle_route(route, request):
+            logger.info(f"捕获到目标 API URL: {request.url}")
+            captured_api_urls.append(request.url)
+            route.continue_()
+
+        if not modified_api_data:
+            page.route("**/*getCurAndSubNodeByBizKey*", handle_route)
+
+        # 赛程页的埋点请求会持续发出，不等待 networkidle，DOM 就绪后直接等待比赛元素
+        page.goto("https://m.hupu.com/nba/schedule", wait_until="domcontentloaded", timeout=30000)
+
+        # 2. 点击比赛id来跳转新页面
+        # HTML 结构：<div data-match="1405864802949005312" class="match-item">...</div>
+        logger.info(f"开始查找比赛 ID: {game_info.match_id}")
+
+        # 根据 data-match 属性定位比赛元素
+        match_selector = f'div.match-item[data-match="{game_info.match_id}"]'
+        match_element = page.locator(match_selector)
+
+        # 等待比赛元素渲染完成（元素出现即返回，不再固定等待）
+        try:
+            page.wait_for_selector(match_selector, state="visible", timeout=15000)
+        except PlaywrightTimeoutError:
+            logger.warning(f"等待比赛元素超时: {match_selector}")
+
+        # 检查元素是否存在
+        count = match_element.count()
+        logger.info(f"找到匹配的比赛元素数量: {count}")
+
+        if count > 0:
+            # 滚动到元素位置，确保可见
+            match_element.first.scroll_into_view_if_needed()
+
+            logger.info(f"正在点击比赛: {game_info.away_team_name} vs {game_info.home_team_name}")
+
+            # 点击比赛元素，等待导航到新页面
+            with page.expect_navigation(timeout=30000):
+                match_element.first.click()
+
+            # 等待新页面加载完成
             page.wait_for_load_state("networkidle")
+            logger.info(f"已跳转到比赛详情页: {page.url}")
+
+            # 等待评论内容渲染完成
+            try:
+                page.wait_for_selector("p.score-group-comment", timeout=10000)
+            except PlaywrightTimeoutError:
+                logger.warning("等待评论内容超时，继续录制")
+
+        if modified_api_data:
+            logger.info("已通过缓存的 URL 模板获取 API 数据")
+        elif captured_api_urls:
+            logger.info(f"共捕获到 {len(captured_api_urls)} 个 API URL")
+            # 捕获已完成，撤销拦截，后续滚动加载的分页请求不再回调到 Python
+            page.unroute("**/*getCurAndSubNodeByBizKey*", handle_route)
+
+            # 先完成纯 CPU 的 URL 改写，再并发请求，总耗时由 Σ(rtt) 降为 max(rtt)
+            url_pairs = [
+                (url, self._build_api_url(self._parse_api_url(url), game_info.match_id))
+                for url in captured_api_urls
+            ]
+
+            # 同一主机的请求共享模块级连接池，复用 TLS 握手；并发数上限为 8，按完成顺序收集
+            with ThreadPoolExecutor(max_workers=min(8, len(url_pairs))) as executor:
+                futures = [executor.submit(self._fetch_api_data, *pair) for pair in url_pairs]
+                for future in as_completed(futures):
+                    item = future.result()
+                    if item is not None:
+                        modified_api_data.append(item)
+
+            if modified_api_data:
+                self._save_api_template(captured_api_urls[0], game_info.match_id)
+        else:
+            logger.warning("未捕获到目标 API URL")
+
+        # 3. 视频生成前的准备工作：保证评论内容完整显示
+        logger.info("开始修改页面元素样式，使评论内容完整显示...")
+        try:
+            # 注入一条样式规则，由渲染器一次性应用，避免逐个元素修改内联样式
+            # p 元素高度设为 auto；子 span 的 white-space 设为 normal，允许正常换行
+            page.add_style_tag(
+                content=(
+                    "p.score-group-comment { height: auto !important; }\n"
+                    "p.score-group-comment span { white-space: normal !important; }"
+                )
+            )
+            logger.info("页面元素样式修改完成")
+        except Exception as e:
+            logger.error(f"修改页面元素样式失败: {e}", exc_info=True)
+
+        # 4. 视频录制过程中的平滑向下滚动
+        logger.info("开始执行页面平滑滚动（requestAnimationFrame，50秒）...")
+        try:
+            # 获取页面尺寸，方便后续若需扩展为基于高度的滚动
+            viewport_size = page.viewport_size
+            page_width = viewport_size["width"]
+            page_height = viewport_size["height"]
+            center_x = page_width // 2
+            center_y = page_height // 2
+            page.mouse.move(center_x, center_y)
+
+            # 平滑滚动配置：60fps，50秒
+            total_duration = 50  # 总时长（秒）
+            fps = 60  # 帧率
+            total_frames = total_duration * fps  # 3000 帧
+
+            # 单帧滚动幅度保持与之前类似（约 0.98 像素），时间拉长，总距离更多
+            base_total_distance_30s = 1770.0
+            base_frames_30s = 30 * 60
+            delta_per_frame = base_total_distance_30s / base_frames_30s  # ≈ 0.98
+
+            total_scroll_distance = delta_per_frame * total_frames
+
+            # 合并为一次日志输出；使用 loguru 的延迟格式化，级别未启用时不做格式化
+            logger.info(
+                "页面尺寸: {}x{}, 中心点: ({}, {})\n"
+                "平滑滚动配置: 时长={}s, 帧率={}, 总帧数={}, 每帧滚动={:.3f}px, "
+                "预期总滚动距离≈{:.1f}px",
+                page_width,
+                page_height,
+                center_x,
+                center_y,
+                total_duration,
+                fps,
+                total_frames,
+                delta_per_frame,
+                total_scroll_distance,
+            )
 
-            # 2. 点击比赛id来跳转新页面
-            # HTML 结构：<div data-match="1405864802949005312" class="match-item">...</div>
-            logger.info(f"开始查找比赛 ID: {game_info.match_id}")
+            # 在页面内用 requestAnimationFrame 驱动滚动，只需一次 RPC 往返，
+            # 滚动节奏与合成器帧同步，录制画面更平滑
+            page.evaluate(
+                """
+                ([duration, perMs]) => new Promise((resolve) => {
+                    const startY = window.scrollY;
+                    let startTime = null;
+                    function step(now) {
+                        if (startTime === null) {
+                            startTime = now;
+                        }
+                        const elapsed = Math.min(now - startTime, duration);
+                        window.scrollTo(0, startY + perMs * elapsed);
+                        if (elapsed < duration) {
+                            requestAnimationFrame(step);
+                        } else {
+                            resolve();
+                        }
+                    }
+                    requestAnimationFrame(step);
+                })
+            """,
+                [total_duration * 1000, total_scroll_distance / (total_duration * 1000)],
+            )
 
-            # 等待页面完全加载
-            time.sleep(2)
+            logger.info("页面平滑滚动完成（约50秒）")
+            time.sleep(1.0)  # 滚动结束后稍等，确保内容稳定
+        except Exception as e:
+            logger.error(f"平滑滚动过程出错: {e}", exc_info=True)
+
+        # 5. 关闭页面和上下文，保存视频
+        logger.info("开始关闭页面和浏览器上下文，并保存视频文件...")
+        try:
+            page.close()
+        except Exception as e:
+            logger.warning(f"关闭页面时出现问题: {e}")
+
+        try:
+            context.close()
+        except Exception as e:
+            logger.warning(f"关闭浏览器上下文时出现问题: {e}")
+
+        try:
+            # save_as 会等待本页面的视频完全写入后再返回，无需固定等待；
+            # 另存后删除原文件，目录中剩余的其他录像随录制目录一并删除
+            if page.video:
+                final_video_path = video_dir / video_filename
+                page.video.save_as(final_video_path)
+                page.video.delete()
+                logger.info(f"录制视频文件已保存为: {final_video_path}")
+            else:
+                recorded_video = self._find_recorded_video(record_dir)
+                if recorded_video:
+                    final_video_path = video_dir / video_filename
+                    recorded_video.rename(final_video_path)
+                    logger.info("录制视频文件 {} 已重命名为: {}", recorded_video, final_video_path)
+                else:
+                    logger.warning(f"未在录制目录中找到 .webm 文件: {record_dir}")
+            self._remove_record_dir(record_dir)
+        except Exception as e:
+            logger.error(f"处理录制视频文件时出错: {e}", exc_info=True)
+
+        return {
+            "modified_api_data": modified_api_data,
+            "success": len(modified_api_data) > 0,
+            "video_path": str(final_video_path) if final_video_path else None,
+        }
+
+    @staticmethod
+    def _find_recorded_video(record_dir: Path) -> Optional[Path]:
+        """
+        在录制子目录中查找最新的 .webm 文件
 
-            # 根据 data-match 属性定位比赛元素
-            match_selector = f'div.match-item[data-match="{game_info.match_id}"]'
-            match_element = page.locator(match_selector)
+        单次 scandir 遍历，DirEntry 缓存了类型信息，按修改时间取最新的一个
+        （弹出页也会产生录像，主页面的录像最后写完）
 
-            # 检查元素是否存在
-            count = match_element.count()
-            logger.info(f"找到匹配的比赛元素数量: {count}")
+        Args:
+            record_dir: 录制子目录
 
-            if count > 0:
-                # 滚动到元素位置，确保可见
-                match_element.first.scroll_into_view_if_needed()
-                time.sleep(0.5)
+        Returns:
+            Optional[Path]: 录制视频路径，未找到返回None
+        """
+        latest_path = None
+        latest_mtime = -1.0
+        with os.scandir(record_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".webm") and entry.is_file(follow_symlinks=False):
+                    mtime = entry.stat(follow_symlinks=False).st_mtime
+                    if mtime > latest_mtime:
+                        latest_path, latest_mtime = entry.path, mtime
+        return Path(latest_path) if latest_path else None
+
+    @staticmethod
+    def _remove_record_dir(record_dir: Path):
+        """
+        删除录制子目录及其中残留的文件（例如弹出页产生的额外录像）
 
-                logger.info(
-                    f"正在点击比赛: {game_info.away_team_name} vs {game_info.home_team_name}"
-                )
+        Args:
+            record_dir: 录制子目录
+        """
+        try:
+            with os.scandir(record_dir) as entries:
+                for entry in entries:
+                    if entry.is_file(follow_symlinks=False):
+                        try:
+                            os.unlink(entry.path)
+                        except OSError as e:
+                            logger.error(f"删除文件失败 {entry.name}: {e}")
+            record_dir.rmdir()
+        except OSError as e:
+            logger.warning(f"删除录制目录失败 {record_dir}: {e}")
+
+    @staticmethod
+    def _parse_api_url(url: str, match_id: Optional[str] = None) -> dict:
+        """
+        将 API URL 拆解为模板
 
-                # 点击比赛元素，等待导航到新页面
-                with page.expect_navigation(timeout=30000):
-                    match_element.first.click()
+        Args:
+            url: API URL
+            match_id: 比赛ID，传入时将取值等于比赛ID的参数替换为占位符
 
-                # 等待新页面加载完成
-                page.wait_for_load_state("networkidle")
-                logger.info(f"已跳转到比赛详情页: {page.url}")
+        Returns:
+            dict: 包含 scheme、netloc、path、params 的 URL 模板
+        """
+        parsed = urlparse(url)
+        params = parse_qs(parsed.query)
+        if match_id:
+            params = {
+                key: [MATCH_ID_PLACEHOLDER if value == match_id else value for value in values]
+                for key, values in params.items()
+            }
+        return {
+            "scheme": parsed.scheme,
+            "netloc": parsed.netloc,
+            "path": parsed.path,
+            "params": params,
+        }
+
+    @staticmethod
+    def _build_api_url(template: dict, match_id: str, page_size: int = 50) -> str:
+        """
+        根据 URL 模板生成指定比赛的 API URL，并将 pageSize 参数改为指定值
 
-                # 等待内容加载
-                time.sleep(2)
+        Args:
+            template: _parse_api_url 返回的 URL 模板
+            match_id: 比赛ID
+            page_size: 每页数量，默认50
 
-            # 检查是否捕获到目标 API URL
-            logger.info(f"共捕获到 {len(captured_api_urls)} 个 API URL")
+        Returns:
+            str: 完整的 API URL
+        """
+        params = {
+            key: [match_id if value == MATCH_ID_PLACEHOLDER else value for value in values]
+            for key, values in template["params"].items()
+        }
+        # 修改 pageSize 参数（parse_qs 返回列表，所以用列表赋值）
+        params["pageSize"] = [str(page_size)]
+
+        return urlunparse(
+            (
+                template["scheme"],
+                template["netloc"],
+                template["path"],
+                "",
+                urlencode(params, doseq=True),
+                "",
+            )
+        )
 
-            modified_api_data = []
-
-            if captured_api_urls:
-                import requests
-                from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
-
-                for original_url in captured_api_urls:
-                    try:
-                        logger.info(f"原始 URL: {original_url}")
-
-                        # 解析 URL
-                        parsed = urlparse(original_url)
-                        params = parse_qs(parsed.query)
-
-                        # 修改 pageSize 参数
-                        params["pageSize"] = ["50"]  # parse_qs 返回列表，所以用列表赋值
-
-                        # 重新构建 URL
-                        new_query = urlencode(params, doseq=True)
-                        modified_url = urlunparse(
-                            (
-                                parsed.scheme,
-                                parsed.netloc,
-                                parsed.path,
-                                parsed.params,
-                                new_query,
-                                parsed.fragment,
-                            )
-                        )
-
-                        logger.info(f"修改后 URL: {modified_url}")
-
-                        # 请求修改后的 API
-                        logger.info("正在请求修改后的 API...")
-                        response = requests.get(modified_url, timeout=30)
-                        response.raise_for_status()
-
-                        # 获取 JSON 数据
-                        data = response.json()
-
-                        modified_api_data.append(
-                            {
-                                "original_url": original_url,
-                                "modified_url": modified_url,
-                                "status_code": response.status_code,
-                                "data": data,
-                            }
-                        )
-
-                        logger.info(f"成功获取 API 数据，状态码: {response.status_code}")
-
-                    except Exception as e:
-                        logger.error(f"请求修改后的 API 失败: {e}", exc_info=True)
-            else:
-                logger.warning("未捕获到目标 API URL")
+    def _save_api_template(self, url: str, match_id: str):
+        """
+        保存 API URL 模板，只有 URL 中包含比赛ID时才可复用
 
-            # 3. 视频生成前的准备工作：保证评论内容完整显示
-            logger.info("开始修改页面元素样式，使评论内容完整显示...")
-            try:
-                page.evaluate(
-                    """
-                    () => {
-                        // 将所有 score-group-comment 的 p 元素高度设为 auto
-                        const commentParagraphs = document.querySelectorAll('p.score-group-comment');
-                        commentParagraphs.forEach(p => {
-                            p.style.height = 'auto';
-
-                            // 将子 span 的 white-space 设为 normal，允许正常换行
-                            const spans = p.querySelectorAll('span');
-                            spans.forEach(span => {
-                                span.style.whiteSpace = 'normal';
-                            });
-                        });
-                    }
-                """
-                )
-                logger.info("页面元素样式修改完成")
-                time.sleep(0.5)  # 等待样式应用
-            except Exception as e:
-                logger.error(f"修改页面元素样式失败: {e}", exc_info=True)
+        Args:
+            url: 捕获到的 API URL
+            match_id: 比赛ID
+        """
+        template = self._parse_api_url(url, match_id)
+        if not any(MATCH_ID_PLACEHOLDER in values for values in template["params"].values()):
+            logger.debug("API URL 中未包含比赛ID，不缓存 URL 模板")
+            return
+
+        try:
+            API_TEMPLATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            API_TEMPLATE_PATH.write_bytes(orjson.dumps(template))
+            logger.info(f"已缓存 API URL 模板: {API_TEMPLATE_PATH}")
+        except OSError as e:
+            logger.warning(f"缓存 API URL 模板失败: {e}")
+
+    def _fetch_with_template(self, match_id: str) -> list:
+        """
+        使用缓存的 URL 模板直接请求评分 API
 
-            # 4. 视频录制过程中的平滑向下滚动
-            logger.info("开始执行鼠标滚轮平滑滑动（60fps，50秒）...")
-            try:
-                # 获取页面尺寸，方便后续若需扩展为基于高度的滚动
-                viewport_size = page.viewport_size
-                page_width = viewport_size["width"]
-                page_height = viewport_size["height"]
-                center_x = page_width // 2
-                center_y = page_height // 2
-                page.mouse.move(center_x, center_y)
-                logger.info(
-                    f"页面尺寸: {page_width}x{page_height}, 中心点: ({center_x}, {center_y})"
-                )
+        Args:
+            match_id: 比赛ID
 
-                # 平滑滚动配置：60fps，50秒
-                total_duration = 50  # 总时长（秒）
-                fps = 60  # 帧率
-                total_frames = total_duration * fps  # 3000 帧
-
-                # 单帧滚动幅度保持与之前类似（约 0.98 像素），时间拉长，总距离更多
-                base_total_distance_30s = 1770.0
-                base_frames_30s = 30 * 60
-                delta_per_frame = base_total_distance_30s / base_frames_30s  # ≈ 0.98
-
-                total_scroll_distance = delta_per_frame * total_frames
-                logger.info(
-                    f"平滑滚动配置: 时长={total_duration}s, 帧率={fps}, "
-                    f"总帧数={total_frames}, 每帧滚动={delta_per_frame:.3f}px, "
-                    f"预期总滚动距离≈{total_scroll_distance:.1f}px"
-                )
+        Returns:
+            list: API 数据列表，模板不存在或请求失败时返回空列表
+        """
+        if not API_TEMPLATE_PATH.exists():
+            return []
 
-                frame_interval = 1.0 / fps
-                start_time = time.time()
-
-                for frame in range(total_frames):
-                    # 执行一次小幅度滚动（正值向下）
-                    page.mouse.wheel(0, delta_per_frame)
-
-                    # 按理想帧时间对齐，保证整体接近 60fps 和 50s
-                    target_time = start_time + (frame + 1) * frame_interval
-                    now = time.time()
-                    sleep_time = target_time - now
-                    if sleep_time > 0:
-                        time.sleep(sleep_time)
-
-                    # 每 2 秒输出一次进度日志（约每 120 帧）
-                    if frame % (fps * 2) == 0:
-                        progress = (frame / total_frames) * 100
-                        logger.info(
-                            f"滚动进度: {progress:.1f}% "
-                            f"({frame}/{total_frames} 帧，累计滚动约 {delta_per_frame * frame:.1f} 像素)"
-                        )
-
-                logger.info("鼠标滚轮平滑滑动完成（约50秒，60fps）")
-                time.sleep(1.0)  # 滚动结束后稍等，确保内容稳定
-            except Exception as e:
-                logger.error(f"平滑滚动过程出错: {e}", exc_info=True)
+        try:
+            template = orjson.loads(API_TEMPLATE_PATH.read_bytes())
+            url = self._build_api_url(template, match_id)
+        except (orjson.JSONDecodeError, KeyError, OSError) as e:
+            logger.warning(f"读取 API URL 模板失败: {e}")
+            return []
 
-            # 5. 关闭页面和上下文，保存视频
-            logger.info("开始关闭页面和浏览器上下文，并保存视频文件...")
-            try:
-                page.close()
-            except Exception as e:
-                logger.warning(f"关闭页面时出现问题: {e}")
+        result = self._fetch_api_data(url, url)
+        return [result] if result else []
 
-            try:
-                context.close()
-            except Exception as e:
-                logger.warning(f"关闭浏览器上下文时出现问题: {e}")
+    @staticmethod
+    def _fetch_api_data(original_url: str, modified_url: str) -> Optional[dict]:
+        """
+        请求修改后的 API 并返回数据
 
-            # 等待视频文件写入完成
-            time.sleep(2)
+        Args:
+            original_url: 原始 API URL
+            modified_url: 修改 pageSize 后的 URL
 
-            try:
-                video_files = list(video_dir.glob("*.webm"))
-                if video_files:
-                    latest_video = max(video_files, key=lambda p: p.stat().st_mtime)
-                    logger.info(f"检测到录制视频文件: {latest_video}")
+        Returns:
+            包含 URL、状态码和数据的字典，失败时返回 None
+        """
+        try:
+            logger.debug("原始 URL: {}\n修改后 URL: {}", original_url, modified_url)
 
-                    final_video_path = video_dir / video_filename
-                    if latest_video != final_video_path:
-                        latest_video.rename(final_video_path)
-                        logger.info(f"视频文件已重命名为: {final_video_path}")
-                    else:
-                        logger.info(f"视频文件已使用目标文件名保存: {final_video_path}")
-                else:
-                    logger.warning("未在视频目录中找到任何 .webm 文件")
-            except Exception as e:
-                logger.error(f"处理录制视频文件时出错: {e}", exc_info=True)
+            response = _SESSION.get(modified_url, timeout=30)
+            response.raise_for_status()
 
-            try:
-                browser.close()
-            except Exception as e:
-                logger.warning(f"关闭浏览器实例时出错: {e}")
+            # 获取 JSON 数据（orjson 直接解析字节，比 response.json() 更快）
+            data = orjson.loads(response.content)
 
+            logger.info(f"成功获取 API 数据，状态码: {response.status_code}")
             return {
-                "modified_api_data": modified_api_data,
-                "success": len(modified_api_data) > 0,
-                "video_path": str(final_video_path) if final_video_path else None,
+                "original_url": original_url,
+                "modified_url": modified_url,
+                "status_code": response.status_code,
+                "data": data,
             }
+        except Exception as e:
+            logger.error(f"请求修改后的 API 失败: {e}", exc_info=True)
+            return None
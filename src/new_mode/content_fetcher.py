@@ -4,20 +4,60 @@
 负责使用无头浏览器访问虎扑活动页面，获取内容数据。
 """
 
-import json
+import re
 import time
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Union
 
+import orjson
 import requests
-from bs4 import BeautifulSoup
 from loguru import logger
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from playwright.sync_api import Browser, BrowserContext, Page, sync_playwright
 
+from src.utils.browser import CHROMIUM_LAUNCH_ARGS
+
 # 设置环境变量，禁用 Playwright 的 asyncio 事件循环检查
 os.environ["PLAYWRIGHT_SKIP_BROWSER_DOWNLOAD"] = "0"
 
+# 采集页面时不需要加载的资源类型
+_BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet"}
+
+# 匹配 Next.js 页面中的 __NEXT_DATA__ script 标签
+_NEXT_DATA_RE = re.compile(rb'<script[^>]*\bid="__NEXT_DATA__"[^>]*>(.*?)</script>', re.S)
+
+# 浏览器上下文每服务多少个页面重建一次，释放其累积的请求/响应对象
+_CONTEXT_RECYCLE_PAGES = 50
+
+
+def _create_session() -> requests.Session:
+    """
+    创建带连接池和重试策略的 HTTP 会话，模块内所有请求共用
+
+    Returns:
+        requests.Session: HTTP 会话
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=32,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = (
+        "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) "
+        "AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1"
+    )
+    return session
+
+
+# 复用 TCP/TLS 连接，避免每次请求重新握手
+_SESSION = _create_session()
+
 
 class NewContentFetcher:
     """新模式内容获取器 - 负责访问网页并采集内容"""
@@ -34,6 +74,7 @@ class NewContentFetcher:
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
+        self._pages_served = 0
         logger.info(f"新模式内容获取器初始化完成 (headless={headless})")
 
     def fetch_content(self) -> Dict[str, Any]:
@@ -49,117 +90,96 @@ class NewContentFetcher:
         logger.info("开始获取新模式内容数据")
 
         try:
-            with sync_playwright() as playwright:
-                # 1. 启动浏览器
-                browser = playwright.chromium.launch(headless=self.headless)
-                self.browser = browser
-                logger.info("浏览器启动成功")
-
-                # 2. 创建浏览器上下文（PC端配置）
-                context = browser.new_context(
-                    viewport={
-                        "width": 1920,
-                        "height": 1080,
-                    },
-                    user_agent=(
-                        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                        "AppleWebKit/537.36 (KHTML, like Gecko) "
-                        "Chrome/120.0.0.0 Safari/537.36"
-                    ),
-                )
-                self.context = context
-                logger.info("浏览器上下文创建成功")
-
-                # 3. 创建新页面
-                page = context.new_page()
-                self.page = page
-
-                # 4. 打开目标链接
-                target_url = "https://bbsactivity.hupu.com/pc-viewer/index.html?t=https%3A%2F%2Fm.hupu.com%2Fscore-home"
-                logger.info(f"正在打开目标链接: {target_url}")
-                page.goto(target_url, wait_until="networkidle", timeout=60000)
-                logger.info(f"页面加载完成: {page.url}")
-
-                # 等待页面完全加载
-                time.sleep(2)
-
-                # 5. 获取页面基本信息
-                page_title = page.title()
-                page_url = page.url
-                logger.info(f"页面标题: {page_title}")
-                logger.info(f"当前URL: {page_url}")
-
-                # 6. 通过 HTTP 获取页面 HTML 内容
-                score_home_url = "https://m.hupu.com/score-home"
-                logger.info(f"正在通过 HTTP 获取页面内容: {score_home_url}")
-
-                html_content = None
-                response = requests.get(score_home_url, timeout=30)
-                response.raise_for_status()
-
-                # 设置正确的编码
-                response.encoding = response.apparent_encoding or "utf-8"
-                html_content = response.text
-
-                logger.info(f"成功获取 HTML 内容，长度: {len(html_content)} 字符")
-
-                # 7. 从 HTML 中提取 JSON 数据
-                json_data = self._extract_json_from_html(html_content)
-
-                # 从json中提取有效信息。
-                # item - scoreCountNum 从item中提取出评分数量用于筛选
-                filtered_json_data = self._filter_json_data(json_data)
-
-                # 8. 采集内容（这里可以根据实际需求扩展）
-                content_data = {
-                    "url": page_url,
-                    "title": page_title,
-                    "json_data": filtered_json_data,
-                    "score_home_url": score_home_url,
-                    "timestamp": time.time(),
-                    "success": True,
-                }
+            # 0. 第 6 步的 HTTP 请求不依赖页面，放到后台线程与浏览器启动、页面导航重叠执行
+            score_home_url = "https://m.hupu.com/score-home"
+            prefetch_executor = ThreadPoolExecutor(max_workers=1)
+            html_future = prefetch_executor.submit(self._fetch_html, score_home_url)
+            prefetch_executor.shutdown(wait=False)
+
+            # 1-2. 复用浏览器实例和浏览器上下文
+            context = self._get_context()
+
+            # 3. 创建新页面
+            page = context.new_page()
+            self.page = page
+            self._pages_served += 1
+
+            # 4. 打开目标链接
+            target_url = "https://bbsactivity.hupu.com/pc-viewer/index.html?t=https%3A%2F%2Fm.hupu.com%2Fscore-home"
+            logger.info(f"正在打开目标链接: {target_url}")
+            # 只需读取页面标题和 URL，DOM 就绪即可，无需等待 networkidle
+            page.goto(target_url, wait_until="domcontentloaded", timeout=60000)
+            logger.info(f"页面加载完成: {page.url}")
+
+            # 5. 获取页面基本信息
+            page_title = page.title()
+            page_url = page.url
+            logger.info(f"页面标题: {page_title}")
+            logger.info(f"当前URL: {page_url}")
+
+            # 6. 取回后台 HTTP 请求的页面 HTML 内容（请求失败时在此抛出异常）
+            html_content = html_future.result()
+
+            logger.info(f"成功获取 HTML 内容，长度: {len(html_content)} 字节")
+
+            # 7. 从 HTML 中提取 JSON 数据
+            json_data = self._extract_json_from_html(html_content)
+
+            # 从json中提取有效信息。
+            # item - scoreCountNum 从item中提取出评分数量用于筛选
+            filtered_json_data = self._filter_json_data(json_data)
+
+            # 8. 采集内容（这里可以根据实际需求扩展）
+            content_data = {
+                "url": page_url,
+                "title": page_title,
+                "json_data": filtered_json_data,
+                "score_home_url": score_home_url,
+                "timestamp": time.time(),
+                "success": True,
+            }
 
-                logger.info("内容获取完成")
+            logger.info("内容获取完成")
 
-                # 清理资源（在返回前清理，with 块会自动关闭 playwright）
-                self._cleanup()
+            # 只关闭页面（浏览器实例和上下文保留复用，由 close() 统一关闭）
+            self._cleanup()
 
-                return content_data
+            return content_data
 
         except Exception as e:
             logger.error(f"获取内容时发生错误: {e}", exc_info=True)
-            # 确保在异常时也清理资源
+            # 确保在异常时也清理资源，上下文状态不可信，一并关闭
             self._cleanup()
+            self._close_context()
             return {
                 "success": False,
                 "error": str(e),
                 "timestamp": time.time(),
             }
 
-    def _extract_json_from_html(self, html: str) -> Optional[Dict[str, Any]]:
+    def _extract_json_from_html(self, html: Union[str, bytes]) -> Optional[Dict[str, Any]]:
         """
         从 HTML 中提取 JSON 数据（方法同 _parse_hupu_schedule，但不做日期处理）
 
+        直接用正则定位 __NEXT_DATA__ script 标签，无需构建完整的 DOM 树。
+
         Args:
-            html: HTML 内容
+            html: HTML 内容（str 或原始 bytes）
 
         Returns:
             Optional[Dict[str, Any]]: 提取的 JSON 数据，提取失败返回 None
         """
         try:
-            soup = BeautifulSoup(html, "lxml")
-
-            # 从 soup 中获取 script 标签，查找 __NEXT_DATA__
-            next_data_script = soup.find("script", id="__NEXT_DATA__", type="application/json")
+            if isinstance(html, str):
+                html = html.encode("utf-8")
 
-            if not next_data_script:
+            match = _NEXT_DATA_RE.search(html)
+            if not match:
                 logger.warning("未找到 __NEXT_DATA__ script 标签")
                 return None
 
             # 从 script 标签中提取 JSON 数据
-            json_text = next_data_script.get_text()
-            json_data = json.loads(json_text)
+            json_data = orjson.loads(match.group(1))
 
             output_json_data = json_data.get("props", {}).get("pageProps", {}).get("list", [])
 
@@ -169,67 +189,172 @@ class NewContentFetcher:
             logger.error(f"从 HTML 中提取 JSON 数据失败: {e}", exc_info=True)
             return None
 
+    @staticmethod
+    def _fetch_html(url: str) -> bytes:
+        """
+        通过 HTTP 获取页面 HTML 内容
+
+        页面固定为 UTF-8，直接返回原始字节，省去 apparent_encoding 的字符集探测和解码。
+
+        Args:
+            url: 页面地址
+
+        Returns:
+            bytes: 页面 HTML 原始字节
+        """
+        logger.info(f"正在通过 HTTP 获取页面内容: {url}")
+        response = _SESSION.get(url, timeout=30)
+        response.raise_for_status()
+        return response.content
+
+    @staticmethod
+    def _block_static_resources(route):
+        """拦截与内容采集无关的静态资源请求"""
+        if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+            return route.abort()
+        return route.continue_()
+
+    def _get_browser(self) -> Browser:
+        """
+        获取复用的浏览器实例，首次调用时启动
+
+        Returns:
+            Browser: 浏览器实例
+        """
+        if self.browser is None or not self.browser.is_connected():
+            if self.playwright is None:
+                self.playwright = sync_playwright().start()
+            self.browser = self.playwright.chromium.launch(
+                headless=self.headless, args=CHROMIUM_LAUNCH_ARGS
+            )
+            logger.info("浏览器启动成功")
+        return self.browser
+
+    def _get_context(self) -> BrowserContext:
+        """
+        获取复用的浏览器上下文（PC端配置），每服务 _CONTEXT_RECYCLE_PAGES 个页面重建一次
+
+        Returns:
+            BrowserContext: 浏览器上下文
+        """
+        if self.context is not None and self._pages_served >= _CONTEXT_RECYCLE_PAGES:
+            logger.info(f"浏览器上下文已服务 {self._pages_served} 个页面，重建上下文")
+            self._close_context()
+
+        if self.context is None:
+            self.context = self._get_browser().new_context(
+                viewport={
+                    "width": 1920,
+                    "height": 1080,
+                },
+                user_agent=(
+                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                    "AppleWebKit/537.36 (KHTML, like Gecko) "
+                    "Chrome/120.0.0.0 Safari/537.36"
+                ),
+            )
+            # 页面只用于读取标题和 URL，拦截图片、媒体、字体和样式表请求以缩短加载时间
+            # （脚本不能拦截，页面数据依赖 JS 渲染）
+            self.context.route("**/*", self._block_static_resources)
+            self._pages_served = 0
+            logger.info("浏览器上下文创建成功")
+        return self.context
+
+    def _close_context(self):
+        """关闭浏览器上下文"""
+        try:
+            if self.context:
+                self.context.close()
+        except Exception as e:
+            logger.warning(f"关闭浏览器上下文时出现问题: {e}")
+        finally:
+            self.context = None
+
+    def storage_state(self) -> Optional[Dict[str, Any]]:
+        """
+        导出当前浏览器上下文的 cookies 和 localStorage，供录制上下文复用
+
+        Returns:
+            Optional[Dict[str, Any]]: 存储状态，上下文不存在或导出失败时返回 None
+        """
+        if self.context is None:
+            return None
+        try:
+            return self.context.storage_state()
+        except Exception as e:
+            logger.warning(f"导出浏览器存储状态失败: {e}")
+            return None
+
     def _cleanup(self):
-        """清理浏览器资源"""
+        """清理页面资源"""
         try:
             if self.page:
                 self.page.close()
                 self.page = None
-            if self.context:
-                self.context.close()
-                self.context = None
+            logger.info("浏览器资源清理完成")
+        except Exception as e:
+            logger.warning(f"清理浏览器资源时出现问题: {e}")
+
+    def close(self):
+        """关闭浏览器上下文、浏览器实例并停止 Playwright"""
+        self._cleanup()
+        self._close_context()
+        try:
             if self.browser:
                 self.browser.close()
                 self.browser = None
-            logger.info("浏览器资源清理完成")
+            if self.playwright:
+                self.playwright.stop()
+                self.playwright = None
         except Exception as e:
-            logger.warning(f"清理浏览器资源时出现问题: {e}")
+            logger.warning(f"关闭浏览器实例时出现问题: {e}")
+
+    def __enter__(self):
+        return self
 
-    def _filter_json_data(self, json_data: Dict[str, Any]) -> Dict[str, Any]:
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _filter_json_data(self, json_data: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
         """
         从json中提取有效信息。
+
+        只保留 scoreCountNum > 1w 且带有 bizNo 的条目，并为其新增 handle_json_data 字段：
+        scoreCountNum: 评分数量
+        title: 该内容的标题
+        url: 该内容用于录制的url
+        itemId: 该内容的id
         """
         try:
             if not json_data:
                 logger.warning("json_data 为空，无法筛选")
                 return []
 
-            # 筛选，只处理scoreCountNum > 1w的数据
-            # 需要处理 None 值的情况，避免比较错误
-            filtered_json_data = [
-                item
-                for item in json_data
-                if item.get("item")
-                and item.get("item").get("scoreCountNum") is not None
-                and item.get("item").get("scoreCountNum") > 10000
-            ]
-            # filtered_json_data中新增一个handle_json_data 空字段，用于后续处理。
-            # handle_json_data中包含一下字段：
-            # scoreCountNum: 评分数量
-            # title: 该内容的标题
-            # url: 该内容用于录制的url
-            # itemId: 该内容的id
-            for item in filtered_json_data:
-                # 安全获取数据，避免 None 值错误
+            # 单次遍历完成筛选和字段补充，每个条目的字段只取一次
+            filtered_json_data = []
+            for item in json_data:
+                info_obj = item.get("item")
                 subject = item.get("subject")
-                infoObj = item.get("item")
+                if not info_obj or not subject:
+                    continue
 
-                if not subject or not infoObj:
-                    logger.warning(f"跳过无效的 item，缺少 subject 或 item 字段")
+                # 需要处理 None 值的情况，避免比较错误
+                score_count = info_obj.get("scoreCountNum")
+                if score_count is None or score_count <= 10000:
                     continue
 
-                bizNo = subject.get("bizNo")
-                if not bizNo:
-                    logger.warning(f"跳过无效的 item，缺少 bizNo")
+                biz_no = subject.get("bizNo")
+                if not biz_no:
+                    logger.warning("跳过无效的 item，缺少 bizNo")
                     continue
 
-                handle_json_data = {
-                    "scoreCountNum": infoObj.get("scoreCountNum"),
-                    "title": infoObj.get("name"),
-                    "url": f"https://m.hupu.com/score-list/common_first/{bizNo}",
-                    "itemId": infoObj.get("itemId"),
+                item["handle_json_data"] = {
+                    "scoreCountNum": score_count,
+                    "title": info_obj.get("name"),
+                    "url": f"https://m.hupu.com/score-list/common_first/{biz_no}",
+                    "itemId": info_obj.get("itemId"),
                 }
-                item["handle_json_data"] = handle_json_data
+                filtered_json_data.append(item)
 
             return filtered_json_data
         except Exception as e:
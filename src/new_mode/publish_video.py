@@ -4,18 +4,183 @@
 负责将新模式生成的视频发布到B站平台。
 """
 
-import json
+import hashlib
 import re
+import shelve
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import TYPE_CHECKING, Optional, Dict, Any
 
+import orjson
 from loguru import logger
 from bilibili_api import video_zone
 from src.utils import call_llm
 
+from src.vide_publish import get_publish_record
+
 if TYPE_CHECKING:
     from src.vide_publish import VideoPublisher
 
+# 解析大模型响应用到的正则，模块加载时编译一次
+_LEADING_ARRAY_RE = re.compile(r"\s*\[")
+_MD_ARRAY_RE = re.compile(r"```(?:json)?\s*(\[.*?\])\s*```", re.S)
+_NESTED_ARRAY_RE = re.compile(r"\[[^\[\]]*(?:\[[^\[\]]*\][^\[\]]*)*\]", re.S)
+_QUOTED_RE = re.compile(r'["\']([^"\']{2,10})["\']')
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.S)
+_CODE_INT_RE = re.compile(r"```(?:json)?\s*(\d+)\s*```")
+_ANY_INT_RE = re.compile(r"\d+")
+
+# 大模型结果缓存：修改提示词后需要递增版本号，使旧缓存失效
+_PROMPT_VERSION = "3"
+_LLM_CACHE_PATH = Path("materials/llm_cache")
+_llm_cache_memory: Dict[str, Any] = {}
+_llm_cache_lock = threading.Lock()
+
+_META_SYSTEM_PROMPT = """你是一个B站视频发布助手。根据视频标题，生成8个视频标签，并从提供的分区列表中选择一个最符合的分区。
+
+标签要求：
+1. 生成恰好8个标签
+2. 每个标签应该是独立的，不重复
+3. 标签应该与视频标题内容相关
+4. 标签应该简洁明了，每个标签2-6个汉字
+5. 标签应该吸引观众，符合B站用户的兴趣
+6. 标签可以包括：内容类型、主题、风格、特点等
+
+分区要求：
+1. 仔细分析视频标题的内容和主题
+2. 从提供的分区列表中选择最匹配的分区
+3. 优先选择子分区（更具体），如果没有合适的子分区，再选择主分区
+4. 如果实在无法确定，选择一个最接近的分区
+
+返回格式：只返回一个JSON对象，不要有其他说明文字
+例如：{"tags": ["标签1", "标签2", "标签3", "标签4", "标签5", "标签6", "标签7", "标签8"], "tid": 171}"""
+
+
+@lru_cache(maxsize=1)
+def _cached_zone_list() -> tuple:
+    """
+    获取B站全部分区信息，进程内只加载一次
+
+    Returns:
+        tuple: 分区信息元组
+    """
+    return tuple(video_zone.get_zone_list())
+
+
+@lru_cache(maxsize=1)
+def _valid_tids() -> frozenset:
+    """
+    获取全部有效的分区ID集合，用于校验大模型返回的tid
+
+    Returns:
+        frozenset: 有效分区ID集合
+    """
+    return frozenset(zone["tid"] for zone in _cached_zone_list() if zone.get("tid") is not None)
+
+
+@lru_cache(maxsize=1)
+def _zones_fingerprint() -> str:
+    """
+    计算分区列表的指纹，分区变化时选区缓存自动失效
+
+    Returns:
+        str: 分区ID集合的sha1摘要
+    """
+    tids = ",".join(str(tid) for tid in sorted(_valid_tids()))
+    return hashlib.sha1(tids.encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=1)
+def _zones_prompt_text() -> str:
+    """
+    构建提示词中的分区列表文本，只包含tid和name，便于大模型理解
+
+    Returns:
+        str: 每行一个分区的文本
+    """
+    lines = []
+    for zone in _cached_zone_list():
+        if zone.get("tid") is None:
+            continue
+        name = zone.get("name", "")
+        # 如果有父分区信息，也包含进去
+        if zone.get("father"):
+            name = f"{zone['father'].get('name', '')} - {name}"
+        lines.append(f"分区ID: {zone['tid']}, 分区名称: {name}")
+    return "\n".join(lines)
+
+
+@lru_cache(maxsize=1)
+def _meta_system_prompt() -> str:
+    """
+    构建生成标签和选择分区的系统提示词
+
+    分区列表在进程内不变，放在系统提示词中与固定说明一起构成不变的前缀，
+    标题只出现在用户提示词中，便于服务端前缀缓存命中。
+
+    Returns:
+        str: 系统提示词
+    """
+    return f"{_META_SYSTEM_PROMPT}\n\n可用分区列表：\n{_zones_prompt_text()}"
+
+
+def _llm_cache_key(*parts: str) -> str:
+    """
+    根据提示词版本和输入生成缓存键
+
+    Args:
+        *parts: 参与计算的输入，如缓存类别、标题等
+
+    Returns:
+        str: 缓存键
+    """
+    raw = "\x1f".join((_PROMPT_VERSION,) + parts)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _llm_cache_get(key: str) -> Any:
+    """
+    读取大模型结果缓存，先查内存再查磁盘
+
+    Args:
+        key: 缓存键
+
+    Returns:
+        Any: 缓存的结果，未命中返回None
+    """
+    with _llm_cache_lock:
+        if key in _llm_cache_memory:
+            return _llm_cache_memory[key]
+        try:
+            with shelve.open(str(_LLM_CACHE_PATH), flag="r") as db:
+                value = db.get(key)
+        except Exception:
+            # 缓存文件不存在或损坏时视为未命中
+            return None
+        if value is not None:
+            _llm_cache_memory[key] = value
+        return value
+
+
+def _llm_cache_set(key: str, value: Any) -> None:
+    """
+    写入大模型结果缓存（内存和磁盘）
+
+    Args:
+        key: 缓存键
+        value: 需要缓存的结果
+    """
+    with _llm_cache_lock:
+        _llm_cache_memory[key] = value
+        try:
+            _LLM_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            with shelve.open(str(_LLM_CACHE_PATH)) as db:
+                db[key] = value
+        except Exception as e:
+            logger.warning(f"写入大模型缓存失败: {e}")
+
 
 def publish_video(
     video_path: str,
@@ -45,6 +210,17 @@ def publish_video(
 
         logger.info(f"开始发布视频: {video_path}")
 
+        # 同一个视频文件已发布过时直接返回，不再调用大模型、生成封面和重复上传
+        publish_record = get_publish_record(video_path)
+        if publish_record:
+            logger.info(f"视频已发布过，跳过: BVID={publish_record.get('bvid')}")
+            return True
+
+        # 封面图由 ffmpeg 生成，与下面的大模型调用互不依赖，放到后台线程并发执行
+        cover_executor = ThreadPoolExecutor(max_workers=1)
+        cover_future = cover_executor.submit(video_publisher._generate_cover_image, video_path)
+        cover_executor.shutdown(wait=False)
+
         # 生成视频标题（基于 handle_json_data）
         video_title = generate_video_title(handle_json_data)
 
@@ -55,13 +231,15 @@ def publish_video(
         video_tags = generate_video_tags(handle_json_data)
 
         # 获取视频分区ID（基于标题和分区信息）
-        zone_tid = get_zone_tid_by_title(video_title)
+        # 与标签使用同一个原始标题，两者共用一次大模型调用的结果
+        content_title = (handle_json_data or {}).get("title") or video_title
+        zone_tid = get_zone_tid_by_title(content_title)
         if not zone_tid:
             logger.warning("无法获取视频分区ID，使用默认值")
             zone_tid = None
 
-        # 生成封面图（从视频第30帧提取上方0-450px区域）
-        cover_path = video_publisher._generate_cover_image(video_path)
+        # 取回封面图（从视频第30帧提取上方0-450px区域）
+        cover_path = cover_future.result()
         if not cover_path:
             logger.warning("封面图生成失败，将不使用封面图上传")
 
@@ -87,6 +265,20 @@ def publish_video(
         return False
 
 
+def prefetch_video_meta(handle_json_data: Optional[Dict[str, Any]] = None) -> None:
+    """
+    提前生成视频标签并选择分区，结果写入大模型缓存
+
+    只依赖 handle_json_data，可在视频还在编码时调用，让大模型调用与 ffmpeg 重叠；
+    之后 publish_video 直接命中缓存。
+
+    Args:
+        handle_json_data: 视频对应的原始数据信息
+    """
+    content_title = (handle_json_data or {}).get("title") or generate_video_title(handle_json_data)
+    _generate_meta_with_llm(content_title)
+
+
 def generate_video_title(handle_json_data: Optional[Dict[str, Any]] = None) -> str:
     """
     生成视频标题
@@ -188,53 +380,93 @@ def _generate_tags_with_llm(title: str) -> list:
     """
     使用大模型根据标题生成8个独立的标签
 
+    与分区选择共用一次大模型调用，见 _generate_meta_with_llm。
+
     Args:
         title: 视频标题
 
     Returns:
         list: 生成的标签列表
     """
-    try:
-        system_prompt = """你是一个B站视频标签生成助手。根据视频标题，生成8个相关的、独立的标签。
+    return list(_generate_meta_with_llm(title)["tags"])
 
-要求：
-1. 生成恰好8个标签
-2. 每个标签应该是独立的，不重复
-3. 标签应该与视频标题内容相关
-4. 标签应该简洁明了，每个标签2-6个汉字
-5. 标签应该吸引观众，符合B站用户的兴趣
-6. 标签可以包括：内容类型、主题、风格、特点等
-7. 只返回标签列表，不要有其他说明文字
 
-返回格式：返回一个JSON数组，包含8个字符串标签
-例如：["标签1", "标签2", "标签3", "标签4", "标签5", "标签6", "标签7", "标签8"]"""
+def _generate_meta_with_llm(title: str) -> Dict[str, Any]:
+    """
+    使用一次大模型调用，根据标题同时生成8个标签并选择分区ID
+
+    Args:
+        title: 视频标题
+
+    Returns:
+        Dict[str, Any]: 包含 tags（标签元组，失败时为空）和 tid（分区ID，失败时为None）
+    """
+    cache_key = _llm_cache_key("meta", title, _zones_fingerprint())
+    cached_meta = _llm_cache_get(cache_key)
+    if cached_meta and cached_meta.get("tid") in _valid_tids():
+        logger.info(
+            f"命中大模型缓存: 标签 {len(cached_meta['tags'])} 个，分区ID {cached_meta['tid']}"
+        )
+        return cached_meta
 
+    try:
         user_prompt = f"""视频标题：{title}
 
-请根据这个视频标题，生成8个相关的、独立的标签。标签应该简洁、吸引人，与视频内容相关。"""
+请根据视频标题，生成8个相关的、独立的标签，并从上述分区列表中选择一个最符合的分区ID（tid）。"""
 
-        logger.info("调用大模型生成标签...")
+        logger.info("调用大模型生成标签并选择分区...")
         response = call_llm(
             user_content=user_prompt,
-            system_content=system_prompt,
-            enable_search=False,  # 标签生成不需要搜索
+            system_content=_meta_system_prompt(),
+            enable_search=False,  # 标签生成和分区选择不需要搜索
         )
 
         logger.info(f"大模型返回: {response[:200]}...")
 
-        # 尝试从响应中提取JSON数组
-        tags = _extract_tags_from_response(response)
-
-        if tags and len(tags) > 0:
-            logger.info(f"成功生成 {len(tags)} 个标签")
-            return tags
+        meta = _extract_meta_from_response(response)
+        if meta["tags"] and meta["tid"] is not None:
+            logger.info(f"成功生成 {len(meta['tags'])} 个标签，选择分区ID: {meta['tid']}")
+            _llm_cache_set(cache_key, meta)
         else:
-            logger.warning("未能从大模型响应中提取标签，使用默认标签")
-            return []
+            logger.warning(f"大模型响应不完整: 标签 {len(meta['tags'])} 个，分区ID {meta['tid']}")
+        return meta
 
     except Exception as e:
-        logger.error(f"使用大模型生成标签失败: {e}", exc_info=True)
-        return []
+        logger.error(f"使用大模型生成标签和分区失败: {e}", exc_info=True)
+        return {"tags": (), "tid": None}
+
+
+def _extract_meta_from_response(response: str) -> Dict[str, Any]:
+    """
+    从大模型响应中提取标签和分区ID
+
+    优先按 {"tags": [...], "tid": ...} 解析，解析失败时分别退回到标签和分区ID的提取方法。
+
+    Args:
+        response: 大模型的响应文本
+
+    Returns:
+        Dict[str, Any]: 包含 tags（标签元组）和 tid（分区ID，无效时为None）
+    """
+    object_match = _JSON_OBJECT_RE.search(response)
+    if object_match:
+        try:
+            parsed = orjson.loads(object_match.group(0))
+        except orjson.JSONDecodeError:
+            parsed = None
+        if isinstance(parsed, dict):
+            tags = parsed.get("tags")
+            tags = tuple(str(tag).strip() for tag in tags if tag) if isinstance(tags, list) else ()
+            try:
+                tid = int(parsed.get("tid"))
+            except (TypeError, ValueError):
+                tid = None
+            return {"tags": tags, "tid": tid if tid in _valid_tids() else None}
+
+    return {
+        "tags": tuple(_extract_tags_from_response(response)),
+        "tid": _extract_zone_tid_from_response(response),
+    }
 
 
 def _extract_tags_from_response(response: str) -> list:
@@ -247,40 +479,42 @@ def _extract_tags_from_response(response: str) -> list:
     Returns:
         list: 提取的标签列表
     """
-    # 方法1: 尝试直接解析整个响应
-    try:
-        tags = json.loads(response.strip())
-        if isinstance(tags, list):
-            # 过滤掉非字符串元素，并清理标签
-            tags = [str(tag).strip() for tag in tags if tag]
-            return tags
-    except json.JSONDecodeError:
-        pass
+    # 方法1: 响应本身就是JSON数组时直接解析（最常见的情况）
+    # orjson 允许首尾空白，无需先 strip() 复制整个字符串；非数组开头时跳过，避免抛出异常
+    if _LEADING_ARRAY_RE.match(response):
+        try:
+            tags = orjson.loads(response)
+            if isinstance(tags, list):
+                # 过滤掉非字符串元素，并清理标签
+                tags = [str(tag).strip() for tag in tags if tag]
+                return tags
+        except orjson.JSONDecodeError:
+            pass
 
     # 方法2: 尝试提取JSON数组代码块（如果被markdown代码块包裹）
-    json_array_match = re.search(r"```(?:json)?\s*(\[.*?\])\s*```", response, re.DOTALL)
+    json_array_match = _MD_ARRAY_RE.search(response)
     if json_array_match:
         try:
-            tags = json.loads(json_array_match.group(1))
+            tags = orjson.loads(json_array_match.group(1))
             if isinstance(tags, list):
                 tags = [str(tag).strip() for tag in tags if tag]
                 return tags
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             pass
 
     # 方法3: 尝试提取JSON数组（支持嵌套）
-    json_array_match = re.search(r"\[[^\[\]]*(?:\[[^\[\]]*\][^\[\]]*)*\]", response, re.DOTALL)
+    json_array_match = _NESTED_ARRAY_RE.search(response)
     if json_array_match:
         try:
-            tags = json.loads(json_array_match.group(0))
+            tags = orjson.loads(json_array_match.group(0))
             if isinstance(tags, list):
                 tags = [str(tag).strip() for tag in tags if tag]
                 return tags
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             pass
 
     # 方法4: 尝试提取引号中的内容（作为备选方案）
-    quoted_tags = re.findall(r'["\']([^"\']{2,10})["\']', response)
+    quoted_tags = _QUOTED_RE.findall(response)
     if quoted_tags and len(quoted_tags) >= 4:  # 至少找到4个标签才认为有效
         return quoted_tags[:8]  # 最多返回8个
 
@@ -306,11 +540,11 @@ def get_zone_tid_by_title(title: str) -> Optional[int]:
         logger.info(f"开始获取视频分区ID，标题: {title}")
 
         # 第一步：从bilibili_api获取所有分区信息
-        zone_list = video_zone.get_zone_list()
+        zone_list = _cached_zone_list()
         logger.info(f"获取到 {len(zone_list)} 个分区信息")
 
         # 第二步：将title和分区信息输入给大模型，让大模型输出最符合的分区id
-        zone_tid = _select_zone_with_llm(title, zone_list)
+        zone_tid = _select_zone_with_llm(title)
 
         if zone_tid:
             logger.info(f"成功获取分区ID: {zone_tid}")
@@ -324,99 +558,36 @@ def get_zone_tid_by_title(title: str) -> Optional[int]:
         return None
 
 
-def _select_zone_with_llm(title: str, zone_list: list) -> Optional[int]:
+def _select_zone_with_llm(title: str) -> Optional[int]:
     """
     使用大模型根据标题选择最合适的分区ID
 
+    与标签生成共用一次大模型调用，见 _generate_meta_with_llm。
+
     Args:
         title: 视频标题
-        zone_list: 所有分区信息列表
 
     Returns:
         Optional[int]: 分区ID，如果获取失败则返回None
     """
-    try:
-        # 构建分区信息字符串，只包含tid和name，便于大模型理解
-        zone_info_list = []
-        for zone in zone_list:
-            zone_info = {
-                "tid": zone.get("tid"),
-                "name": zone.get("name", ""),
-            }
-            # 如果有父分区信息，也包含进去
-            if "father" in zone and zone["father"]:
-                father_name = zone["father"].get("name", "")
-                zone_info["name"] = f"{father_name} - {zone_info['name']}"
-            zone_info_list.append(zone_info)
-
-        # 构建系统提示词
-        system_prompt = """你是一个B站视频分区选择助手。根据视频标题，从提供的分区列表中选择一个最符合的分区。
-
-要求：
-1. 仔细分析视频标题的内容和主题
-2. 从提供的分区列表中选择最匹配的分区
-3. 优先选择子分区（更具体），如果没有合适的子分区，再选择主分区
-4. 只返回分区的tid（数字ID），不要有其他说明文字
-5. 如果实在无法确定，选择一个最接近的分区
-
-返回格式：只返回一个数字，例如：171"""
-
-        # 构建用户提示词
-        zones_text = "\n".join(
-            [
-                f"分区ID: {zone['tid']}, 分区名称: {zone['name']}"
-                for zone in zone_info_list
-                if zone.get("tid") is not None
-            ]
-        )
-
-        user_prompt = f"""视频标题：{title}
-
-可用分区列表：
-{zones_text}
-
-请根据视频标题，从上述分区列表中选择一个最符合的分区，只返回该分区的ID（tid）数字。"""
-
-        logger.info("调用大模型选择分区...")
-        response = call_llm(
-            user_content=user_prompt,
-            system_content=system_prompt,
-            enable_search=False,  # 分区选择不需要搜索
-        )
-
-        logger.info(f"大模型返回: {response[:200]}...")
-
-        # 从响应中提取分区ID
-        zone_tid = _extract_zone_tid_from_response(response, zone_list)
-
-        if zone_tid:
-            logger.info(f"成功选择分区ID: {zone_tid}")
-            return zone_tid
-        else:
-            logger.warning("未能从大模型响应中提取分区ID")
-            return None
-
-    except Exception as e:
-        logger.error(f"使用大模型选择分区失败: {e}", exc_info=True)
-        return None
+    return _generate_meta_with_llm(title)["tid"]
 
 
-def _extract_zone_tid_from_response(response: str, zone_list: list) -> Optional[int]:
+def _extract_zone_tid_from_response(response: str) -> Optional[int]:
     """
     从大模型响应中提取分区ID
 
     Args:
         response: 大模型的响应文本
-        zone_list: 所有分区信息列表，用于验证提取的ID是否有效
 
     Returns:
         Optional[int]: 提取的分区ID，如果提取失败或无效则返回None
     """
-    # 构建有效的tid集合，用于验证
-    valid_tids = {zone.get("tid") for zone in zone_list if zone.get("tid") is not None}
+    # 有效的tid集合，进程内只构建一次
+    valid_tids = _valid_tids()
 
     # 方法1: 尝试直接提取数字
-    numbers = re.findall(r"\d+", response)
+    numbers = _ANY_INT_RE.findall(response)
     for num_str in numbers:
         try:
             tid = int(num_str)
@@ -428,7 +599,7 @@ def _extract_zone_tid_from_response(response: str, zone_list: list) -> Optional[
 
     # 方法2: 尝试解析JSON（如果返回的是JSON格式）
     try:
-        parsed = json.loads(response.strip())
+        parsed = orjson.loads(response.strip())
         if isinstance(parsed, dict) and "tid" in parsed:
             tid = int(parsed["tid"])
             if tid in valid_tids:
@@ -436,11 +607,11 @@ def _extract_zone_tid_from_response(response: str, zone_list: list) -> Optional[
         elif isinstance(parsed, int):
             if parsed in valid_tids:
                 return parsed
-    except (json.JSONDecodeError, ValueError, KeyError):
+    except (orjson.JSONDecodeError, ValueError, KeyError):
         pass
 
     # 方法3: 尝试从markdown代码块中提取
-    code_block_match = re.search(r"```(?:json)?\s*(\d+)\s*```", response)
+    code_block_match = _CODE_INT_RE.search(response)
     if code_block_match:
         try:
             tid = int(code_block_match.group(1))
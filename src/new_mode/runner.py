@@ -5,27 +5,53 @@
 此模式只支持一次性运行，不支持定时任务。
 """
 
+import queue
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
 from loguru import logger
 from .content_fetcher import NewContentFetcher
 from .video_maker import NewVideoMaker
-from .publish_video import publish_video
+from .publish_video import prefetch_video_meta, publish_video
 from src.vide_publish import VideoPublisher
-import json
+
+# 流水线阶段结束标记
+_STAGE_DONE = None
 
 
 class NewModeRunner:
     """新模式运行器"""
 
-    def __init__(self, headless: bool = False):
+    def __init__(self, headless: bool = False, max_workers: int = 4):
         """
         初始化新模式运行器
 
         Args:
             headless: 是否使用无头浏览器模式，默认为True
+            max_workers: 同时录制的视频数量上限（每个录制线程一个浏览器），默认为4
         """
         logger.info("新模式运行器初始化开始")
+        self.max_workers = max(1, max_workers)
+
+        # 读取 Chrome cookies（解密、读 SQLite）和构造发布模块与其他模块互不依赖，
+        # 放到后台线程执行，与后续的内容获取重叠；首次使用发布模块时才等待结果
+        init_executor = ThreadPoolExecutor(max_workers=1)
+        self._video_publisher_future: Future = init_executor.submit(self._create_video_publisher)
+        init_executor.shutdown(wait=False)
+
+        # 初始化内容获取模块
+        self.content_fetcher = NewContentFetcher(headless=headless)
+        # 初始化视频生成模块
+        self.video_maker = NewVideoMaker(headless=headless)
+        logger.info("新模式运行器初始化完成")
+
+    @staticmethod
+    def _create_video_publisher() -> VideoPublisher:
+        """
+        获取B站登录凭证（从Chrome cookies）并初始化视频发布模块
 
-        # 在初始化前获取B站登录凭证（从Chrome cookies）
+        Returns:
+            VideoPublisher: 视频发布器实例
+        """
         logger.info("正在从Chrome cookies获取B站登录凭证...")
         from src.utils import get_bilibili_credentials_from_chrome
 
@@ -35,13 +61,13 @@ class NewModeRunner:
         else:
             logger.warning("未能从Chrome cookies获取完整凭证，将使用环境变量或默认值")
 
-        # 初始化内容获取模块
-        self.content_fetcher = NewContentFetcher(headless=headless)
-        # 初始化视频生成模块
-        self.video_maker = NewVideoMaker(headless=headless)
         # 初始化视频发布模块（传入从Chrome获取的凭证）
-        self.video_publisher = VideoPublisher(sessdata=sessdata, bili_jct=bili_jct)
-        logger.info("新模式运行器初始化完成")
+        return VideoPublisher(sessdata=sessdata, bili_jct=bili_jct)
+
+    @property
+    def video_publisher(self) -> VideoPublisher:
+        """视频发布模块，首次访问时等待后台初始化完成"""
+        return self._video_publisher_future.result()
 
     def run(self):
         """
@@ -49,8 +75,9 @@ class NewModeRunner:
 
         工作流程：
         1. 获取内容数据
-        2. 生成视频
+        2. 生成视频（录制 + 处理）
         3. 发布视频
+        其中 2、3 以 录制 -> 处理 -> 发布 流水线执行，录制线程数由 max_workers 控制
         """
         logger.info("=" * 80)
         logger.info("开始执行新模式视频制作流程")
@@ -60,6 +87,10 @@ class NewModeRunner:
             # 1. 获取内容
             logger.info("步骤 1: 开始获取内容数据")
             content = self.content_fetcher.fetch_content()
+            # 录制上下文沿用采集时得到的 cookies / localStorage
+            self.video_maker.storage_state = self.content_fetcher.storage_state()
+            # 内容获取只在流程开始时执行一次，获取完成后即可关闭浏览器
+            self.content_fetcher.close()
 
             if not content.get("success", False):
                 logger.error("内容获取失败，终止流程")
@@ -71,11 +102,12 @@ class NewModeRunner:
                 return
 
             # 提取所有需要处理的视频链接
-            video_items = []
-            for item in json_data:
-                handle_json_data = item.get("handle_json_data")
-                if handle_json_data and handle_json_data.get("url"):
-                    video_items.append(handle_json_data)
+            video_items = [
+                handle_json_data
+                for item in json_data
+                if (handle_json_data := item.get("handle_json_data"))
+                and handle_json_data.get("url")
+            ]
 
             if not video_items:
                 logger.warning("未找到需要处理的视频链接，终止流程")
@@ -83,41 +115,35 @@ class NewModeRunner:
 
             logger.info(f"找到 {len(video_items)} 个需要处理的视频")
 
-            # 2. 逐个生成视频并立即上传
-            success_count = 0
-            for idx, handle_json_data in enumerate(video_items, 1):
-                logger.info("=" * 80)
-                logger.info(
-                    f"处理视频 {idx}/{len(video_items)}: {handle_json_data.get('title', '未知标题')}"
-                )
-                logger.info("=" * 80)
-
-                # 2.1 生成视频
-                logger.info(f"步骤 2.1: 开始生成视频 {idx}")
-                video_result = self.video_maker.generate_single_video(handle_json_data)
-
-                if not video_result:
-                    logger.error(f"视频 {idx} 生成失败，跳过")
-                    continue
-
-                video_path = video_result.get("video_path")
-                if not video_path:
-                    logger.error(f"视频 {idx} 生成失败（无视频路径），跳过")
-                    continue
-
-                logger.info(f"视频 {idx} 生成成功: {video_path}")
+            # 流水线启动前确认发布模块初始化成功，否则发布阶段无法消费队列，上游会一直阻塞
+            try:
+                self.video_publisher
+            except Exception as e:
+                logger.error(f"视频发布模块初始化失败，终止流程: {e}", exc_info=True)
+                return
 
-                # 2.2 立即发布视频
-                logger.info(f"步骤 2.2: 开始发布视频 {idx}")
-                publish_success = publish_video(
-                    video_path, self.video_publisher, handle_json_data=handle_json_data
-                )
+            # 2. 录制 -> 处理 -> 发布 三级流水线，阶段之间用有界队列衔接，
+            # 下一个视频录制的同时处理上一个视频、发布再上一个视频
+            total = len(video_items)
+            record_queue: "queue.Queue" = queue.Queue()
+            for idx, handle_json_data in enumerate(video_items, 1):
+                record_queue.put((idx, handle_json_data))
+            # 队列上限为 2，下游阻塞时上游暂停，避免原始录制文件在磁盘上堆积
+            process_queue: "queue.Queue" = queue.Queue(maxsize=2)
+            publish_queue: "queue.Queue" = queue.Queue(maxsize=2)
 
-                if publish_success:
-                    logger.info(f"视频 {idx} 发布成功")
-                    success_count += 1
-                else:
-                    logger.warning(f"视频 {idx} 发布失败")
+            record_workers = min(self.max_workers, total)
+            with ThreadPoolExecutor(max_workers=record_workers + 2) as executor:
+                publish_future = executor.submit(self._publish_worker, publish_queue, total)
+                executor.submit(self._process_worker, process_queue, publish_queue, total)
+                record_futures = [
+                    executor.submit(self._record_worker, record_queue, process_queue, total)
+                    for _ in range(record_workers)
+                ]
+                # 所有录制线程结束后通知处理阶段收尾，处理阶段再通知发布阶段
+                wait(record_futures)
+                process_queue.put(_STAGE_DONE)
+                success_count = publish_future.result()
 
             logger.info("=" * 80)
             logger.info(
@@ -128,3 +154,111 @@ class NewModeRunner:
         except Exception as e:
             logger.error(f"新模式执行失败: {e}", exc_info=True)
             raise
+
+    def _record_worker(
+        self, record_queue: "queue.Queue", process_queue: "queue.Queue", total: int
+    ) -> None:
+        """
+        录制阶段工作线程：依次录制视频并交给处理阶段，队列为空时关闭本线程的浏览器
+
+        Args:
+            record_queue: 待录制视频队列，元素为 (序号, handle_json_data)
+            process_queue: 待处理视频队列
+            total: 视频总数
+        """
+        try:
+            while True:
+                try:
+                    idx, handle_json_data = record_queue.get_nowait()
+                except queue.Empty:
+                    break
+                logger.info(
+                    f"步骤 2.1: 开始录制视频 {idx}/{total}: {handle_json_data.get('title', '未知标题')}"
+                )
+                try:
+                    raw_video_path = self.video_maker.record_video(handle_json_data)
+                except Exception as e:
+                    logger.error(f"录制视频 {idx} 时发生未捕获的错误: {e}", exc_info=True)
+                    raw_video_path = None
+
+                if not raw_video_path:
+                    logger.error(f"视频 {idx} 录制失败，跳过")
+                    continue
+                process_queue.put((idx, raw_video_path, handle_json_data))
+        finally:
+            # 浏览器实例绑定在本线程上，必须由本线程关闭
+            self.video_maker.close()
+
+    def _process_worker(
+        self, process_queue: "queue.Queue", publish_queue: "queue.Queue", total: int
+    ) -> None:
+        """
+        处理阶段工作线程：裁切视频并添加音频，完成后交给发布阶段
+
+        编码期间在后台线程提前生成标签和分区，大模型调用与 ffmpeg 互不依赖，可以重叠。
+
+        Args:
+            process_queue: 待处理视频队列，元素为 (序号, 原始视频路径, handle_json_data)
+            publish_queue: 待发布视频队列
+            total: 视频总数
+        """
+        try:
+            with ThreadPoolExecutor(max_workers=1) as meta_executor:
+                while True:
+                    task = process_queue.get()
+                    if task is _STAGE_DONE:
+                        break
+                    idx, raw_video_path, handle_json_data = task
+                    logger.info(f"步骤 2.2: 开始处理视频 {idx}/{total}")
+                    meta_executor.submit(prefetch_video_meta, handle_json_data)
+                    try:
+                        video_result = self.video_maker.finalize_video(
+                            raw_video_path, handle_json_data
+                        )
+                    except Exception as e:
+                        logger.error(f"处理视频 {idx} 时发生未捕获的错误: {e}", exc_info=True)
+                        continue
+
+                    video_path = video_result.get("video_path")
+                    if not video_path:
+                        logger.error(f"视频 {idx} 生成失败（无视频路径），跳过")
+                        continue
+
+                    logger.info(f"视频 {idx} 生成成功: {video_path}")
+                    publish_queue.put((idx, video_path, handle_json_data))
+        finally:
+            publish_queue.put(_STAGE_DONE)
+
+    def _publish_worker(self, publish_queue: "queue.Queue", total: int) -> int:
+        """
+        发布阶段工作线程：依次上传视频到B站
+
+        Args:
+            publish_queue: 待发布视频队列，元素为 (序号, 视频路径, handle_json_data)
+            total: 视频总数
+
+        Returns:
+            int: 发布成功的视频数量
+        """
+        success_count = 0
+        while True:
+            task = publish_queue.get()
+            if task is _STAGE_DONE:
+                break
+            idx, video_path, handle_json_data = task
+            logger.info(f"步骤 2.3: 开始发布视频 {idx}/{total}")
+            # 单个视频发布出错时继续消费队列直到收到结束标记，避免上游阶段阻塞在 put 上
+            try:
+                publish_success = publish_video(
+                    video_path, self.video_publisher, handle_json_data=handle_json_data
+                )
+            except Exception as e:
+                logger.error(f"发布视频 {idx} 时发生未捕获的错误: {e}", exc_info=True)
+                continue
+
+            if publish_success:
+                logger.info(f"视频 {idx} 发布成功")
+                success_count += 1
+            else:
+                logger.warning(f"视频 {idx} 发布失败")
+        return success_count
@@ -5,20 +5,63 @@
 包括视频录制、视频预处理（帧数转换、格式转换等）、视频合成等功能。
 """
 
+import threading
 import time
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 from loguru import logger
-from playwright.sync_api import Browser, BrowserContext, Page, sync_playwright
+from playwright.sync_api import (
+    Browser,
+    BrowserContext,
+    Page,
+    TimeoutError as PlaywrightTimeoutError,
+    sync_playwright,
+)
 
 from src.utils.video_processor import VideoProcessor
+from src.utils.browser import CHROMIUM_LAUNCH_ARGS
 
 # 设置环境变量，禁用 Playwright 的 asyncio 事件循环检查
 os.environ["PLAYWRIGHT_SKIP_BROWSER_DOWNLOAD"] = "0"
 
+# 评论段落的选择器，用于判断页面内容是否已渲染
+_COMMENT_SELECTOR = "p.score-group_score-group-comment__0jLQY"
+
+# 保证评论内容完整显示：评论段落高度自适应、子 span 正常换行。
+# 以 init script 注册到录制上下文，页面脚本执行前即通过 adoptedStyleSheets 生效，
+# 对之后才渲染的评论同样适用，且样式表不在 DOM 中，不受页面水合影响
+_COMMENT_STYLE_INIT_SCRIPT = """
+(() => {
+    const sheet = new CSSStyleSheet();
+    sheet.replaceSync(`
+        %(selector)s { height: auto !important; }
+        %(selector)s span { white-space: normal !important; }
+    `);
+    document.adoptedStyleSheets = [...document.adoptedStyleSheets, sheet];
+})();
+""" % {"selector": _COMMENT_SELECTOR}
+
+# 后台删除原始录制文件，避免删除大文件的耗时阻塞录制/处理流程
+_DELETE_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="video-cleanup")
+
+
+def _delete_file(path: Path) -> None:
+    """
+    删除文件（在后台线程中执行）
+
+    Args:
+        path: 要删除的文件路径
+    """
+    try:
+        path.unlink()
+        logger.info(f"已删除原始录制文件: {path}")
+    except Exception as e:
+        logger.warning(f"删除原始录制文件失败: {e}")
+
 
 class NewVideoMaker:
     """新模式视频生成器"""
@@ -31,8 +74,103 @@ class NewVideoMaker:
             headless: 是否使用无头浏览器模式，默认为True
         """
         self.headless = headless
+        # 新建录制上下文时注入的 cookies / localStorage（由内容获取器导出）
+        self.storage_state: Optional[Dict[str, Any]] = None
+        # Playwright 同步 API 绑定创建它的线程，因此按线程保存浏览器实例
+        self._local = threading.local()
         logger.info(f"新模式视频生成器初始化完成 (headless={headless})")
 
+    def _get_browser(self) -> Browser:
+        """
+        获取当前线程复用的浏览器实例，首次调用时启动
+
+        Returns:
+            Browser: 浏览器实例
+        """
+        browser = getattr(self._local, "browser", None)
+        if browser is None or not browser.is_connected():
+            if getattr(self._local, "playwright", None) is None:
+                self._local.playwright = sync_playwright().start()
+            browser = self._local.playwright.chromium.launch(
+                headless=self.headless, args=CHROMIUM_LAUNCH_ARGS
+            )
+            self._local.browser = browser
+            # 旧浏览器上的上下文已失效
+            self._local.context = None
+            logger.info("浏览器启动成功")
+        return browser
+
+    def _get_context(self, video_dir: Path) -> BrowserContext:
+        """
+        获取当前线程复用的录制上下文，首次调用时创建
+
+        设备模拟参数和录制配置对所有视频都相同，只需创建一次。
+
+        Args:
+            video_dir: 视频录制目录
+
+        Returns:
+            BrowserContext: 浏览器上下文
+        """
+        browser = self._get_browser()
+        context = getattr(self._local, "context", None)
+        if context is None:
+            # 配置为 iPhone SE 移动端设备（与NBA模块保持一致）
+            context = browser.new_context(
+                viewport={
+                    "width": 430,
+                    "height": 932,
+                },
+                user_agent=(
+                    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) "
+                    "AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1"
+                ),
+                device_scale_factor=3,  # Retina 屏幕
+                is_mobile=True,
+                has_touch=True,
+                storage_state=self.storage_state,
+                # 开启视频录制
+                record_video_dir=str(video_dir),
+                # 录制分辨率（约等于 viewport * device_scale_factor）
+                record_video_size={"width": 860, "height": 1864},
+            )
+            context.add_init_script(_COMMENT_STYLE_INIT_SCRIPT)
+            self._local.context = context
+            logger.info("录制上下文创建成功")
+        return context
+
+    def close(self):
+        """关闭当前线程的录制上下文、浏览器实例并停止 Playwright"""
+        context = getattr(self._local, "context", None)
+        if context is not None:
+            try:
+                context.close()
+            except Exception as e:
+                logger.warning(f"关闭浏览器上下文时出现问题: {e}")
+            self._local.context = None
+
+        browser = getattr(self._local, "browser", None)
+        if browser is not None:
+            try:
+                browser.close()
+            except Exception as e:
+                logger.warning(f"关闭浏览器实例时出错: {e}")
+            self._local.browser = None
+
+        playwright = getattr(self._local, "playwright", None)
+        if playwright is not None:
+            try:
+                playwright.stop()
+            except Exception as e:
+                logger.warning(f"停止 Playwright 时出错: {e}")
+            self._local.playwright = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def generate_video(self, content: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
         """
         生成视频
@@ -58,11 +196,11 @@ class NewVideoMaker:
             return None
 
         # 提取所有需要录制的链接
-        video_urls = []
-        for item in json_data:
-            handle_json_data = item.get("handle_json_data")
-            if handle_json_data and handle_json_data.get("url"):
-                video_urls.append(handle_json_data)
+        video_urls = [
+            handle_json_data
+            for item in json_data
+            if (handle_json_data := item.get("handle_json_data")) and handle_json_data.get("url")
+        ]
 
         if not video_urls:
             logger.warning("未找到需要录制的视频链接")
@@ -104,12 +242,8 @@ class NewVideoMaker:
                 )
                 logger.info(f"视频处理完成: {processed_video_path}")
 
-                # 删除原始录制的视频文件（已经处理完成）
-                try:
-                    Path(raw_video_path).unlink()
-                    logger.info(f"已删除原始录制文件: {raw_video_path}")
-                except Exception as e:
-                    logger.warning(f"删除原始录制文件失败: {e}")
+                # 删除原始录制的视频文件（已经处理完成），放到后台线程执行，不阻塞流水线
+                _DELETE_EXECUTOR.submit(_delete_file, Path(raw_video_path))
             else:
                 logger.error(f"视频处理失败: {title}")
                 # 处理失败，但至少保留原始录制的视频
@@ -126,7 +260,7 @@ class NewVideoMaker:
 
     def generate_single_video(self, handle_json_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
-        生成单个视频
+        生成单个视频（录制 + 处理）
 
         Args:
             handle_json_data: 单个视频的原始数据信息，包含：
@@ -140,6 +274,24 @@ class NewVideoMaker:
                 - handle_json_data: 对应的原始数据信息
             如果失败返回None
         """
+        raw_video_path = self.record_video(handle_json_data)
+        if not raw_video_path:
+            return None
+
+        return self.finalize_video(raw_video_path, handle_json_data)
+
+    def record_video(self, handle_json_data: Dict[str, Any]) -> Optional[str]:
+        """
+        录制单个视频的原始文件
+
+        需要浏览器，只能在调用线程自己的浏览器实例上执行。
+
+        Args:
+            handle_json_data: 单个视频的原始数据信息，包含 url、title、itemId
+
+        Returns:
+            Optional[str]: 原始录制视频路径，如果失败返回None
+        """
         if not handle_json_data:
             logger.error("handle_json_data 为空，无法生成视频")
             return None
@@ -159,31 +311,42 @@ class NewVideoMaker:
         video_dir = Path("materials/videos")
         video_dir.mkdir(parents=True, exist_ok=True)
 
-        # 1. 录制视频
         raw_video_path = self._record_video(url, item_id, video_dir)
         if not raw_video_path:
             logger.error(f"视频录制失败: {title}")
             return None
 
         logger.info(f"视频录制成功: {raw_video_path}")
+        return raw_video_path
+
+    def finalize_video(
+        self, raw_video_path: str, handle_json_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        处理录制好的视频（裁切头部区域 + 添加背景音乐），成功后删除原始录制文件
+
+        不依赖浏览器，可在任意线程执行。
 
-        # 2. 处理视频（裁切头部区域 + 添加背景音乐）
+        Args:
+            raw_video_path: 原始录制视频路径
+            handle_json_data: 视频对应的原始数据信息
+
+        Returns:
+            Dict[str, Any]: 视频信息，包含 video_path 和 handle_json_data；
+                处理失败时 video_path 为原始录制视频
+        """
         logger.info(f"开始处理视频: 裁切和添加音频")
         processed_video_path = self.process_video(raw_video_path, crop_top=200)
 
         if processed_video_path:
             logger.info(f"视频处理完成: {processed_video_path}")
 
-            # 删除原始录制的视频文件（已经处理完成）
-            try:
-                Path(raw_video_path).unlink()
-                logger.info(f"已删除原始录制文件: {raw_video_path}")
-            except Exception as e:
-                logger.warning(f"删除原始录制文件失败: {e}")
+            # 删除原始录制的视频文件（已经处理完成），放到后台线程执行，不阻塞流水线
+            _DELETE_EXECUTOR.submit(_delete_file, Path(raw_video_path))
 
             return {"video_path": processed_video_path, "handle_json_data": handle_json_data}
         else:
-            logger.error(f"视频处理失败: {title}")
+            logger.error(f"视频处理失败: {handle_json_data.get('title', 'video')}")
             # 处理失败，但至少保留原始录制的视频
             return {"video_path": raw_video_path, "handle_json_data": handle_json_data}
 
@@ -199,177 +362,118 @@ class NewVideoMaker:
         Returns:
             Optional[str]: 录制成功的视频路径，如果失败返回None
         """
+        page: Optional[Page] = None
         try:
-            with sync_playwright() as playwright:
-                # 1. 启动浏览器
-                browser = playwright.chromium.launch(headless=self.headless)
-                logger.info("浏览器启动成功")
-
-                # 生成视频文件名（使用项目ID和时间戳）
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                video_filename = f"{item_id}_{timestamp}.webm"
-                final_video_path: Optional[Path] = None
-
-                # 配置为 iPhone SE 移动端设备（与NBA模块保持一致）
-                context = browser.new_context(
-                    viewport={
-                        "width": 430,
-                        "height": 932,
-                    },
-                    user_agent=(
-                        "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) "
-                        "AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1"
-                    ),
-                    device_scale_factor=3,  # Retina 屏幕
-                    is_mobile=True,
-                    has_touch=True,
-                    # 开启视频录制
-                    record_video_dir=str(video_dir),
-                    # 录制分辨率（约等于 viewport * device_scale_factor）
-                    record_video_size={"width": 860, "height": 1864},
-                )
+            # 1. 复用当前线程的浏览器实例和录制上下文，每个视频只新建一个页面
+            context = self._get_context(video_dir)
 
-                page = context.new_page()
+            # 生成视频文件名（使用项目ID和时间戳）
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            video_filename = f"{item_id}_{timestamp}.webm"
+            final_video_path: Optional[Path] = None
 
-                # 2. 打开目标链接
-                logger.info(f"正在打开目标链接: {url}")
-                page.goto(url, wait_until="networkidle", timeout=60000)
-                logger.info(f"页面加载完成: {page.url}")
+            page = context.new_page()
 
-                # 等待页面完全加载
-                time.sleep(2)
+            # 2. 打开目标链接
+            logger.info(f"正在打开目标链接: {url}")
+            # 页面埋点请求会持续发出，不等待 networkidle，DOM 就绪后直接等待评论内容渲染
+            page.goto(url, wait_until="domcontentloaded", timeout=60000)
+            logger.info(f"页面加载完成: {page.url}")
 
-                # 3. 视频生成前的准备工作：保证评论内容完整显示
-                logger.info("开始修改页面元素样式，使评论内容完整显示...")
-                try:
-                    page.evaluate(
-                        """
-                        () => {
-                            // 将所有 score-group-comment 的 p 元素高度设为 auto
-                            const commentParagraphs = document.querySelectorAll('p.score-group_score-group-comment__0jLQY');
-                            commentParagraphs.forEach(p => {
-                                p.style.height = 'auto';
-
-                                // 将子 span 的 white-space 设为 normal，允许正常换行
-                                const spans = p.querySelectorAll('span');
-                                spans.forEach(span => {
-                                    span.style.whiteSpace = 'normal';
-                                });
-                            });
-                        }
+            try:
+                page.wait_for_selector(_COMMENT_SELECTOR, state="visible", timeout=15000)
+            except PlaywrightTimeoutError:
+                logger.warning("等待评论内容超时，继续录制")
+
+            # 3. 视频录制过程中的平滑向下滚动
+            # （评论完整显示所需的样式已由录制上下文的 init script 注入）
+            logger.info("开始执行页面平滑滚动（requestAnimationFrame，40秒）...")
+            try:
+                # 获取页面尺寸，鼠标停在页面中心保持悬停状态
+                viewport_size = page.viewport_size
+                page_width = viewport_size["width"]
+                page_height = viewport_size["height"]
+                center_x = page_width // 2
+                center_y = page_height // 2
+                page.mouse.move(center_x, center_y)
+
+                total_duration = 40  # 总时长（秒）
+                logger.info(
+                    "页面尺寸: {}x{}, 中心点: ({}, {}), 滚动时长: {}s",
+                    page_width,
+                    page_height,
+                    center_x,
+                    center_y,
+                    total_duration,
+                )
+
+                # 在页面内用 requestAnimationFrame 驱动滚动，只需一次 RPC 往返，
+                # 滚动节奏与合成器帧同步，录制画面更平滑。
+                # 可滚动距离在页面内按 body 总高度计算，不再单独往返读取，结束后一并返回
+                body_height, total_scrollable_distance = page.evaluate(
                     """
-                    )
-                    logger.info("页面元素样式修改完成")
-                    time.sleep(0.5)  # 等待样式应用
-                except Exception as e:
-                    logger.warning(f"修改页面元素样式失败（可能页面结构不同）: {e}")
-
-                # 4. 视频录制过程中的平滑向下滚动
-                logger.info("开始执行鼠标滚轮平滑滑动（60fps，40秒）...")
-                try:
-                    # 获取页面尺寸
-                    viewport_size = page.viewport_size
-                    page_width = viewport_size["width"]
-                    page_height = viewport_size["height"]
-                    center_x = page_width // 2
-                    center_y = page_height // 2
-                    page.mouse.move(center_x, center_y)
-                    logger.info(
-                        f"页面尺寸: {page_width}x{page_height}, 中心点: ({center_x}, {center_y})"
-                    )
-
-                    # 获取 body 的总高度
-                    body_height = page.evaluate("() => document.body.scrollHeight")
-                    viewport_height = page_height
-                    total_scrollable_distance = body_height - viewport_height
-                    logger.info(
-                        f"Body总高度: {body_height}px, 视口高度: {viewport_height}px, "
-                        f"可滚动距离: {total_scrollable_distance}px"
-                    )
-
-                    # 平滑滚动配置：60fps，40秒
-                    total_duration = 40  # 总时长（秒）
-                    fps = 60  # 帧率
-                    total_frames = total_duration * fps  # 2400 帧
-
-                    # 计算每一帧需要滚动的距离
-                    delta_per_frame = total_scrollable_distance / total_frames
-                    logger.info(
-                        f"平滑滚动配置: 时长={total_duration}s, 帧率={fps}, "
-                        f"总帧数={total_frames}, 每帧滚动={delta_per_frame:.3f}px, "
-                        f"总滚动距离={total_scrollable_distance:.1f}px"
-                    )
-
-                    frame_interval = 1.0 / fps
-                    start_time = time.time()
-
-                    for frame in range(total_frames):
-                        # 执行一次小幅度滚动（正值向下）
-                        page.mouse.wheel(0, delta_per_frame)
-
-                        # 按理想帧时间对齐，保证整体接近 60fps 和 40s
-                        target_time = start_time + (frame + 1) * frame_interval
-                        now = time.time()
-                        sleep_time = target_time - now
-                        if sleep_time > 0:
-                            time.sleep(sleep_time)
-
-                        # 每 2 秒输出一次进度日志（约每 120 帧）
-                        if frame % (fps * 2) == 0:
-                            progress = (frame / total_frames) * 100
-                            logger.info(
-                                f"滚动进度: {progress:.1f}% "
-                                f"({frame}/{total_frames} 帧，累计滚动约 {delta_per_frame * frame:.1f} 像素)"
-                            )
-
-                    logger.info("鼠标滚轮平滑滑动完成（约40秒，60fps）")
-                    time.sleep(1.0)  # 滚动结束后稍等，确保内容稳定
-                except Exception as e:
-                    logger.error(f"平滑滚动过程出错: {e}", exc_info=True)
-
-                # 5. 关闭页面和上下文，保存视频
-                logger.info("开始关闭页面和浏览器上下文，并保存视频文件...")
-                try:
-                    page.close()
-                except Exception as e:
-                    logger.warning(f"关闭页面时出现问题: {e}")
+                    ([duration, viewportHeight]) => new Promise((resolve) => {
+                        const bodyHeight = document.body.scrollHeight;
+                        const totalDistance = Math.max(bodyHeight - viewportHeight, 0);
+                        let startTime = null;
+                        function step(now) {
+                            if (startTime === null) {
+                                startTime = now;
+                            }
+                            const progress = Math.min((now - startTime) / duration, 1);
+                            window.scrollTo(0, totalDistance * progress);
+                            if (progress < 1) {
+                                requestAnimationFrame(step);
+                            } else {
+                                resolve([bodyHeight, totalDistance]);
+                            }
+                        }
+                        requestAnimationFrame(step);
+                    })
+                """,
+                    [total_duration * 1000, page_height],
+                )
 
-                try:
-                    context.close()
-                except Exception as e:
-                    logger.warning(f"关闭浏览器上下文时出现问题: {e}")
+                logger.info(f"Body总高度: {body_height}px, 滚动距离: {total_scrollable_distance}px")
+                logger.info("页面平滑滚动完成（约40秒）")
+                time.sleep(1.0)  # 滚动结束后稍等，确保内容稳定
+            except Exception as e:
+                logger.error(f"平滑滚动过程出错: {e}", exc_info=True)
 
-                # 等待视频文件写入完成
-                time.sleep(2)
+            # 4. 关闭页面，保存视频（上下文保留复用，每个页面单独生成一个 .webm）
+            logger.info("开始关闭页面，并保存视频文件...")
+            try:
+                page.close()
+            except Exception as e:
+                logger.warning(f"关闭页面时出现问题: {e}")
 
-                try:
-                    video_files = list(video_dir.glob("*.webm"))
-                    if video_files:
-                        latest_video = max(video_files, key=lambda p: p.stat().st_mtime)
-                        logger.info(f"检测到录制视频文件: {latest_video}")
-
-                        final_video_path = video_dir / video_filename
-                        if latest_video != final_video_path:
-                            latest_video.rename(final_video_path)
-                            logger.info(f"视频文件已重命名为: {final_video_path}")
-                        else:
-                            logger.info(f"视频文件已使用目标文件名保存: {final_video_path}")
-                    else:
-                        logger.warning("未在视频目录中找到任何 .webm 文件")
-                        return None
-                except Exception as e:
-                    logger.error(f"处理录制视频文件时出错: {e}", exc_info=True)
+            # save_as 会等待本页面的视频写入完成；按页面取录制文件，
+            # 并发录制时同一目录下同时存在多个 .webm 也不会取错
+            try:
+                if not page.video:
+                    logger.warning("未找到本次录制的 .webm 文件")
                     return None
 
-                try:
-                    browser.close()
-                except Exception as e:
-                    logger.warning(f"关闭浏览器实例时出错: {e}")
+                final_video_path = video_dir / video_filename
+                page.video.save_as(final_video_path)
+                page.video.delete()
+                logger.info(f"视频文件已保存为: {final_video_path}")
+            except Exception as e:
+                logger.error(f"处理录制视频文件时出错: {e}", exc_info=True)
+                return None
 
-                return str(final_video_path) if final_video_path else None
+            return str(final_video_path) if final_video_path else None
 
         except Exception as e:
             logger.error(f"录制视频时发生错误: {e}", exc_info=True)
+            # 上下文会继续复用，出错时关闭本次的页面并删除未完成的录制文件
+            if page is not None:
+                try:
+                    page.close()
+                    if page.video:
+                        page.video.delete()
+                except Exception:
+                    pass
             return None
 
     def process_video(self, video_path: str, crop_top: int = 200) -> Optional[str]:
@@ -394,27 +498,16 @@ class NewVideoMaker:
 
         logger.info(f"开始处理视频: {video_path}")
 
-        # 用于存储中间文件路径，处理成功后删除
-        intermediate_files = []
-
         try:
-            # 1. 裁切视频，将头部指定px的区域裁切掉
-            cropped_video_path = VideoProcessor.crop_video(video_path, crop_top=crop_top)
-            if not cropped_video_path:
-                logger.error("视频裁切失败")
-                return None
-            intermediate_files.append(cropped_video_path)
-
-            # 2. 将音频添加到视频中
+            # 裁切头部指定px的区域并添加音频，一次 ffmpeg 调用完成，不产生中间文件
             audio_path = Path("materials/audio/bgm.mp3")
-            final_video_path = VideoProcessor.add_audio_to_video(cropped_video_path, audio_path)
+            final_video_path = VideoProcessor.crop_and_add_audio(
+                video_path, audio_path, crop_top=crop_top
+            )
             if not final_video_path:
-                logger.error("音频合并失败")
+                logger.error("视频裁切和音频合并失败")
                 return None
 
-            # 处理成功，删除中间文件
-            VideoProcessor.cleanup_intermediate_files(intermediate_files)
-
             logger.info(f"视频处理完成: {final_video_path}")
             return str(final_video_path)
 
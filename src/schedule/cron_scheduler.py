@@ -3,6 +3,9 @@
 使用APScheduler实现定时任务
 """
 
+import os
+import shutil
+import threading
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -121,21 +124,40 @@ class CronScheduler:
         try:
             videos_dir = Path("materials/videos")
             if videos_dir.exists():
-                deleted_count = 0
-                for file_path in videos_dir.iterdir():
-                    if file_path.is_file():
-                        try:
-                            file_path.unlink()
-                            deleted_count += 1
-                            logger.debug(f"已删除文件: {file_path.name}")
-                        except Exception as e:
-                            logger.error(f"删除文件失败 {file_path.name}: {e}")
-                logger.info(f"已清理 videos 目录，共删除 {deleted_count} 个文件")
+                # 先把目录原子地改名移走并立即重建，再在后台线程中删除旧目录，
+                # 删除大量文件的耗时不阻塞调度线程
+                trash_dir = videos_dir.with_name(
+                    f"{videos_dir.name}.trash-{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+                )
+                videos_dir.rename(trash_dir)
+                videos_dir.mkdir(parents=True, exist_ok=True)
+                logger.info("已清理 videos 目录")
             else:
                 logger.warning(f"videos 目录不存在: {videos_dir}")
+
+            # 一并删除之前因进程退出而未删完的旧目录
+            # 单次 scandir 遍历，DirEntry 自带类型信息，无需逐个 stat
+            trash_prefix = f"{videos_dir.name}.trash-"
+            with os.scandir(videos_dir.parent) as entries:
+                trash_dirs = [
+                    Path(entry.path)
+                    for entry in entries
+                    if entry.name.startswith(trash_prefix) and entry.is_dir(follow_symlinks=False)
+                ]
+            if trash_dirs:
+                threading.Thread(
+                    target=self._remove_dirs, args=(trash_dirs,), name="video-cleanup", daemon=True
+                ).start()
         except Exception as e:
             logger.error(f"清理视频文件失败: {e}")
 
+    @staticmethod
+    def _remove_dirs(dirs: list[Path]):
+        """在后台删除目录"""
+        for path in dirs:
+            shutil.rmtree(path, ignore_errors=True)
+        logger.debug(f"已在后台删除 {len(dirs)} 个旧视频目录")
+
     def start(self):
         """启动定时任务调度器"""
         logger.info("=" * 80)
@@ -2,15 +2,81 @@
 NBA比赛信息获取模块
 """
 
-import json
+import itertools
 import re
-from datetime import datetime
-from typing import Any, List, Optional
-from uuid import uuid4
+import threading
+import time
+from datetime import date
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+import orjson
 import requests
-from bs4 import BeautifulSoup
 from loguru import logger
+from lxml import etree, html as lxml_html
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 赛程页面缓存有效期（秒）：同一轮检查中逐场查询状态时复用同一次请求的结果
+_PAGE_CACHE_TTL = 30
+
+# 流式读取响应时每次交给解析器的字节数
+_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _class_xpath(tag: str, class_name: str, descendant: bool = True) -> str:
+    """生成按 class 名匹配元素的 XPath 片段（与 class 属性中的任意一个类名匹配）"""
+    prefix = ".//" if descendant else "//"
+    return f'{prefix}{tag}[contains(concat(" ", normalize-space(@class), " "), " {class_name} ")]'
+
+
+# 预编译 XPath，lxml 在 C 层完成查找，比 BeautifulSoup 的 Python 树遍历快一个数量级
+_NEXT_DATA_XPATH = etree.XPath('//script[@id="__NEXT_DATA__"][@type="application/json"]')
+_MATCH_ITEMS_XPATH = etree.XPath(
+    _class_xpath("div", "match-item", descendant=False) + "[@data-match]"
+)
+_MEND_XPATH = etree.XPath(_class_xpath("div", "mend"))
+_STATUS_SPAN_XPATH = etree.XPath(_class_xpath("span", "text-m-bold"))
+_LINK_XPATH = etree.XPath(".//a")
+
+# 比赛ID后缀：进程启动时间（十六进制）+ 进程内自增序号，保证唯一且无需每次生成 uuid
+_PROCESS_EPOCH = int(time.time())
+_GAME_ID_COUNTER = itertools.count()
+# 比赛ID中队名的空格替换为下划线
+_SPACE_TO_UNDERSCORE = str.maketrans(" ", "_")
+
+# 虎扑 JSON 的驼峰字段 -> GameInfo 使用的下划线字段，解析赛程时统一补齐
+_GAME_FIELD_ALIASES = {
+    "homeTeamName": "home_team_name",
+    "awayTeamName": "away_team_name",
+    "homeScore": "home_score",
+    "awayScore": "away_score",
+    "competitionStageDesc": "competition_stage_desc",
+    "matchStatus": "match_status",
+    "matchId": "match_id",
+}
+
+# 评分数量文本，如 "4.4万评分"、"1234评分"
+_RATING_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(万?)")
+
+
+@lru_cache(maxsize=1)
+def _date_keys(day: date) -> Tuple[str, str]:
+    """
+    格式化日期，同一天内只格式化一次
+
+    Args:
+        day: 日期
+
+    Returns:
+        Tuple[str, str]: ("2025-12-22", "20251222")
+    """
+    return day.isoformat(), day.strftime("%Y%m%d")
+
+
+def _text(element) -> str:
+    """提取元素内全部文本，去除各段首尾空白后拼接"""
+    return "".join(text.strip() for text in element.itertext())
 
 
 class GameFetcher:
@@ -19,6 +85,14 @@ class GameFetcher:
     def __init__(self):
         self.base_url = "https://m.hupu.com/nba/schedule"
         self.session = requests.Session()
+        # 轮询比赛状态时复用 TCP/TLS 连接，偶发的 5xx 自动重试
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=32,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.session.headers.update(
             {
                 "User-Agent": (
@@ -28,6 +102,68 @@ class GameFetcher:
                 )
             }
         )
+        # url -> (获取时间, 解析后的页面)
+        self._page_cache: Dict[str, Tuple[float, lxml_html.HtmlElement]] = {}
+        self._page_cache_lock = threading.Lock()
+        # 赛程页面中 match_id -> 比赛元素 的索引，随页面缓存一起更新
+        self._match_index_tree: Optional[lxml_html.HtmlElement] = None
+        self._match_index: Dict[str, lxml_html.HtmlElement] = {}
+        # 当天比赛列表的解析结果：(页面根节点, 日期, 比赛列表)，页面未重新请求时直接复用
+        self._schedule_memo: Optional[Tuple[lxml_html.HtmlElement, str, List[dict]]] = None
+
+    def _get_page(self, url: str, refresh: bool = False) -> lxml_html.HtmlElement:
+        """
+        获取并解析页面，_PAGE_CACHE_TTL 秒内重复请求同一 URL 时直接复用缓存
+
+        Args:
+            url: 页面URL
+            refresh: 是否忽略缓存强制重新请求
+
+        Returns:
+            lxml_html.HtmlElement: 解析后的页面根节点
+
+        Raises:
+            requests.RequestException: 请求失败时抛出（失败的响应不会被缓存）
+        """
+        with self._page_cache_lock:
+            cached = self._page_cache.get(url)
+            if not refresh and cached and time.monotonic() - cached[0] < _PAGE_CACHE_TTL:
+                logger.debug(f"使用缓存的页面: {url}")
+                return cached[1]
+
+            self._page_cache.pop(url, None)
+            logger.info(f"正在请求: {url}")
+            # 边下载边解析：按块把响应字节直接喂给 lxml，不再整体读入后解码为 str
+            with self.session.get(url, timeout=10, stream=True) as response:
+                response.raise_for_status()
+                # 页面固定为 UTF-8 编码；增量解析器带有状态，每次请求新建一个
+                parser = lxml_html.HTMLParser(encoding="utf-8")
+                for chunk in response.iter_content(chunk_size=_STREAM_CHUNK_SIZE):
+                    parser.feed(chunk)
+                tree = parser.close()
+
+            self._page_cache[url] = (time.monotonic(), tree)
+            return tree
+
+    def _get_match_elements(self) -> Dict[str, lxml_html.HtmlElement]:
+        """
+        获取赛程页面中 match_id -> 比赛元素 的索引
+
+        索引与缓存的页面绑定，页面未重新请求时直接复用，
+        一轮检查中逐场查询状态也只需遍历一次比赛元素。
+
+        Returns:
+            Dict[str, lxml_html.HtmlElement]: match_id -> 比赛元素 (div.match-item)
+        """
+        tree = self._get_page(self.base_url)
+        with self._page_cache_lock:
+            if self._match_index_tree is not tree:
+                match_index = {}
+                for element in _MATCH_ITEMS_XPATH(tree):
+                    match_index.setdefault(element.get("data-match"), element)
+                self._match_index = match_index
+                self._match_index_tree = tree
+            return self._match_index
 
     def get_today_nba_games(self) -> List[dict]:
         """
@@ -45,7 +181,7 @@ class GameFetcher:
                 - source_url: 来源URL（可选）
         """
         try:
-            today = datetime.now().strftime("%Y-%m-%d")
+            today = _date_keys(date.today())[0]
             logger.info(f"开始获取 {today} 的NBA比赛信息")
 
             # 尝试从虎扑NBA页面获取比赛信息
@@ -55,7 +191,6 @@ class GameFetcher:
                 logger.warning("未能从虎扑获取到比赛信息，返回空列表")
                 return []
 
-            print(len(games), "games")
             # 为每场比赛生成唯一ID
             for game in games:
                 if "game_id" not in game or not game["game_id"]:
@@ -77,56 +212,59 @@ class GameFetcher:
             List[dict]: 比赛信息列表
         """
         try:
-            # 虎扑NBA赛程页面URL
-            url = self.base_url
-            logger.info(f"正在请求: {url}")
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
+            # 虎扑NBA赛程页面
+            tree = self._get_page(self.base_url)
 
-            # 设置正确的编码
-            response.encoding = "utf-8"
+            # 同一份页面、同一天内重复调用时跳过 JSON 解析，
+            # 已生成的 game_id 也随之保留，重复调用得到的比赛ID一致
+            today = _date_keys(date.today())[1]
+            memo = self._schedule_memo
+            if memo and memo[0] is tree and memo[1] == today:
+                return list(memo[2])
 
-            # 解析HTML获取比赛信息
-            games = self._parse_hupu_schedule(response.text)
+            # 解析页面获取比赛信息
+            games = self._parse_hupu_schedule(tree)
+            self._schedule_memo = (tree, today, games)
 
-            return games
+            return list(games)
 
         except requests.RequestException as e:
             logger.error(f"请求虎扑网站失败: {e}")
             return []
 
-    def _parse_hupu_schedule(self, html: str) -> List[dict]:
+    def _parse_hupu_schedule(self, tree: lxml_html.HtmlElement) -> List[dict]:
         """
-        解析虎扑赛程页面HTML，提取当天的比赛信息
+        解析虎扑赛程页面，提取当天的比赛信息
 
         Args:
-            html: HTML内容
+            tree: 解析后的赛程页面根节点
 
         Returns:
             List[dict]: 比赛信息列表
         """
 
         try:
-            soup = BeautifulSoup(html, "lxml")
-            games = []
-            today = datetime.now().strftime("%Y-%m-%d")
+            # 日期格式为 20251222
+            today = _date_keys(date.today())[1]
 
-            # 将日期转换为 20251222这样的格式
-            today = today.replace("-", "")
-
-            # 从soup中获取script标签
-            today_schedule = soup.find("script", id="__NEXT_DATA__", type="application/json")
+            # 从页面中获取script标签
+            today_schedule = _NEXT_DATA_XPATH(tree)[0]
             # 从 today_schedule 中提取对象数据
-            today_schedule_data = json.loads(today_schedule.get_text())
+            today_schedule_data = orjson.loads(today_schedule.text)
 
             props = today_schedule_data.get("props", {})
             pageProps = props.get("pageProps", {})
             gameList = pageProps.get("gameList", [])
 
-            for game in gameList:
-                if game.get("day") == today:
-                    games = game.get("matchList")
+            # 按日期建立索引，直接取当天的比赛列表
+            match_list_by_day = {game.get("day"): game.get("matchList") for game in gameList}
+            games = match_list_by_day.get(today) or []
 
+            # 保留原始驼峰字段，同时补齐下划线字段，下游只需按下划线字段读取
+            for game in games:
+                for camel_key, snake_key in _GAME_FIELD_ALIASES.items():
+                    if camel_key in game and not game.get(snake_key):
+                        game[snake_key] = game[camel_key]
             return games
 
         except Exception as e:
@@ -147,14 +285,14 @@ class GameFetcher:
             str: 唯一标识符
         """
         # 使用比赛信息生成唯一ID
-        # 格式: {date}_{home_team}_{away_team}_{uuid}
-        home = game_info.get("homeTeamName", "").replace(" ", "_")
-        away = game_info.get("awayTeamName", "").replace(" ", "_")
-        uuid_part = str(uuid4())[:8]
+        # 格式: {date}_{away_team}_vs_{home_team}_{suffix}
+        home = game_info.get("home_team_name", "").translate(_SPACE_TO_UNDERSCORE)
+        away = game_info.get("away_team_name", "").translate(_SPACE_TO_UNDERSCORE)
+        suffix = f"{_PROCESS_EPOCH:x}{next(_GAME_ID_COUNTER):04x}"
 
-        game_id = f"{date}_{away}_vs_{home}_{uuid_part}"
+        game_id = f"{date}_{away}_vs_{home}_{suffix}"
 
-        print(game_id, "game_id")
+        logger.debug(f"生成比赛ID: {game_id}")
         return game_id
 
     def get_game_status(self, match_id: str) -> Optional[dict]:
@@ -169,63 +307,83 @@ class GameFetcher:
                 - status: 比赛状态 - "未开始"/"进行中"/"已结束"
                 - rating_count: 评分数量（整数），如果无法解析返回0
         """
+        return self.get_game_statuses([match_id]).get(match_id)
+
+    def get_game_statuses(self, match_ids: Iterable[str]) -> Dict[str, Optional[dict]]:
+        """
+        批量获取多场比赛的当前状态和评分数量，只请求一次页面
+
+        Args:
+            match_ids: 比赛ID列表 (data-match属性值)
+
+        Returns:
+            Dict[str, Optional[dict]]: match_id -> 状态字典（字段同 get_game_status），
+                获取失败的比赛对应 None
+        """
+        match_ids = list(match_ids)
+        results: Dict[str, Optional[dict]] = dict.fromkeys(match_ids)
         try:
-            url = self.base_url
-            logger.info(f"正在获取比赛 {match_id} 的状态，请求URL: {url}")
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            response.encoding = "utf-8"
-
-            soup = BeautifulSoup(response.text, "lxml")
-
-            # 查找指定match_id的比赛元素
-            match_element = soup.find("div", {"class": "match-item", "data-match": match_id})
-
-            if not match_element:
-                logger.warning(f"未找到比赛ID为 {match_id} 的元素")
-                return None
-
-            # 在比赛元素内查找状态信息
-            # 状态结构: <div class="mend"><span class="text-m-bold">已结束</span><a>4.4万评分</a></div>
-            status_element = match_element.find("div", {"class": "mend"})
-
-            if not status_element:
-                logger.warning(f"比赛 {match_id} 未找到状态元素")
-                return None
-
-            # 提取状态文本
-            status_span = status_element.find("span", {"class": "text-m-bold"})
-            if not status_span:
-                logger.warning(f"比赛 {match_id} 状态元素中未找到span标签")
-                return None
-
-            status = status_span.get_text(strip=True)
-
-            # 提取评分数量
-            rating_count = 0
-            rating_link = status_element.find("a")
-            if rating_link:
-                rating_text = rating_link.get_text(strip=True)
-                # 解析评分数量（如 "4.4万评分" -> 44000）
-                rating_count = self._parse_rating_count(rating_text)
-                logger.info(f"比赛 {match_id} 评分数量: {rating_count}")
-            else:
-                logger.debug(f"比赛 {match_id} 未找到评分信息")
-
-            result = {"status": status, "rating_count": rating_count}
-            logger.info(f"比赛 {match_id} 当前状态: {status}, 评分数量: {rating_count}")
-            return result
+            logger.info(f"正在获取比赛 {', '.join(match_ids)} 的状态，请求URL: {self.base_url}")
+            match_elements = self._get_match_elements()
+
+            for match_id in match_ids:
+                match_element = match_elements.get(match_id)
+                if match_element is None:
+                    logger.warning(f"未找到比赛ID为 {match_id} 的元素")
+                    continue
+                results[match_id] = self._parse_match_status(match_id, match_element)
 
         except requests.RequestException as e:
             logger.error(f"获取比赛状态失败 (网络错误): {e}")
-            return None
         except Exception as e:
             logger.error(f"获取比赛状态失败: {e}")
             import traceback
 
             logger.debug(traceback.format_exc())
+        return results
+
+    def _parse_match_status(self, match_id: str, match_element) -> Optional[dict]:
+        """
+        从比赛元素中解析状态和评分数量
+
+        Args:
+            match_id: 比赛ID
+            match_element: 比赛元素 (div.match-item)
+
+        Returns:
+            Optional[dict]: 状态字典（字段同 get_game_status），解析失败返回None
+        """
+        # 在比赛元素内查找状态信息
+        # 状态结构: <div class="mend"><span class="text-m-bold">已结束</span><a>4.4万评分</a></div>
+        status_elements = _MEND_XPATH(match_element)
+
+        if not status_elements:
+            logger.warning(f"比赛 {match_id} 未找到状态元素")
+            return None
+        status_element = status_elements[0]
+
+        # 提取状态文本
+        status_spans = _STATUS_SPAN_XPATH(status_element)
+        if not status_spans:
+            logger.warning(f"比赛 {match_id} 状态元素中未找到span标签")
             return None
 
+        status = _text(status_spans[0])
+
+        # 提取评分数量
+        rating_count = 0
+        rating_links = _LINK_XPATH(status_element)
+        if rating_links:
+            rating_text = _text(rating_links[0])
+            # 解析评分数量（如 "4.4万评分" -> 44000）
+            rating_count = self._parse_rating_count(rating_text)
+            logger.info(f"比赛 {match_id} 评分数量: {rating_count}")
+        else:
+            logger.debug(f"比赛 {match_id} 未找到评分信息")
+
+        logger.info(f"比赛 {match_id} 当前状态: {status}, 评分数量: {rating_count}")
+        return {"status": status, "rating_count": rating_count}
+
     def _parse_rating_count(self, rating_text: str) -> int:
         """
         解析评分数量文本，转换为整数
@@ -236,20 +394,11 @@ class GameFetcher:
         Returns:
             int: 评分数量（整数）
         """
-        try:
-            # 移除"评分"字样
-            rating_text = rating_text.replace("评分", "").strip()
-
-            # 处理"万"单位
-            if "万" in rating_text:
-                # 提取数字部分（如 "4.4万" -> "4.4"）
-                number_str = rating_text.replace("万", "").strip()
-                number = float(number_str)
-                # 转换为实际数量（乘以10000）
-                return int(number * 10000)
-            else:
-                # 没有单位，直接转换为整数
-                return int(float(rating_text))
-        except Exception as e:
-            logger.warning(f"解析评分数量失败: {rating_text}, 错误: {e}")
+        match = _RATING_RE.search(rating_text)
+        if not match:
+            logger.warning(f"解析评分数量失败: {rating_text}")
             return 0
+
+        number = float(match.group(1))
+        # 处理"万"单位（如 "4.4万" -> 44000）
+        return int(number * 10000) if match.group(2) else int(number)
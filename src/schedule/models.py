@@ -2,6 +2,7 @@
 任务数据模型
 """
 
+from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 from typing import Optional
@@ -22,30 +23,21 @@ class TaskStatus(str, Enum):
     CANCELLED = "cancelled"  # 已取消
 
 
+# slots=True：实例不带 __dict__，任务多时更省内存，属性读取也更快；
+# eq=False：保持按对象身份比较，与原先的普通类一致
+@dataclass(slots=True, eq=False)
 class GameInfo:
     """比赛信息数据模型"""
 
-    def __init__(
-        self,
-        game_id: str,  # 比赛ID
-        home_team_name: str,  # 主队名称
-        away_team_name: str,  # 客队名称
-        home_score: str,  # 主队得分
-        away_score: str,  # 客队得分
-        competition_stage_desc: str,  # 比赛阶段描述
-        match_status: str,  # 比赛状态：未开始/进行中/已结束
-        match_id: str,  # 比赛ID
-        rating_count: int = 0,  # 评分数量，默认为0
-    ):
-        self.game_id = game_id
-        self.home_team_name = home_team_name
-        self.away_team_name = away_team_name
-        self.home_score = home_score
-        self.away_score = away_score
-        self.competition_stage_desc = competition_stage_desc
-        self.match_status = match_status  # 比赛状态：未开始/进行中/已结束
-        self.match_id = match_id
-        self.rating_count = rating_count  # 评分数量
+    game_id: str  # 比赛ID
+    home_team_name: str  # 主队名称
+    away_team_name: str  # 客队名称
+    home_score: str  # 主队得分
+    away_score: str  # 客队得分
+    competition_stage_desc: str  # 比赛阶段描述
+    match_status: str  # 比赛状态：未开始/进行中/已结束
+    match_id: str  # 比赛ID
+    rating_count: int = 0  # 评分数量，默认为0
 
     def __repr__(self):
         return (
@@ -69,30 +61,28 @@ class GameInfo:
         }
 
 
+@dataclass(slots=True, eq=False)
 class Task:
     """任务数据模型"""
 
-    def __init__(
-        self,
-        task_id: str,
-        game_info: GameInfo,
-        status: TaskStatus = TaskStatus.PENDING,
-        create_time: Optional[datetime] = None,
-        start_time: Optional[datetime] = None,
-        end_time: Optional[datetime] = None,
-        config: Optional[dict] = None,
-        result: Optional[dict] = None,
-        error_msg: Optional[str] = None,
-    ):
-        self.task_id = task_id
-        self.game_info = game_info
-        self.status = status
-        self.create_time = create_time or datetime.now()
-        self.start_time = start_time
-        self.end_time = end_time
-        self.config = config or {}
-        self.result = result or {}
-        self.error_msg = error_msg
+    task_id: str
+    game_info: GameInfo
+    status: TaskStatus = TaskStatus.PENDING
+    create_time: Optional[datetime] = None
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    config: Optional[dict] = None
+    result: Optional[dict] = None
+    error_msg: Optional[str] = None
+
+    def __post_init__(self):
+        # 兼容显式传入 None 的调用方式
+        if self.create_time is None:
+            self.create_time = datetime.now()
+        if self.config is None:
+            self.config = {}
+        if self.result is None:
+            self.result = {}
 
     def __repr__(self):
         return (
@@ -3,6 +3,9 @@
 """
 
 import importlib.util
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional
@@ -16,6 +19,9 @@ from src.content_acquisition.acquirer import ContentAcquirer
 from src.video_maker import VideoMaker
 from src.vide_publish import VideoPublisher
 
+# 并发执行任务的线程数，每个线程持有独立的浏览器实例
+_VIDEO_WORKERS = max(1, int(os.getenv("VIDEO_WORKERS", "2")))
+
 
 class TaskScheduler:
     """任务调度器 - 系统的核心管家"""
@@ -55,88 +61,92 @@ class TaskScheduler:
             return []
 
         # 2. 为每场比赛创建任务并检查状态
+        # 所有比赛的状态在同一页面中，一次性批量获取
+        match_ids = [game.get("match_id", "") for game in games_data]
+        game_statuses = self.game_fetcher.get_game_statuses(match_ids)
+
         tasks = []
-        for game_data in games_data:
-            try:
-                match_id = game_data.get("matchId") or game_data.get("match_id", "")
-
-                # 检查是否已存在该比赛的任务（避免重复创建）
-                existing_tasks = self.task_store.get_tasks_by_match_id(match_id)
-                if existing_tasks:
-                    # 过滤出未完成的任务
-                    incomplete_tasks = [
-                        t
-                        for t in existing_tasks
-                        if t.status
-                        not in [TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED]
-                    ]
-                    if incomplete_tasks:
-                        logger.info(f"比赛 {match_id} 已存在未完成任务，跳过创建")
-                        tasks.extend(incomplete_tasks)
+        # 所有任务保存完后统一落盘一次，而不是每个任务重写一次存储文件
+        with self.task_store.batch_write():
+            for game_data, match_id in zip(games_data, match_ids):
+                try:
+                    # 检查是否已存在该比赛的任务（避免重复创建）
+                    existing_tasks = self.task_store.get_tasks_by_match_id(match_id)
+                    if existing_tasks:
+                        # 过滤出未完成的任务
+                        incomplete_tasks = [
+                            t
+                            for t in existing_tasks
+                            if t.status
+                            not in [TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED]
+                        ]
+                        if incomplete_tasks:
+                            logger.info(f"比赛 {match_id} 已存在未完成任务，跳过创建")
+                            tasks.extend(incomplete_tasks)
+                            continue
+
+                    # 创建任务
+                    task = self.create_task_from_game(game_data)
+
+                    # 检查比赛状态和评分数量
+                    game_status_info = game_statuses.get(match_id)
+
+                    if not game_status_info:
+                        # 无法获取状态信息，保守处理：设置为等待状态
+                        logger.warning(f"比赛 {match_id} 无法获取状态信息，设置为等待状态")
+                        task.status = TaskStatus.WAITING_GAME_END
+                        next_check = datetime.now() + timedelta(hours=1)
+                        task.config["next_check_time"] = next_check.isoformat()
+                        self.task_store.save_task(task)
+                        tasks.append(task)
                         continue
 
-                # 创建任务
-                task = self.create_task_from_game(game_data)
-
-                # 检查比赛状态和评分数量
-                game_status_info = self.game_fetcher.get_game_status(match_id)
-
-                if not game_status_info:
-                    # 无法获取状态信息，保守处理：设置为等待状态
-                    logger.warning(f"比赛 {match_id} 无法获取状态信息，设置为等待状态")
-                    task.status = TaskStatus.WAITING_GAME_END
-                    next_check = datetime.now() + timedelta(hours=1)
-                    task.config["next_check_time"] = next_check.isoformat()
-                    self.task_store.save_task(task)
-                    tasks.append(task)
-                    continue
-
-                game_status = game_status_info.get("status", "")
-                rating_count = game_status_info.get("rating_count", 0)
-
-                # 更新任务中的比赛评分数量
-                task.game_info.rating_count = rating_count
-
-                if game_status == "已结束":
-                    # 比赛已结束，检查评分数量
-                    if rating_count >= 30000:
+                    game_status = game_status_info.get("status", "")
+                    rating_count = game_status_info.get("rating_count", 0)
+
+                    # 更新任务中的比赛评分数量
+                    task.game_info.rating_count = rating_count
+
+                    if game_status == "已结束":
+                        # 比赛已结束，检查评分数量
+                        if rating_count >= 30000:
+                            logger.info(
+                                f"比赛 {match_id} 已结束且评分数量({rating_count})>=3万，任务可以执行"
+                            )
+                            task.status = TaskStatus.PENDING
+                        else:
+                            logger.info(
+                                f"比赛 {match_id} 已结束但评分数量({rating_count})<3万，跳过任务创建"
+                            )
+                            # 不保存任务，直接跳过
+                            continue
+                    elif game_status in ["未开始", "进行中"]:
+                        # 比赛未结束，标记为等待状态，并设置1小时后重新检查
                         logger.info(
-                            f"比赛 {match_id} 已结束且评分数量({rating_count})>=3万，任务可以执行"
+                            f"比赛 {match_id} 状态为 {game_status}，评分数量: {rating_count}，设置为等待状态"
                         )
-                        task.status = TaskStatus.PENDING
+                        task.status = TaskStatus.WAITING_GAME_END
+                        next_check = datetime.now() + timedelta(hours=1)
+                        task.config["next_check_time"] = next_check.isoformat()
+                        task.config["game_status"] = game_status
+                        task.config["rating_count"] = rating_count
                     else:
-                        logger.info(
-                            f"比赛 {match_id} 已结束但评分数量({rating_count})<3万，跳过任务创建"
+                        # 无法获取状态，保守处理：设置为等待状态
+                        logger.warning(
+                            f"比赛 {match_id} 状态未知，评分数量: {rating_count}，设置为等待状态"
                         )
-                        # 不保存任务，直接跳过
-                        continue
-                elif game_status in ["未开始", "进行中"]:
-                    # 比赛未结束，标记为等待状态，并设置1小时后重新检查
-                    logger.info(
-                        f"比赛 {match_id} 状态为 {game_status}，评分数量: {rating_count}，设置为等待状态"
-                    )
-                    task.status = TaskStatus.WAITING_GAME_END
-                    next_check = datetime.now() + timedelta(hours=1)
-                    task.config["next_check_time"] = next_check.isoformat()
-                    task.config["game_status"] = game_status
-                    task.config["rating_count"] = rating_count
-                else:
-                    # 无法获取状态，保守处理：设置为等待状态
-                    logger.warning(
-                        f"比赛 {match_id} 状态未知，评分数量: {rating_count}，设置为等待状态"
-                    )
-                    task.status = TaskStatus.WAITING_GAME_END
-                    next_check = datetime.now() + timedelta(hours=1)
-                    task.config["next_check_time"] = next_check.isoformat()
-                    task.config["rating_count"] = rating_count
-
-                # 保存任务到持久化存储
-                self.task_store.save_task(task)
-                tasks.append(task)
-                logger.info(f"为比赛创建任务: {task}")
+                        task.status = TaskStatus.WAITING_GAME_END
+                        next_check = datetime.now() + timedelta(hours=1)
+                        task.config["next_check_time"] = next_check.isoformat()
+                        task.config["rating_count"] = rating_count
 
-            except Exception as e:
-                logger.error(f"创建任务失败: {e}, 比赛信息: {game_data}")
+                    # 保存任务到持久化存储
+                    self.task_store.save_task(task)
+                    tasks.append(task)
+                    logger.info(f"为比赛创建任务: {task}")
+
+                except Exception as e:
+                    logger.error(f"创建任务失败: {e}, 比赛信息: {game_data}")
 
         logger.info(f"共创建 {len(tasks)} 个任务")
         return tasks
@@ -153,17 +163,16 @@ class TaskScheduler:
         """
         # 创建比赛信息对象
         # 这里的字段名与 `GameInfo` 中的定义保持一致
+        # （虎扑 JSON 的驼峰字段已在 GameFetcher 解析赛程时映射为下划线字段）
         game_info = GameInfo(
             game_id=game_data.get("game_id", ""),
-            # 来自虎扑 JSON 的字段为驼峰式，这里做一次兼容映射
-            home_team_name=game_data.get("home_team_name") or game_data.get("homeTeamName", ""),
-            away_team_name=game_data.get("away_team_name") or game_data.get("awayTeamName", ""),
-            home_score=str(game_data.get("home_score") or game_data.get("homeScore", "") or ""),
-            away_score=str(game_data.get("away_score") or game_data.get("awayScore", "") or ""),
-            competition_stage_desc=game_data.get("competition_stage_desc")
-            or game_data.get("competitionStageDesc", ""),
-            match_status=game_data.get("match_status") or game_data.get("matchStatus", ""),
-            match_id=game_data.get("match_id") or game_data.get("matchId", ""),
+            home_team_name=game_data.get("home_team_name", ""),
+            away_team_name=game_data.get("away_team_name", ""),
+            home_score=str(game_data.get("home_score") or ""),
+            away_score=str(game_data.get("away_score") or ""),
+            competition_stage_desc=game_data.get("competition_stage_desc", ""),
+            match_status=game_data.get("match_status", ""),
+            match_id=game_data.get("match_id", ""),
         )
 
         # 生成任务ID（使用比赛ID作为基础）
@@ -256,11 +265,7 @@ class TaskScheduler:
         Returns:
             Optional[Task]: 任务对象，如果不存在返回None
         """
-        tasks = self.get_all_tasks()
-        for task in tasks:
-            if task.game_info.game_id == game_id:
-                return task
-        return None
+        return self.task_store.get_task_by_game_id(game_id)
 
     def check_waiting_tasks(self) -> List[Task]:
         """
@@ -361,7 +366,7 @@ class TaskScheduler:
 
     def execute_task(self, task_id: str):
         """
-        执行单个任务（单线程顺序执行）
+        在当前线程中执行单个任务
 
         Args:
             task_id: 任务ID
@@ -422,7 +427,7 @@ class TaskScheduler:
 
     def start_task(self, task_id: str) -> bool:
         """
-        执行指定任务（单线程顺序执行）
+        在当前线程中执行指定任务
 
         Args:
             task_id: 任务ID
@@ -442,14 +447,14 @@ class TaskScheduler:
             )
             return False
 
-        # 直接执行任务（单线程顺序执行）
+        # 直接在当前线程中执行任务
         logger.info(f"开始执行任务: {task_id}")
         self.execute_task(task_id)
         return True
 
     def start_all_tasks(self, task_ids: Optional[List[str]] = None) -> int:
         """
-        顺序执行所有待执行的任务（单线程）
+        并发执行所有待执行的任务，线程数由环境变量 VIDEO_WORKERS 控制（默认 2）
         如果指定了task_ids，则只为这些任务执行
 
         Args:
@@ -462,11 +467,45 @@ class TaskScheduler:
             # 获取所有PENDING状态的任务
             pending_tasks = self.get_tasks_by_status(TaskStatus.PENDING)
             task_ids = [task.task_id for task in pending_tasks]
+        if not task_ids:
+            return 0
+
+        task_queue: "queue.Queue" = queue.Queue()
+        for idx, task_id in enumerate(task_ids, 1):
+            task_queue.put((idx, task_id))
+
+        workers = min(_VIDEO_WORKERS, len(task_ids))
+        logger.info(f"开始执行 {len(task_ids)} 个任务，并发线程数: {workers}")
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(self._task_worker, task_queue, len(task_ids))
+                for _ in range(workers)
+            ]
+            return sum(future.result() for future in futures)
+
+    def _task_worker(self, task_queue: "queue.Queue", total: int) -> int:
+        """
+        任务工作线程：依次取出任务执行，队列为空时关闭本线程的浏览器
 
+        Args:
+            task_queue: 待执行任务队列，元素为 (序号, task_id)
+            total: 任务总数
+
+        Returns:
+            int: 本线程成功执行的任务数量
+        """
         executed_count = 0
-        for task_id in task_ids:
-            logger.info(f"准备执行任务: {task_id} ({executed_count + 1}/{len(task_ids)})")
-            if self.start_task(task_id):
-                executed_count += 1
-            logger.info(f"任务 {task_id} 执行完成，继续下一个任务...")
+        try:
+            while True:
+                try:
+                    idx, task_id = task_queue.get_nowait()
+                except queue.Empty:
+                    break
+                logger.info(f"准备执行任务: {task_id} ({idx}/{total})")
+                if self.start_task(task_id):
+                    executed_count += 1
+                logger.info(f"任务 {task_id} 执行完成，继续下一个任务...")
+        finally:
+            # 同一线程的任务共用一个浏览器实例，浏览器绑定在本线程上，必须由本线程关闭
+            self.content_acquirer.close()
         return executed_count
@@ -3,11 +3,13 @@
 使用JSON文件存储任务状态，支持任务的创建、更新、查询
 """
 
-import json
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 
+import orjson
 from loguru import logger
 
 from .models import Task, TaskStatus, GameInfo
@@ -25,6 +27,11 @@ class TaskStore:
         """
         self.store_path = Path(store_path)
         self.store_path.parent.mkdir(parents=True, exist_ok=True)
+        # 多个任务线程并发读写同一个文件，读-改-写过程需要互斥
+        self._lock = threading.RLock()
+        # 批量写入嵌套深度与待落盘标记，见 batch_write
+        self._batch_depth = 0
+        self._dirty = False
 
         # 如果文件不存在，创建空的存储文件
         if not self.store_path.exists():
@@ -33,11 +40,21 @@ class TaskStore:
         else:
             logger.info(f"使用现有任务存储文件: {self.store_path}")
 
+        # 存储文件只由本进程写入，启动时加载一次，之后在内存中读取、写入时同步落盘
+        self._data = self._load_data()
+        self._tasks: Dict[str, dict] = self._data.setdefault("tasks", {})
+        # 二级索引：按比赛ID、match_id、状态查找任务ID，避免每次全量扫描
+        self._task_ids_by_game_id: Dict[str, Dict[str, None]] = {}
+        self._task_ids_by_match_id: Dict[str, Dict[str, None]] = {}
+        self._task_ids_by_status: Dict[str, Dict[str, None]] = {}
+        for task_data in self._tasks.values():
+            self._index_task(task_data)
+
     def _load_data(self) -> dict:
         """加载存储数据"""
         try:
-            with open(self.store_path, "r", encoding="utf-8") as f:
-                return json.load(f)
+            with self._lock:
+                return orjson.loads(self.store_path.read_bytes())
         except Exception as e:
             logger.error(f"加载任务数据失败: {e}")
             return {"tasks": {}}
@@ -45,11 +62,78 @@ class TaskStore:
     def _save_data(self, data: dict):
         """保存存储数据"""
         try:
-            with open(self.store_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            # 每次保存都会整体重写存储文件，orjson 序列化比 json.dump 快数倍
+            with self._lock:
+                self.store_path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
         except Exception as e:
             logger.error(f"保存任务数据失败: {e}")
 
+    def _flush(self):
+        """将内存中的存储数据落盘；处于批量写入期间时只标记为待写入"""
+        with self._lock:
+            if self._batch_depth:
+                self._dirty = True
+                return
+            self._save_data(self._data)
+            self._dirty = False
+
+    @contextmanager
+    def batch_write(self) -> Iterator[None]:
+        """
+        批量写入上下文：期间的保存、删除只更新内存，退出时统一重写一次存储文件
+
+        每日检查等一次性保存多个任务的场景使用，避免每保存一个任务就整体重写一次文件
+        """
+        with self._lock:
+            self._batch_depth += 1
+            try:
+                yield
+            finally:
+                self._batch_depth -= 1
+                if not self._batch_depth and self._dirty:
+                    self._flush()
+
+    def _index_task(self, task_data: dict):
+        """将任务加入二级索引"""
+        task_id = task_data.get("task_id", "")
+        game_info = task_data.get("game_info", {})
+        self._task_ids_by_game_id.setdefault(game_info.get("game_id", ""), {})[task_id] = None
+        self._task_ids_by_match_id.setdefault(game_info.get("match_id", ""), {})[task_id] = None
+        self._task_ids_by_status.setdefault(task_data.get("status", ""), {})[task_id] = None
+
+    def _unindex_task(self, task_data: dict, keep_game_id: bool = False):
+        """
+        将任务从二级索引中移除
+
+        Args:
+            task_data: 任务数据
+            keep_game_id: 是否保留比赛ID索引项；更新任务且比赛ID不变时保留，
+                使同一比赛的多个任务保持最初保存的顺序
+        """
+        task_id = task_data.get("task_id", "")
+        game_info = task_data.get("game_info", {})
+        if not keep_game_id:
+            self._task_ids_by_game_id.get(game_info.get("game_id", ""), {}).pop(task_id, None)
+        self._task_ids_by_match_id.get(game_info.get("match_id", ""), {}).pop(task_id, None)
+        self._task_ids_by_status.get(task_data.get("status", ""), {}).pop(task_id, None)
+
+    def _get_tasks(self, task_ids: Iterable[str]) -> List[Task]:
+        """
+        按任务ID列表转换出任务对象
+
+        Args:
+            task_ids: 任务ID列表
+
+        Returns:
+            List[Task]: 任务列表
+        """
+        tasks = []
+        for task_id in task_ids:
+            task = self._dict_to_task(self._tasks[task_id])
+            if task:
+                tasks.append(task)
+        return tasks
+
     def save_task(self, task: Task):
         """
         保存任务
@@ -57,9 +141,20 @@ class TaskStore:
         Args:
             task: 任务对象
         """
-        data = self._load_data()
-        data["tasks"][task.task_id] = task.to_dict()
-        self._save_data(data)
+        with self._lock:
+            old_task_data = self._tasks.get(task.task_id)
+            if old_task_data:
+                old_game_id = old_task_data.get("game_info", {}).get("game_id", "")
+                self._unindex_task(
+                    old_task_data, keep_game_id=old_game_id == task.game_info.game_id
+                )
+            task_data = task.to_dict()
+            # 复制一份，避免之后修改任务对象时直接改动内存中的存储数据
+            task_data["config"] = dict(task_data["config"])
+            task_data["result"] = dict(task_data["result"])
+            self._tasks[task.task_id] = task_data
+            self._index_task(task_data)
+            self._flush()
         logger.debug(f"任务已保存: {task.task_id}")
 
     def get_task(self, task_id: str) -> Optional[Task]:
@@ -72,13 +167,28 @@ class TaskStore:
         Returns:
             Optional[Task]: 任务对象，不存在返回None
         """
-        data = self._load_data()
-        task_data = data["tasks"].get(task_id)
+        with self._lock:
+            task_data = self._tasks.get(task_id)
 
-        if not task_data:
-            return None
+            if not task_data:
+                return None
 
-        return self._dict_to_task(task_data)
+            return self._dict_to_task(task_data)
+
+    def get_task_by_game_id(self, game_id: str) -> Optional[Task]:
+        """
+        根据比赛ID获取任务
+
+        Args:
+            game_id: 比赛ID
+
+        Returns:
+            Optional[Task]: 任务对象，不存在返回None
+        """
+        with self._lock:
+            # 同一比赛存在多个任务时返回最早保存且仍存在的任务
+            task_id = next(iter(self._task_ids_by_game_id.get(game_id, {})), None)
+            return self.get_task(task_id) if task_id else None
 
     def get_all_tasks(self) -> List[Task]:
         """
@@ -87,15 +197,8 @@ class TaskStore:
         Returns:
             List[Task]: 任务列表
         """
-        data = self._load_data()
-        tasks = []
-
-        for task_data in data["tasks"].values():
-            task = self._dict_to_task(task_data)
-            if task:
-                tasks.append(task)
-
-        return tasks
+        with self._lock:
+            return self._get_tasks(self._tasks)
 
     def get_tasks_by_status(self, status: TaskStatus) -> List[Task]:
         """
@@ -107,8 +210,8 @@ class TaskStore:
         Returns:
             List[Task]: 任务列表
         """
-        tasks = self.get_all_tasks()
-        return [task for task in tasks if task.status == status]
+        with self._lock:
+            return self._get_tasks(self._task_ids_by_status.get(status.value, {}))
 
     def get_tasks_by_match_id(self, match_id: str) -> List[Task]:
         """
@@ -120,8 +223,8 @@ class TaskStore:
         Returns:
             List[Task]: 任务列表
         """
-        tasks = self.get_all_tasks()
-        return [task for task in tasks if task.game_info.match_id == match_id]
+        with self._lock:
+            return self._get_tasks(self._task_ids_by_match_id.get(match_id, {}))
 
     def get_pending_retry_tasks(self) -> List[Task]:
         """
@@ -139,11 +242,12 @@ class TaskStore:
         Args:
             task_id: 任务ID
         """
-        data = self._load_data()
-        if task_id in data["tasks"]:
-            del data["tasks"][task_id]
-            self._save_data(data)
-            logger.info(f"任务已删除: {task_id}")
+        with self._lock:
+            task_data = self._tasks.pop(task_id, None)
+            if task_data:
+                self._unindex_task(task_data)
+                self._flush()
+                logger.info(f"任务已删除: {task_id}")
 
     def update_task_status(
         self,
@@ -227,8 +331,9 @@ class TaskStore:
                     if task_data.get("end_time")
                     else None
                 ),
-                config=task_data.get("config", {}),
-                result=task_data.get("result", {}),
+                # 复制一份，避免修改返回的任务对象时直接改动内存中的存储数据
+                config=dict(task_data.get("config") or {}),
+                result=dict(task_data.get("result") or {}),
                 error_msg=task_data.get("error_msg"),
             )
 
@@ -8,6 +8,7 @@ __version__ = "0.1.0"
 
 from .llm_client import call_llm, LLMClient
 from .video_processor import VideoProcessor
+from .browser import CHROMIUM_LAUNCH_ARGS
 from .cookie_reader import (
     get_bilibili_credentials_from_chrome,
     get_bilibili_sessdata,
@@ -18,6 +19,7 @@ __all__ = [
     "call_llm",
     "LLMClient",
     "VideoProcessor",
+    "CHROMIUM_LAUNCH_ARGS",
     "get_bilibili_credentials_from_chrome",
     "get_bilibili_sessdata",
     "get_bilibili_bili_jct",
@@ -0,0 +1,20 @@
+"""
+浏览器工具模块
+
+提供 Playwright 启动 Chromium 时通用的配置。
+"""
+
+# 录制/采集页面用不到的 Chromium 后台子系统（扩展、同步、翻译、后台网络等），
+# 关闭后减少后台进程和 CPU 争用，录制时帧节奏更稳定
+CHROMIUM_LAUNCH_ARGS = [
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-sync",
+    "--disable-default-apps",
+    "--disable-translate",
+    "--disable-features=Translate,OptimizationHints,MediaRouter",
+    "--no-default-browser-check",
+    "--mute-audio",
+    "--disable-dev-shm-usage",
+    "--disable-ipc-flooding-protection",
+]
@@ -4,10 +4,13 @@ Chrome Cookies读取工具
 从Chrome浏览器的cookies数据库中读取B站登录凭证。
 """
 
-import sqlite3
 import os
+import shutil
+import sqlite3
+import tempfile
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 from loguru import logger
 
 
@@ -35,6 +38,68 @@ def get_chrome_cookies_path() -> Optional[Path]:
     return None
 
 
+# 一次查询同时取出 SESSDATA 与 bili_jct，按域名优先级（www.bilibili.com > .bilibili.com > 其他）
+# 与创建时间排序，每个名称取第一行
+# Chrome中host_key可能的值：'www.bilibili.com', '.bilibili.com', 'bilibili.com' 等
+_BILIBILI_COOKIES_SQL = """
+    SELECT name, value, host_key FROM cookies
+    WHERE (
+        host_key = 'www.bilibili.com'
+        OR host_key = '.bilibili.com'
+        OR host_key LIKE '%bilibili.com'
+    )
+    AND name IN ('SESSDATA', 'bili_jct')
+    ORDER BY
+        name,
+        CASE
+            WHEN host_key = 'www.bilibili.com' THEN 1
+            WHEN host_key = '.bilibili.com' THEN 2
+            ELSE 3
+        END,
+        creation_utc DESC
+"""
+
+
+@lru_cache(maxsize=1)
+def _read_bilibili_cookies(
+    cookies_path: str, mtime_ns: int, size: int
+) -> Dict[str, Tuple[str, str]]:
+    """
+    复制并读取Chrome cookies数据库中的B站凭证
+
+    以文件路径、修改时间、大小为缓存键，cookies数据库未变化时直接复用上次结果，
+    避免同一进程内多次获取凭证时反复复制数据库；Chrome刷新cookies后缓存自动失效
+
+    Args:
+        cookies_path: cookies数据库路径
+        mtime_ns: 文件修改时间（纳秒），仅用作缓存键
+        size: 文件大小，仅用作缓存键
+
+    Returns:
+        Dict[str, Tuple[str, str]]: cookie名称 -> (值, 来源域名)
+    """
+    # Chrome的cookies数据库可能被锁定，需要复制一份来读取
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as tmp_file:
+        tmp_path = tmp_file.name
+
+    try:
+        # 复制cookies数据库到临时文件
+        shutil.copy2(cookies_path, tmp_path)
+
+        conn = sqlite3.connect(tmp_path)
+        try:
+            cookies: Dict[str, Tuple[str, str]] = {}
+            for name, value, host_key in conn.execute(_BILIBILI_COOKIES_SQL):
+                cookies.setdefault(name, (value, host_key))
+            return cookies
+        finally:
+            conn.close()
+    finally:
+        # 删除临时文件
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
 def get_bilibili_credentials_from_chrome() -> Tuple[Optional[str], Optional[str]]:
     """
     从Chrome cookies中获取B站登录凭证
@@ -53,81 +118,15 @@ def get_bilibili_credentials_from_chrome() -> Tuple[Optional[str], Optional[str]
     bili_jct = None
 
     try:
-        # Chrome的cookies数据库可能被锁定，需要复制一份来读取
-        import tempfile
-        import shutil
-
-        # 创建临时副本
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as tmp_file:
-            tmp_path = tmp_file.name
-
-        try:
-            # 复制cookies数据库到临时文件
-            shutil.copy2(cookies_path, tmp_path)
-
-            # 连接SQLite数据库
-            conn = sqlite3.connect(tmp_path)
-            cursor = conn.cursor()
-
-            # 查询SESSDATA（优先查询 www.bilibili.com，然后查询其他bilibili.com域名）
-            # Chrome中host_key可能的值：'www.bilibili.com', '.bilibili.com', 'bilibili.com' 等
-            cursor.execute(
-                """
-                SELECT value, host_key FROM cookies 
-                WHERE (
-                    host_key = 'www.bilibili.com' 
-                    OR host_key = '.bilibili.com'
-                    OR host_key LIKE '%bilibili.com'
-                )
-                AND name = 'SESSDATA'
-                ORDER BY 
-                    CASE 
-                        WHEN host_key = 'www.bilibili.com' THEN 1
-                        WHEN host_key = '.bilibili.com' THEN 2
-                        ELSE 3
-                    END,
-                    creation_utc DESC
-                LIMIT 1
-            """
-            )
-            sessdata_result = cursor.fetchone()
-            if sessdata_result:
-                sessdata = sessdata_result[0]
-                host_key = sessdata_result[1]
-                logger.info(f"成功从Chrome cookies中获取SESSDATA (来源: {host_key})")
-
-            # 查询bili_jct（优先查询 www.bilibili.com，然后查询其他bilibili.com域名）
-            cursor.execute(
-                """
-                SELECT value, host_key FROM cookies 
-                WHERE (
-                    host_key = 'www.bilibili.com' 
-                    OR host_key = '.bilibili.com'
-                    OR host_key LIKE '%bilibili.com'
-                )
-                AND name = 'bili_jct'
-                ORDER BY 
-                    CASE 
-                        WHEN host_key = 'www.bilibili.com' THEN 1
-                        WHEN host_key = '.bilibili.com' THEN 2
-                        ELSE 3
-                    END,
-                    creation_utc DESC
-                LIMIT 1
-            """
-            )
-            bili_jct_result = cursor.fetchone()
-            if bili_jct_result:
-                bili_jct = bili_jct_result[0]
-                host_key = bili_jct_result[1]
-                logger.info(f"成功从Chrome cookies中获取bili_jct (来源: {host_key})")
-
-            conn.close()
-
-        finally:
-            # 删除临时文件
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
+        stat = cookies_path.stat()
+        cookies = _read_bilibili_cookies(str(cookies_path), stat.st_mtime_ns, stat.st_size)
+
+        if "SESSDATA" in cookies:
+            sessdata, host_key = cookies["SESSDATA"]
+            logger.info(f"成功从Chrome cookies中获取SESSDATA (来源: {host_key})")
+        if "bili_jct" in cookies:
+            bili_jct, host_key = cookies["bili_jct"]
+            logger.info(f"成功从Chrome cookies中获取bili_jct (来源: {host_key})")
 
         if sessdata and bili_jct:
             logger.info("成功从Chrome cookies中获取B站登录凭证")
@@ -4,11 +4,162 @@
 封装阿里云百炼API调用，提供简单易用的接口。
 """
 
+import hashlib
 import os
-from typing import Optional
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Optional, Tuple
 
+import orjson
 from loguru import logger
-from openai import OpenAI
+from openai import DefaultHttpxClient, OpenAI
+
+# 大模型响应缓存：相同模型、相同消息、相同参数的调用直接复用结果，
+# 发布失败重跑或重复执行流程时省去网络往返。
+# 启用搜索时结果与时间相关，因此缓存设置有效期
+_RESPONSE_CACHE_PATH = Path("materials/llm_response_cache.sqlite3")
+_RESPONSE_CACHE_TTL = 12 * 3600
+# 内存中最多保留的响应数，按最近使用淘汰（长期运行的定时任务进程中不无限增长），
+# 被淘汰的响应仍可从磁盘缓存读回
+_RESPONSE_CACHE_MEMORY_SIZE = 256
+_response_cache_memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+_response_cache_lock = threading.Lock()
+
+# 遇到 429、5xx、连接错误等临时故障时的重试次数（不含首次请求），
+# 由 openai SDK 按指数退避加随机抖动重试，并遵循 Retry-After；认证、参数错误不重试
+_MAX_RETRIES = 4
+
+
+def _response_cache_key(
+    model: str, messages: list, extra_body: dict, options: Optional[dict] = None
+) -> str:
+    """
+    根据模型、消息和参数生成缓存键
+
+    Args:
+        model: 模型名称
+        messages: 消息列表
+        extra_body: 额外参数
+        options: 影响返回内容的其他调用选项（如 max_tokens、stop_when）
+
+    Returns:
+        str: 缓存键
+    """
+    raw = orjson.dumps(
+        {"model": model, "messages": messages, "extra_body": extra_body, "options": options},
+        option=orjson.OPT_SORT_KEYS,
+    )
+    return hashlib.sha256(raw).hexdigest()
+
+
+def _remember_response(key: str, cached: Tuple[float, str]) -> None:
+    """
+    将响应放入内存缓存并标记为最近使用，超出容量时淘汰最久未使用的响应，调用方需持有锁
+
+    Args:
+        key: 缓存键
+        cached: (创建时间, 响应)
+    """
+    _response_cache_memory[key] = cached
+    _response_cache_memory.move_to_end(key)
+    while len(_response_cache_memory) > _RESPONSE_CACHE_MEMORY_SIZE:
+        _response_cache_memory.popitem(last=False)
+
+
+def _connect_response_cache() -> sqlite3.Connection:
+    """
+    打开缓存数据库，不存在时创建
+
+    Returns:
+        sqlite3.Connection: 数据库连接
+    """
+    _RESPONSE_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(_RESPONSE_CACHE_PATH, timeout=5)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS llm_cache "
+        "(key TEXT PRIMARY KEY, response TEXT NOT NULL, created REAL NOT NULL)"
+    )
+    return conn
+
+
+def _response_cache_get(key: str, ttl: float) -> Optional[str]:
+    """
+    读取未过期的缓存响应，先查内存再查磁盘
+
+    Args:
+        key: 缓存键
+        ttl: 有效期（秒）
+
+    Returns:
+        Optional[str]: 缓存的响应，未命中或已过期返回None
+    """
+    now = time.time()
+    with _response_cache_lock:
+        cached = _response_cache_memory.get(key)
+        if cached is None:
+            try:
+                conn = _connect_response_cache()
+                try:
+                    row = conn.execute(
+                        "SELECT created, response FROM llm_cache WHERE key = ?", (key,)
+                    ).fetchone()
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"读取大模型响应缓存失败: {e}")
+                return None
+            if row is None:
+                return None
+            cached = (row[0], row[1])
+
+        created, response = cached
+        if now - created > ttl:
+            # 已过期的响应不再保留在内存中
+            _response_cache_memory.pop(key, None)
+            return None
+        _remember_response(key, cached)
+    return response
+
+
+def _response_cache_set(key: str, response: str) -> None:
+    """
+    写入缓存响应（内存和磁盘）
+
+    Args:
+        key: 缓存键
+        response: 模型返回的内容
+    """
+    created = time.time()
+    with _response_cache_lock:
+        _remember_response(key, (created, response))
+        try:
+            conn = _connect_response_cache()
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO llm_cache (key, response, created) VALUES (?, ?, ?)",
+                        (key, response, created),
+                    )
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"写入大模型响应缓存失败: {e}")
+
+
+@lru_cache(maxsize=1)
+def _shared_http_client() -> DefaultHttpxClient:
+    """
+    获取所有大模型客户端共用的 HTTP 客户端，复用同一个连接池，
+    不同模型的客户端之间也无需重新建立 TCP/TLS 连接
+
+    Returns:
+        DefaultHttpxClient: HTTP 客户端（沿用 openai SDK 的默认超时和连接池配置）
+    """
+    return DefaultHttpxClient()
 
 
 class LLMClient:
@@ -19,6 +170,9 @@ class LLMClient:
         api_key: Optional[str] = None,
         base_url: str = "https://dashscope.aliyuncs.com/compatible-mode/v1",
         model: str = "qwen-plus",
+        cache: bool = True,
+        cache_ttl: float = _RESPONSE_CACHE_TTL,
+        max_retries: int = _MAX_RETRIES,
     ):
         """
         初始化大模型客户端
@@ -27,6 +181,9 @@ class LLMClient:
             api_key: API密钥，如果不提供则从环境变量 DASHSCOPE_API_KEY 读取
             base_url: API基础URL，默认为阿里云百炼
             model: 模型名称，默认为 qwen-plus
+            cache: 是否缓存响应，相同请求在有效期内直接返回缓存结果，默认为 True
+            cache_ttl: 响应缓存有效期（秒），默认为 12 小时
+            max_retries: 临时故障（限流、服务端错误、连接错误）的最大重试次数，默认为 4
         """
         self.api_key = api_key or os.getenv("DASHSCOPE_API_KEY")
         if not self.api_key:
@@ -34,10 +191,14 @@ class LLMClient:
 
         self.base_url = base_url
         self.model = model
+        self.cache = cache
+        self.cache_ttl = cache_ttl
 
         self.client = OpenAI(
             api_key=self.api_key,
             base_url=self.base_url,
+            http_client=_shared_http_client(),
+            max_retries=max_retries,
         )
 
         logger.info(f"大模型客户端初始化完成: model={model}")
@@ -47,6 +208,9 @@ class LLMClient:
         user_content: str,
         system_content: Optional[str] = None,
         enable_search: bool = True,
+        stream: bool = False,
+        stop_when: Optional[Callable[[str], bool]] = None,
+        max_tokens: Optional[int] = None,
         **kwargs,
     ) -> str:
         """
@@ -56,6 +220,10 @@ class LLMClient:
             user_content: 用户输入内容
             system_content: 系统提示词，默认为 None
             enable_search: 是否启用搜索，默认为 True
+            stream: 是否流式接收响应，默认为 False
+            stop_when: 流式接收时，每收到新内容就以已接收的全部内容调用，返回 True 即停止接收，
+                返回已接收的内容；用于只需要开头一部分内容的调用（如标题）
+            max_tokens: 最大生成 token 数，默认不限制
             **kwargs: 其他参数，会传递给 extra_body
 
         Returns:
@@ -70,31 +238,113 @@ class LLMClient:
             extra_body = {"enable_search": enable_search}
             extra_body.update(kwargs)
 
-            completion = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                extra_body=extra_body,
-            )
+            cache_key = None
+            if self.cache:
+                # 提前停止时返回的内容取决于判断函数，按其限定名区分缓存
+                stop_name = (
+                    f"{stop_when.__module__}.{stop_when.__qualname__}"
+                    if stream and stop_when
+                    else None
+                )
+                options = {"max_tokens": max_tokens, "stop_when": stop_name}
+                cache_key = _response_cache_key(self.model, messages, extra_body, options)
+                cached_content = _response_cache_get(cache_key, self.cache_ttl)
+                if cached_content is not None:
+                    logger.debug(f"大模型响应命中缓存，返回内容长度: {len(cached_content)}")
+                    return cached_content
+
+            create_kwargs = {"model": self.model, "messages": messages, "extra_body": extra_body}
+            if max_tokens:
+                create_kwargs["max_tokens"] = max_tokens
 
-            response_content = completion.choices[0].message.content
+            if stream:
+                response_content = self._stream_completion(create_kwargs, stop_when)
+            else:
+                completion = self.client.chat.completions.create(**create_kwargs)
+                response_content = completion.choices[0].message.content
             logger.debug(f"大模型调用成功，返回内容长度: {len(response_content)}")
+            if cache_key and response_content:
+                _response_cache_set(cache_key, response_content)
             return response_content
 
         except Exception as e:
             logger.error(f"大模型调用失败: {e}", exc_info=True)
             raise
 
+    def _stream_completion(
+        self, create_kwargs: dict, stop_when: Optional[Callable[[str], bool]]
+    ) -> str:
+        """
+        流式接收响应，stop_when 判断已接收的内容足够时提前结束，不再等待模型生成剩余内容
+
+        Args:
+            create_kwargs: chat.completions.create 的参数
+            stop_when: 判断是否停止接收的函数，为 None 时接收完整响应
+
+        Returns:
+            str: 模型返回的内容（提前停止时为已接收的部分）
+        """
+        stream = self.client.chat.completions.create(stream=True, **create_kwargs)
+        parts = []
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                parts.append(delta)
+                if stop_when:
+                    text = "".join(parts)
+                    if stop_when(text):
+                        return text
+        finally:
+            stream.close()
+        return "".join(parts)
+
 
-# 全局客户端实例
-_default_client: Optional[LLMClient] = None
+# lru_cache 未命中时不加锁，多个线程同时首次获取会各自创建客户端，因此创建过程串行化
+_clients_lock = threading.Lock()
+
+
+@lru_cache(maxsize=8)
+def _create_client(model: Optional[str]) -> LLMClient:
+    """
+    创建客户端实例，同一模型只创建一次
+
+    Args:
+        model: 模型名称，为 None 时使用默认模型
+
+    Returns:
+        LLMClient: 大模型客户端
+    """
+    return LLMClient(model=model) if model else LLMClient()
 
 
 def get_default_client() -> LLMClient:
     """获取默认的大模型客户端实例"""
-    global _default_client
-    if _default_client is None:
-        _default_client = LLMClient()
-    return _default_client
+    with _clients_lock:
+        return _create_client(None)
+
+
+def _get_model_client(model: str) -> LLMClient:
+    """
+    获取指定模型的客户端实例，同一模型只创建一次
+
+    Args:
+        model: 模型名称
+
+    Returns:
+        LLMClient: 大模型客户端
+    """
+    with _clients_lock:
+        return _create_client(model)
+
+
+def reset_clients() -> None:
+    """清除已创建的默认客户端和各模型客户端，下次调用时重新创建（如更换 API 密钥后）"""
+    with _clients_lock:
+        _create_client.cache_clear()
 
 
 def call_llm(
@@ -118,8 +368,8 @@ def call_llm(
         str: 模型返回的内容
     """
     if model:
-        # 如果指定了模型，创建临时客户端
-        client = LLMClient(model=model)
+        # 如果指定了模型，复用该模型的客户端
+        client = _get_model_client(model)
         return client.call(user_content, system_content, enable_search, **kwargs)
     else:
         # 使用默认客户端
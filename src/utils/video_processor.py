@@ -4,12 +4,231 @@
 提供视频处理的通用功能，可在多个模块中复用。
 """
 
+import os
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from functools import lru_cache
 import ffmpeg
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
+import orjson
 from loguru import logger
 
+# 候选的 H.264 硬件编码器及其参数，按优先级排列
+# 硬件编码器的原生输入格式是 nv12（与 yuv420p 同为 4:2:0，只是 UV 交错存储），
+# 直接指定 nv12 可避免 ffmpeg 额外插入一次像素格式转换（h264_qsv 甚至不接受 yuv420p）
+_HW_H264_ENCODERS = {
+    "h264_nvenc": {"vcodec": "h264_nvenc", "preset": "p1", "cq": 23, "pix_fmt": "nv12"},
+    "h264_qsv": {
+        "vcodec": "h264_qsv",
+        "preset": "veryfast",
+        "global_quality": 23,
+        "pix_fmt": "nv12",
+    },
+    "h264_videotoolbox": {"vcodec": "h264_videotoolbox", "b:v": "8M", "pix_fmt": "nv12"},
+}
+
+# 消费级 NVIDIA 显卡最多同时运行 3 路 NVENC 编码会话，超出时 ffmpeg 直接失败
+_NVENC_SESSIONS = threading.BoundedSemaphore(3)
+
+# ffprobe 只输出用到的字段，不必序列化全部容器和流元数据
+_PROBE_ENTRIES = "stream=codec_type,codec_name,width,height,avg_frame_rate:format=duration"
+
+# 支持通过修改码流头部裁切参数来裁切画面的编码格式及对应的码流过滤器
+_CROP_METADATA_BSF = {"h264": "h264_metadata", "hevc": "hevc_metadata"}
+
+# 没有可用硬件编码器时使用的软件编码参数（veryfast 比 medium 编码快数倍，画质损失很小）
+_SW_H264_ENCODER = {"vcodec": "libx264", "preset": "veryfast", "crf": 23}
+
+
+@lru_cache(maxsize=None)
+def _which(binary: str) -> str:
+    """
+    解析可执行文件的完整路径，进程内只在 PATH 中查找一次
+
+    Args:
+        binary: 可执行文件名（ffmpeg / ffprobe）
+
+    Returns:
+        str: 完整路径，找不到时原样返回，由执行时报错
+    """
+    return shutil.which(binary) or binary
+
+
+def _run_ffmpeg(stream) -> None:
+    """
+    执行 ffmpeg 命令，覆盖已存在的输出文件
+
+    不读取标准输入，不输出进度统计，只输出错误级别的日志，减少 ffmpeg 启动和输出的开销；
+    出错时 ffmpeg.Error.stderr 中仍包含错误信息。
+
+    Args:
+        stream: ffmpeg 输出流
+    """
+    stream = stream.global_args("-nostdin", "-hide_banner", "-nostats", "-loglevel", "error")
+    ffmpeg.run(stream, cmd=_which("ffmpeg"), overwrite_output=True, quiet=True)
+
+
+@lru_cache(maxsize=1)
+def _detect_h264_encoder() -> tuple:
+    """
+    检测可用的 H.264 编码器，进程内只检测一次
+
+    编码器编译进 ffmpeg 不代表硬件可用，因此对每个候选编码器做一次极短的试编码。
+
+    Returns:
+        tuple: 编码参数的 (key, value) 元组
+    """
+    try:
+        encoders = subprocess.run(
+            [_which("ffmpeg"), "-hide_banner", "-encoders"],
+            capture_output=True,
+            text=True,
+            timeout=10,
+        ).stdout
+    except Exception as e:
+        logger.warning(f"检测 ffmpeg 编码器失败，使用 libx264: {e}")
+        return tuple(_SW_H264_ENCODER.items())
+
+    for name, params in _HW_H264_ENCODERS.items():
+        if name not in encoders:
+            continue
+        probe_cmd = [
+            _which("ffmpeg"),
+            "-hide_banner",
+            "-f",
+            "lavfi",
+            "-i",
+            "color=black:s=256x256:d=0.1",
+            "-c:v",
+            name,
+            "-f",
+            "null",
+            "-",
+        ]
+        try:
+            if subprocess.run(probe_cmd, capture_output=True, timeout=10).returncode == 0:
+                logger.info(f"使用硬件编码器: {name}")
+                return tuple(params.items())
+        except Exception:
+            continue
+
+    logger.info("未检测到可用的硬件编码器，使用 libx264")
+    return tuple(_SW_H264_ENCODER.items())
+
+
+def _h264_output_kwargs() -> dict:
+    """
+    生成重新编码为 H.264 时的 ffmpeg 输出参数
+
+    Returns:
+        dict: 可直接传给 ffmpeg.output 的参数
+    """
+    kwargs = dict(_detect_h264_encoder())
+    kwargs.setdefault("pix_fmt", "yuv420p")  # 像素格式，确保兼容性；硬件编码器使用 nv12
+    kwargs["movflags"] = "+faststart"  # moov 前置，上传后服务端无需读完整个文件即可开始处理
+    return kwargs
+
+
+def _run_h264(stream) -> None:
+    """
+    执行需要 H.264 重新编码的 ffmpeg 命令
+
+    使用 NVENC 时占用一个编码会话名额，避免并发编码超出显卡的会话上限。
+
+    Args:
+        stream: ffmpeg 输出流
+    """
+    is_nvenc = dict(_detect_h264_encoder()).get("vcodec") == "h264_nvenc"
+    with _NVENC_SESSIONS if is_nvenc else nullcontext():
+        _run_ffmpeg(stream)
+
+
+def _crop_bitstream(input_path: Path, output_path: Path, crop_top: int, codec: str) -> bool:
+    """
+    通过 h264_metadata / hevc_metadata 修改 SPS 中的裁切参数来裁切视频，视频流直接复制
+
+    裁切参数是 H.264 / HEVC 标准的一部分，解码器都会按其输出画面。4:2:0 视频的裁切量必须为偶数，
+    编码格式不支持、不满足条件或 ffmpeg 不支持时返回 False，由调用方改为重新编码。
+
+    Args:
+        input_path: 输入视频路径
+        output_path: 输出视频路径
+        crop_top: 要裁切的顶部像素数
+        codec: 输入视频的编码格式（probe 结果中的 codec_name）
+
+    Returns:
+        bool: 是否裁切成功
+    """
+    bsf = _CROP_METADATA_BSF.get(codec)
+    if not bsf or crop_top % 2:
+        return False
+    try:
+        stream = ffmpeg.output(
+            ffmpeg.input(str(input_path)).video,
+            str(output_path),
+            vcodec="copy",
+            **{"bsf:v": f"{bsf}=crop_top={crop_top}"},
+        )
+        _run_ffmpeg(stream)
+        return True
+    except ffmpeg.Error as e:
+        logger.debug(f"码流裁切失败，改为重新编码: {e.stderr.decode() if e.stderr else e}")
+        return False
+
+
+@lru_cache(maxsize=128)
+def _probe_cached(path_str: str, mtime: float, size: int) -> dict:
+    """
+    执行 ffprobe，结果按 (路径, 修改时间, 大小) 缓存
+
+    mtime 和 size 只参与缓存键，文件被覆盖重写后会重新探测。
+    结构与 ffmpeg.probe 相同，但只包含 _PROBE_ENTRIES 中的字段；失败时同样抛出 ffmpeg.Error。
+    """
+    args = [_which("ffprobe"), "-v", "error", "-show_entries", _PROBE_ENTRIES, "-of", "json"]
+    proc = subprocess.run([*args, path_str], capture_output=True)
+    if proc.returncode != 0:
+        raise ffmpeg.Error("ffprobe", proc.stdout, proc.stderr)
+    return orjson.loads(proc.stdout)
+
+
+def probe_video(path: str | Path) -> dict:
+    """
+    获取视频信息，同一文件未变化时不再重复启动 ffprobe 子进程
+
+    返回的字典在多次调用间共享，调用方不应修改。
+
+    Args:
+        path: 视频文件路径
+
+    Returns:
+        dict: 视频信息，包含 streams（codec_type、codec_name、width、height、avg_frame_rate）
+            和 format（duration）
+    """
+    st = Path(path).stat()
+    return _probe_cached(str(path), st.st_mtime, st.st_size)
+
+
+def probe_frame_rate(video_stream: dict) -> float:
+    """
+    从 probe 结果的视频流信息中读取平均帧率
+
+    Args:
+        video_stream: probe 结果中的视频流
+
+    Returns:
+        float: 帧率，无法解析时返回 0
+    """
+    num, _, den = video_stream.get("avg_frame_rate", "0/0").partition("/")
+    try:
+        return float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
 
 class VideoProcessor:
     """视频处理工具类"""
@@ -30,7 +249,7 @@ class VideoProcessor:
             logger.info(f"开始裁剪视频前 {start_time} 秒: {input_path}")
 
             # 获取视频信息以确定时长
-            probe = ffmpeg.probe(str(input_path))
+            probe = probe_video(input_path)
             duration = float(probe.get("format", {}).get("duration", 0))
 
             if duration == 0:
@@ -53,10 +272,11 @@ class VideoProcessor:
                 str(output_path),
                 vcodec="copy",  # 使用 copy 编码，避免重新编码，速度更快
                 acodec="copy",  # 音频也使用 copy
+                avoid_negative_ts="make_zero",  # 流复制时将起始时间戳归零，避免负时间戳
             )
 
             # 执行裁剪，覆盖已存在的输出文件
-            ffmpeg.run(stream, overwrite_output=True, quiet=True)
+            _run_ffmpeg(stream)
 
             logger.info(f"视频已成功裁剪: {output_path}")
             return output_path
@@ -86,7 +306,7 @@ class VideoProcessor:
             logger.info(f"开始裁切视频头部 {crop_top}px: {input_path}")
 
             # 获取视频信息以确定尺寸
-            probe = ffmpeg.probe(str(input_path))
+            probe = probe_video(input_path)
             video_stream = next(
                 (stream for stream in probe["streams"] if stream["codec_type"] == "video"), None
             )
@@ -114,21 +334,20 @@ class VideoProcessor:
             # 生成输出文件路径（转换为 MP4 格式，添加 _cropped 后缀）
             output_path = input_path.parent / f"{input_path.stem}_cropped.mp4"
 
+            # H.264 / HEVC 输入优先只修改码流中的裁切参数，不解码、不重新编码
+            if _crop_bitstream(input_path, output_path, crop_top, video_stream.get("codec_name")):
+                logger.info(f"视频已成功裁切（码流裁切）: {output_path}")
+                return output_path
+
             # 使用 ffmpeg 的 crop 滤镜裁切视频
             # crop=width:height:x:y
             stream = ffmpeg.input(str(input_path))
             stream = ffmpeg.filter(stream, "crop", width, new_height, 0, crop_top)
-            stream = ffmpeg.output(
-                stream,
-                str(output_path),
-                vcodec="libx264",  # 使用 H.264 编码（必须重新编码，因为使用了滤镜）
-                preset="medium",  # 编码速度和质量平衡
-                crf=23,  # 质量控制（18-28，值越小质量越高）
-                pix_fmt="yuv420p",  # 像素格式，确保兼容性
-            )
+            # 使用 H.264 编码（必须重新编码，因为使用了滤镜），优先使用硬件编码器
+            stream = ffmpeg.output(stream, str(output_path), **_h264_output_kwargs())
 
             # 执行裁切，覆盖已存在的输出文件
-            ffmpeg.run(stream, overwrite_output=True, quiet=True)
+            _run_h264(stream)
 
             logger.info(f"视频已成功裁切: {output_path}")
             return output_path
@@ -162,17 +381,11 @@ class VideoProcessor:
             # 使用 ffmpeg 将视频转换为60帧
             stream = ffmpeg.input(str(input_path))
             stream = ffmpeg.filter(stream, "fps", fps=60)
-            stream = ffmpeg.output(
-                stream,
-                str(output_path),
-                vcodec="libx264",  # 使用 H.264 编码
-                preset="medium",  # 编码速度和质量平衡
-                crf=23,  # 质量控制
-                pix_fmt="yuv420p",  # 像素格式，确保兼容性
-            )
+            # 使用 H.264 编码，优先使用硬件编码器
+            stream = ffmpeg.output(stream, str(output_path), **_h264_output_kwargs())
 
             # 执行转换，覆盖已存在的输出文件
-            ffmpeg.run(stream, overwrite_output=True, quiet=True)
+            _run_h264(stream)
 
             logger.info(f"视频已成功转换为60帧: {output_path}")
             return output_path
@@ -187,13 +400,16 @@ class VideoProcessor:
             return None
 
     @staticmethod
-    def add_audio_to_video(video_path: Path, audio_path: str | Path) -> Optional[Path]:
+    def add_audio_to_video(
+        video_path: Path, audio_path: str | Path, duration: Optional[float] = None
+    ) -> Optional[Path]:
         """
         将音频添加到视频中
 
         Args:
             video_path: 输入视频路径
             audio_path: 音频文件路径（可以是字符串或 Path 对象）
+            duration: 视频时长（秒），调用方已知时传入可省去一次 probe；默认为 None，即读取视频信息
 
         Returns:
             Optional[Path]: 合并后的视频路径，如果失败返回None
@@ -206,9 +422,11 @@ class VideoProcessor:
 
             logger.info(f"开始将音频添加到视频: 视频={video_path}, 音频={audio_path}")
 
-            # 获取视频时长，用于截取音频
-            video_probe = ffmpeg.probe(str(video_path))
-            video_duration = float(video_probe.get("format", {}).get("duration", 0))
+            # 获取视频时长，用于截取音频（调用方已知时直接使用）
+            video_duration = duration
+            if not video_duration:
+                video_probe = probe_video(video_path)
+                video_duration = float(video_probe.get("format", {}).get("duration", 0))
 
             if video_duration == 0:
                 logger.error("无法获取视频时长")
@@ -234,7 +452,7 @@ class VideoProcessor:
             )
 
             # 执行合并，覆盖已存在的输出文件
-            ffmpeg.run(stream, overwrite_output=True, quiet=True)
+            _run_ffmpeg(stream)
 
             logger.info(f"音频已成功添加到视频: {output_path}")
             return output_path
@@ -248,6 +466,239 @@ class VideoProcessor:
             logger.error(f"音频合并失败: {e}", exc_info=True)
             return None
 
+    @staticmethod
+    def crop_and_add_audio(
+        input_path: Path, audio_path: str | Path, crop_top: int = 50
+    ) -> Optional[Path]:
+        """
+        一次 ffmpeg 调用完成裁切视频头部和添加音频
+
+        与先 crop_video 再 add_audio_to_video 的结果相同，但只解码/编码一遍，
+        也不产生中间文件。音频文件不存在时只做裁切。
+
+        Args:
+            input_path: 输入视频路径
+            audio_path: 音频文件路径（可以是字符串或 Path 对象）
+            crop_top: 要裁切的顶部像素数，默认为50
+
+        Returns:
+            Optional[Path]: 处理后的视频路径，如果失败返回None
+        """
+        try:
+            audio_path = Path(audio_path)
+            logger.info(
+                f"开始裁切视频头部 {crop_top}px 并添加音频: 视频={input_path}, 音频={audio_path}"
+            )
+
+            # 一次 probe 同时获取尺寸和时长
+            probe = probe_video(input_path)
+            video_stream = next(
+                (stream for stream in probe["streams"] if stream["codec_type"] == "video"), None
+            )
+
+            if not video_stream:
+                logger.error("未找到视频流")
+                return None
+
+            width = int(video_stream.get("width", 0))
+            height = int(video_stream.get("height", 0))
+
+            if width == 0 or height == 0:
+                logger.error(f"无法获取视频尺寸: {width}x{height}")
+                return None
+
+            if crop_top >= height:
+                logger.error(f"裁切高度 {crop_top}px 大于等于视频高度 {height}px")
+                return None
+
+            # 计算裁切后的高度
+            new_height = height - crop_top
+            logger.info(f"视频尺寸: {width}x{height}, 裁切后: {width}x{new_height}")
+
+            # 生成输出文件路径（转换为 MP4 格式，添加 _final 后缀）
+            output_path = input_path.parent / f"{input_path.stem}_final.mp4"
+
+            # crop=width:height:x:y，必须重新编码，因为使用了滤镜；优先使用硬件编码器
+            video = ffmpeg.input(str(input_path)).video.filter(
+                "crop", width, new_height, 0, crop_top
+            )
+            output_kwargs = _h264_output_kwargs()
+
+            if audio_path.exists():
+                video_duration = float(probe.get("format", {}).get("duration", 0))
+                if video_duration == 0:
+                    logger.error("无法获取视频时长")
+                    return None
+                logger.info(f"视频时长: {video_duration} 秒")
+
+                # 截取音频到视频时长，以最短的流为准
+                audio = ffmpeg.input(str(audio_path), t=video_duration).audio
+                stream = ffmpeg.output(
+                    video, audio, str(output_path), acodec="aac", shortest=None, **output_kwargs
+                )
+            else:
+                logger.warning(f"音频文件不存在: {audio_path}，跳过音频合并")
+                stream = ffmpeg.output(video, str(output_path), **output_kwargs)
+
+            # 执行处理，覆盖已存在的输出文件
+            _run_h264(stream)
+
+            logger.info(f"视频已成功裁切并添加音频: {output_path}")
+            return output_path
+
+        except ffmpeg.Error as e:
+            logger.error(f"FFmpeg 裁切和音频合并失败: {e}")
+            if e.stderr:
+                logger.error(f"FFmpeg 错误信息: {e.stderr.decode()}")
+            return None
+        except Exception as e:
+            logger.error(f"视频裁切和音频合并失败: {e}", exc_info=True)
+            return None
+
+    @staticmethod
+    def process_pipeline(
+        input_path: Path,
+        audio_path: str | Path,
+        *,
+        trim_start: float = 6.0,
+        crop_top: int = 50,
+        target_fps: Optional[int] = 60,
+        max_width: Optional[int] = None,
+        threads: Optional[int] = None,
+    ) -> Optional[Path]:
+        """
+        一次 ffmpeg 调用完成裁剪开头、裁切头部、转换帧率和添加音频
+
+        与依次调用 trim_video、crop_video、convert_to_60fps、add_audio_to_video 的结果相同，
+        但只解码/编码一遍，也不产生中间文件。音频文件不存在时跳过音频合并。
+
+        Args:
+            input_path: 输入视频路径
+            audio_path: 音频文件路径（可以是字符串或 Path 对象）
+            trim_start: 要移除的开头秒数，默认为6秒
+            crop_top: 要裁切的顶部像素数，默认为50
+            target_fps: 输出帧率，默认为60；为 None 时保留源视频帧率
+            max_width: 输出最大宽度，源视频更宽时在转换帧率前等比缩小，默认不缩放
+            threads: ffmpeg 使用的线程数，默认由 ffmpeg 自行决定
+
+        Returns:
+            Optional[Path]: 处理后的视频路径，如果失败返回None
+        """
+        try:
+            audio_path = Path(audio_path)
+            logger.info(
+                f"开始处理视频: {input_path}, 裁剪前 {trim_start} 秒, "
+                f"裁切头部 {crop_top}px, 转换为 {target_fps} 帧"
+            )
+
+            probe = probe_video(input_path)
+            video_stream = next(
+                (stream for stream in probe["streams"] if stream["codec_type"] == "video"), None
+            )
+
+            if not video_stream:
+                logger.error("未找到视频流")
+                return None
+
+            width = int(video_stream.get("width", 0))
+            height = int(video_stream.get("height", 0))
+            duration = float(probe.get("format", {}).get("duration", 0))
+
+            if height == 0 or duration == 0:
+                logger.error(f"无法获取视频高度或时长: height={height}, duration={duration}")
+                return None
+
+            if trim_start >= duration:
+                logger.error(f"开始时间 {trim_start} 秒大于等于视频时长 {duration} 秒")
+                return None
+
+            if crop_top >= height:
+                logger.error(f"裁切高度 {crop_top}px 大于等于视频高度 {height}px")
+                return None
+
+            logger.info(f"视频时长: {duration} 秒, 处理后: {duration - trim_start} 秒")
+
+            # 生成输出文件路径（转换为 MP4 格式，添加 _final 后缀）
+            output_path = input_path.parent / f"{input_path.stem}_final.mp4"
+
+            # 裁剪开头、裁切头部、转换帧率在同一个滤镜图中完成，只编码一次；优先使用硬件编码器
+            video = ffmpeg.input(str(input_path), ss=trim_start).video
+            # 不需要裁切头部时不加 crop 滤镜
+            if crop_top > 0:
+                video = video.filter("crop", "iw", f"ih-{crop_top}", 0, crop_top)
+            # 在转换帧率前缩小，帧率转换和编码处理的像素都随之减少；-2 保持宽高比且高度为偶数
+            if max_width and width > max_width:
+                logger.info(f"视频宽度 {width}px 超过 {max_width}px，等比缩小")
+                video = video.filter("scale", max_width, -2)
+            # 源视频已是目标帧率时不需要 fps 滤镜
+            if target_fps and probe_frame_rate(video_stream) != target_fps:
+                video = video.filter("fps", fps=target_fps)
+            output_kwargs = _h264_output_kwargs()
+            if threads:
+                output_kwargs["threads"] = threads
+
+            if audio_path.exists():
+                # 以最短的流为准，音频截取到视频时长
+                audio = ffmpeg.input(str(audio_path)).audio
+                stream = ffmpeg.output(
+                    video,
+                    audio,
+                    str(output_path),
+                    acodec="aac",
+                    audio_bitrate="192k",
+                    shortest=None,
+                    **output_kwargs,
+                )
+            else:
+                logger.warning(f"音频文件不存在: {audio_path}，跳过音频合并")
+                stream = ffmpeg.output(video, str(output_path), **output_kwargs)
+
+            # 执行处理，覆盖已存在的输出文件
+            _run_h264(stream)
+
+            logger.info(f"视频处理完成: {output_path}")
+            return output_path
+
+        except ffmpeg.Error as e:
+            logger.error(f"FFmpeg 视频处理失败: {e}")
+            if e.stderr:
+                logger.error(f"FFmpeg 错误信息: {e.stderr.decode()}")
+            return None
+        except Exception as e:
+            logger.error(f"视频处理失败: {e}", exc_info=True)
+            return None
+
+    @staticmethod
+    def process_batch(
+        items: list[tuple[Path, str | Path]], concurrency: Optional[int] = None, **kwargs
+    ) -> Iterator[tuple[Path, Optional[Path]]]:
+        """
+        并发处理多个视频，按完成顺序产出结果
+
+        每个任务本身是独立的 ffmpeg 子进程，用线程调度即可并行；单个 ffmpeg 的线程数
+        按并发数均分 CPU 核数，避免互相争抢。调用方可以在其余视频仍在编码时处理已完成的视频。
+
+        Args:
+            items: (视频路径, 音频路径) 列表
+            concurrency: 同时运行的 ffmpeg 数，默认为 CPU 核数的四分之一
+            **kwargs: 透传给 process_pipeline 的参数
+
+        Yields:
+            tuple[Path, Optional[Path]]: (输入视频路径, 处理后的视频路径，失败为None)
+        """
+        cpu_count = os.cpu_count() or 1
+        concurrency = concurrency or max(1, cpu_count // 4)
+        kwargs.setdefault("threads", max(1, cpu_count // concurrency))
+        logger.info(f"开始批量处理 {len(items)} 个视频，并发数: {concurrency}")
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = {
+                executor.submit(VideoProcessor.process_pipeline, video, audio, **kwargs): video
+                for video, audio in items
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
     @staticmethod
     def cleanup_intermediate_files(file_paths: list[Path]) -> None:
         """
@@ -257,11 +708,11 @@ class VideoProcessor:
             file_paths: 要删除的文件路径列表
         """
         for file_path in file_paths:
+            # 直接删除，文件不存在时由异常判断，省去一次 exists() 的 stat 调用
             try:
-                if file_path.exists():
-                    file_path.unlink()
-                    logger.info(f"已删除中间文件: {file_path}")
-                else:
-                    logger.debug(f"中间文件不存在，跳过删除: {file_path}")
+                os.unlink(file_path)
+                logger.info(f"已删除中间文件: {file_path}")
+            except FileNotFoundError:
+                logger.debug(f"中间文件不存在，跳过删除: {file_path}")
             except Exception as e:
                 logger.warning(f"删除中间文件失败: {file_path}, 错误: {e}")
@@ -7,6 +7,6 @@
 
 __version__ = "0.1.0"
 
-from .publisher import VideoPublisher
+from .publisher import VideoPublisher, get_publish_record
 
-__all__ = ["VideoPublisher"]
+__all__ = ["VideoPublisher", "get_publish_record"]
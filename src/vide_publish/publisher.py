@@ -5,13 +5,21 @@
 """
 
 import os
+import re
+import time
 import asyncio
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 
+import orjson
 from loguru import logger
 
 from src.utils import call_llm
+from src.utils.video_processor import probe_frame_rate, probe_video
 
 # GameInfo 在函数内部延迟导入，避免循环导入
 
@@ -23,6 +31,222 @@ from bilibili_api import (
     video_zone,
 )
 
+# 清理大模型输出：首尾的空白和引号，以及开头可能出现的"标题："、"描述："等前缀
+_TITLE_CLEAN_RE = re.compile(r"^[\s\"'“”‘’]*(?:标题[:：])?[\s\"'“”‘’]*")
+_DESCRIPTION_CLEAN_RE = re.compile(r"^[\s\"'“”‘’]*(?:(?:描述|简介)[:：])?[\s\"'“”‘’]*")
+_TRAILING_QUOTES_RE = re.compile(r"[\s\"'“”‘’]+$")
+
+
+def _extract_title(response: str) -> str:
+    """
+    从模型返回内容中提取标题：逐行移除引号和"标题："等前缀，取第一个清理后非空的行
+
+    Args:
+        response: 模型返回的内容
+
+    Returns:
+        str: 标题，没有非空行时返回空字符串
+    """
+    for line in response.splitlines():
+        title = _TRAILING_QUOTES_RE.sub("", _TITLE_CLEAN_RE.sub("", line, count=1))
+        if title:
+            return title
+    return ""
+
+
+def _has_complete_title(text: str) -> bool:
+    """
+    流式接收标题时判断是否可以停止：已有一个完整的行（之后出现了换行）清理后非空
+
+    Args:
+        text: 已接收的内容
+
+    Returns:
+        bool: 是否已收到完整标题
+    """
+    return bool(_extract_title(text.rpartition("\n")[0]))
+
+
+# 系统提示词与具体比赛无关，作为固定前缀放在模块级，便于服务端前缀缓存命中；
+# 比赛信息只出现在 user_prompt 中
+_TITLE_SYSTEM_PROMPT = """你是一个专业的体育视频标题生成助手。你需要根据比赛信息生成吸引人的视频标题。
+
+标题要求：
+1. 开头要有一个吸引人的短句或感叹（如"独木难支！"、"惊天逆转！"等）
+2. 中间包含比赛的关键信息（可以是球员表现、比赛亮点等）
+3. 结尾必须包含准确的比分和胜负关系（格式：队伍名 比分-比分 不敌/战胜 队伍名）
+
+标题示例：
+- 独木难支！东契奇伤退、詹姆斯空砍36分，湖人88-103不敌快船
+- 惊天逆转！末节狂追20分，勇士128-125险胜凯尔特人
+- 双星闪耀！库里42分、汤普森30分，勇士120-108大胜湖人
+
+请只返回标题，不要包含其他说明文字。"""
+
+_DESCRIPTION_SYSTEM_PROMPT = """你是一个专业的体育比赛分析助手。你需要根据比赛信息生成详细的比赛描述。
+
+描述要求：
+1. 开头简要介绍比赛双方和比赛结果
+2. 详细描述比赛的关键时刻和亮点
+3. 介绍主要球员的表现和数据
+4. 分析比赛的转折点和精彩瞬间
+5. 结尾可以总结比赛的意义或影响
+
+描述应该：
+- 详细且生动，能够吸引观众
+- 包含具体的比分、数据等信息
+- 语言流畅，适合作为视频简介
+- 长度控制在200-500字左右
+
+请只返回描述内容，不要包含其他说明文字。"""
+
+_TAGS_SYSTEM_PROMPT = """你是一个专业的视频标签生成助手。根据比赛信息生成5-10个相关的视频标签。
+
+标签要求：
+- 与比赛内容相关
+- 能够吸引目标观众
+- 包含球队、球员、比赛类型等关键词
+- 每个标签2-6个字
+
+请只返回标签，用逗号分隔，不要包含其他说明文字。"""
+
+
+# 已发布视频记录：重跑流程或上传后出错重试时，同一个视频文件不再重复生成标题和上传
+_PUBLISH_RECORDS_PATH = Path("materials/publish_records.json")
+_publish_records: Optional[Dict[str, dict]] = None
+_publish_records_lock = threading.Lock()
+
+
+def _video_fingerprint(video_path: Path) -> str:
+    """
+    计算视频文件指纹：文件大小加前 1 MiB 内容的 sha1，不必读取整个文件
+
+    Args:
+        video_path: 视频文件路径
+
+    Returns:
+        str: 文件指纹
+    """
+    with open(video_path, "rb") as f:
+        head = f.read(1024 * 1024)
+    return f"{video_path.stat().st_size}-{hashlib.sha1(head).hexdigest()}"
+
+
+def _load_publish_records() -> Dict[str, dict]:
+    """
+    读取已发布视频记录，进程内只读一次磁盘（调用方需持有 _publish_records_lock）
+
+    Returns:
+        Dict[str, dict]: 文件指纹 -> 发布记录
+    """
+    global _publish_records
+    if _publish_records is None:
+        try:
+            _publish_records = orjson.loads(_PUBLISH_RECORDS_PATH.read_bytes())
+        except FileNotFoundError:
+            _publish_records = {}
+        except Exception as e:
+            logger.warning(f"读取已发布视频记录失败: {e}")
+            _publish_records = {}
+    return _publish_records
+
+
+def get_publish_record(video_path: str | Path) -> Optional[dict]:
+    """
+    查询视频文件是否已发布过
+
+    Args:
+        video_path: 视频文件路径
+
+    Returns:
+        Optional[dict]: 发布记录（包含 bvid、title、publish_time），未发布过返回None
+    """
+    try:
+        fingerprint = _video_fingerprint(Path(video_path))
+    except OSError:
+        return None
+    with _publish_records_lock:
+        return _load_publish_records().get(fingerprint)
+
+
+def _save_publish_record(video_path: Path, bvid: Optional[str], title: str) -> None:
+    """
+    记录视频已发布成功
+
+    Args:
+        video_path: 视频文件路径
+        bvid: 视频BVID，上传结果中没有时为None
+        title: 视频标题
+    """
+    try:
+        fingerprint = _video_fingerprint(video_path)
+        with _publish_records_lock:
+            records = _load_publish_records()
+            records[fingerprint] = {
+                "bvid": bvid,
+                "title": title,
+                "video_path": str(video_path),
+                "publish_time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            _PUBLISH_RECORDS_PATH.parent.mkdir(parents=True, exist_ok=True)
+            _PUBLISH_RECORDS_PATH.write_bytes(orjson.dumps(records, option=orjson.OPT_INDENT_2))
+    except Exception as e:
+        logger.warning(f"保存已发布视频记录失败: {e}")
+
+
+@lru_cache(maxsize=1)
+def _lookup_basketball_zone_id() -> Optional[int]:
+    """
+    查找体育篮球分区的ID，结果在进程内缓存
+
+    参考文档: https://nemo2011.github.io/bilibili-api/#/modules/video_zone
+
+    Returns:
+        Optional[int]: 篮球分区的 tid，如果未找到返回 None
+    """
+    if not video_zone:
+        logger.error("video_zone 模块不可用，无法获取分区信息")
+        return None
+
+    try:
+        # 方法1: 根据名称查找"篮球"分区
+        main_zone, sub_zone = video_zone.get_zone_info_by_name("篮球")
+
+        if sub_zone and "tid" in sub_zone:
+            tid = sub_zone["tid"]
+            logger.info(f"找到篮球分区: {sub_zone.get('name', 'N/A')}, tid={tid}")
+            return tid
+        elif main_zone and "tid" in main_zone:
+            tid = main_zone["tid"]
+            logger.info(f"找到篮球分区: {main_zone.get('name', 'N/A')}, tid={tid}")
+            return tid
+
+        # 方法2: 遍历所有分区查找体育-篮球
+        logger.info("通过名称未找到，遍历所有分区查找体育-篮球...")
+        zone_list = video_zone.get_zone_list_sub()
+
+        for main_zone in zone_list:
+            # 查找体育分区
+            if "体育" in main_zone.get("name", ""):
+                if "sub" in main_zone:
+                    for sub_zone in main_zone["sub"]:
+                        if "篮球" in sub_zone.get("name", ""):
+                            tid = sub_zone.get("tid")
+                            if tid:
+                                logger.info(
+                                    f"找到体育-篮球分区: {main_zone.get('name', 'N/A')} - "
+                                    f"{sub_zone.get('name', 'N/A')}, tid={tid}"
+                                )
+                                return tid
+
+        logger.warning("未找到篮球分区，使用默认值 171")
+        return 171  # 默认篮球分区ID
+
+    except Exception as e:
+        logger.error(f"获取篮球分区ID失败: {e}", exc_info=True)
+        logger.warning("使用默认值 171")
+        return 171  # 默认篮球分区ID
+
 
 class VideoPublisher:
     """视频发布器"""
@@ -66,8 +290,47 @@ class VideoPublisher:
                 logger.error(f"B站登录凭证配置失败: {e}")
                 self.credential = None
 
+        # bilibili_api 按事件循环缓存 HTTP 客户端，所有上传共用同一个常驻事件循环，
+        # 以复用上传接口的连接池（asyncio.run 每次都会新建事件循环和客户端）
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+        # 多个视频同时发布时，生成标题、封面等准备工作并行，上传按先来先到逐个进行，
+        # 避免并发上传触发B站限流；asyncio.Lock 按等待顺序唤醒，相当于 FIFO 队列
+        self._upload_lock = asyncio.Lock()
+
         logger.info("视频发布器初始化完成")
 
+    def _run_async(self, coro):
+        """
+        在常驻事件循环中执行协程并同步等待结果，首次调用时启动事件循环线程
+
+        Args:
+            coro: 要执行的协程
+
+        Returns:
+            协程的返回值
+        """
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever, name="bilibili-upload-loop", daemon=True
+                ).start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _upload_in_order(self, uploader) -> dict:
+        """
+        在常驻事件循环中按先来先到的顺序执行上传，同一时间只有一个视频在上传
+
+        Args:
+            uploader: video_uploader.VideoUploader 实例
+
+        Returns:
+            dict: 上传结果
+        """
+        async with self._upload_lock:
+            return await uploader.start()
+
     def publish_video(self, video_path: str | Path, game_info) -> bool:
         """
         发布视频到B站
@@ -91,24 +354,38 @@ class VideoPublisher:
             logger.info(f"开始发布视频: {video_path}")
             logger.info(f"比赛信息: {game_info}")
 
+            # 同一个视频文件已发布过时直接返回，不再生成标题、封面和重复上传
+            publish_record = get_publish_record(video_path)
+            if publish_record:
+                logger.info(f"视频已发布过，跳过: BVID={publish_record.get('bvid')}")
+                return True
+
+            # 1-5. 标题、简介、标签（大模型调用）、封面图（ffmpeg）和分区ID互不依赖，并发获取
+            with ThreadPoolExecutor(max_workers=5) as executor:
+                title_future = executor.submit(self._generate_video_title, game_info)
+                description_future = executor.submit(self._generate_game_description, game_info)
+                tags_future = executor.submit(self._generate_video_tags, game_info)
+                cover_future = executor.submit(self._generate_cover_image, video_path)
+                zone_future = executor.submit(self._get_basketball_zone_id)
+
             # 1. 生成视频标题（基于比赛信息）
-            video_title = self._generate_video_title(game_info)
+            video_title = title_future.result()
             logger.info(f"生成的视频标题: {video_title}")
 
             # 2. 生成比赛详细信息（用于视频简介）
-            video_description = self._generate_game_description(game_info)
+            video_description = description_future.result()
             logger.info(f"生成的比赛详细信息: {video_description[:500]}...")
 
             # 3. 生成视频标签
-            video_tags = self._generate_video_tags(game_info)
+            video_tags = tags_future.result()
 
             # 4. 制作封面图（从视频第30帧提取上方0-200px区域）
-            cover_path = self._generate_cover_image(video_path)
+            cover_path = cover_future.result()
             if not cover_path:
                 logger.warning("封面图生成失败，将不使用封面图上传")
 
             # 5. 获取体育篮球分区ID
-            zone_tid = self._get_basketball_zone_id()
+            zone_tid = zone_future.result()
             if not zone_tid:
                 logger.warning("无法获取篮球分区ID，使用默认值 171")
                 zone_tid = 171
@@ -134,6 +411,22 @@ class VideoPublisher:
             logger.error(f"视频发布失败: {e}", exc_info=True)
             return False
 
+    async def publish_video_async(self, video_path: str | Path, game_info) -> bool:
+        """
+        异步发布视频到B站，可在事件循环中用 asyncio.gather 同时发布多个视频
+
+        发布流程在线程中执行（大模型调用和封面生成是同步的），多个视频的准备工作并行；
+        上传协程在常驻事件循环中按先来先到的顺序逐个执行，共用同一个连接池。
+
+        Args:
+            video_path: 视频文件路径
+            game_info: 比赛信息 (GameInfo 对象)
+
+        Returns:
+            bool: 发布是否成功
+        """
+        return await asyncio.to_thread(self.publish_video, video_path, game_info)
+
     def _generate_video_title(self, game_info) -> str:
         """
         生成视频标题
@@ -149,39 +442,25 @@ class VideoPublisher:
         """
         try:
             # 构造提示词，只提供比赛标识信息，让模型自己搜索详细信息
-            system_prompt = """你是一个专业的体育视频标题生成助手。你需要根据比赛信息生成吸引人的视频标题。
-
-标题要求：
-1. 开头要有一个吸引人的短句或感叹（如"独木难支！"、"惊天逆转！"等）
-2. 中间包含比赛的关键信息（可以是球员表现、比赛亮点等）
-3. 结尾必须包含准确的比分和胜负关系（格式：队伍名 比分-比分 不敌/战胜 队伍名）
-
-标题示例：
-- 独木难支！东契奇伤退、詹姆斯空砍36分，湖人88-103不敌快船
-- 惊天逆转！末节狂追20分，勇士128-125险胜凯尔特人
-- 双星闪耀！库里42分、汤普森30分，勇士120-108大胜湖人
-
-请只返回标题，不要包含其他说明文字。"""
-
             user_prompt = f"""请为以下NBA比赛生成一个吸引人的视频标题：
 
 比赛：{game_info.away_team_name} vs {game_info.home_team_name}
 
 请搜索这场比赛的最新信息（包括比分、胜负关系、比赛亮点等），然后生成一个吸引人的视频标题。"""
 
-            title = call_llm(
+            response = call_llm(
                 user_content=user_prompt,
-                system_content=system_prompt,
+                system_content=_TITLE_SYSTEM_PROMPT,
                 enable_search=True,  # 启用搜索功能，让模型自己查找比赛信息
+                stream=True,  # 标题只有一行，收到完整标题即停止接收，不等待多余的说明文字
+                stop_when=_has_complete_title,
+                max_tokens=80,
             )
 
-            # 清理标题（移除可能的引号、换行等）
-            title = title.strip().strip('"').strip("'").strip()
-            # 移除可能的"标题："等前缀
-            if "：" in title:
-                title = title.split("：", 1)[-1]
-            if ":" in title:
-                title = title.split(":", 1)[-1]
+            # 清理标题，模型可能先单独输出一行"标题："再换行给出标题
+            title = _extract_title(response)
+            if not title:
+                raise ValueError(f"模型返回的标题为空: {response!r}")
 
             logger.info(f"成功生成视频标题: {title}")
             return title
@@ -211,23 +490,6 @@ class VideoPublisher:
         """
         try:
             # 构造提示词，只提供比赛标识信息，让模型自己搜索详细信息
-            system_prompt = """你是一个专业的体育比赛分析助手。你需要根据比赛信息生成详细的比赛描述。
-
-描述要求：
-1. 开头简要介绍比赛双方和比赛结果
-2. 详细描述比赛的关键时刻和亮点
-3. 介绍主要球员的表现和数据
-4. 分析比赛的转折点和精彩瞬间
-5. 结尾可以总结比赛的意义或影响
-
-描述应该：
-- 详细且生动，能够吸引观众
-- 包含具体的比分、数据等信息
-- 语言流畅，适合作为视频简介
-- 长度控制在200-500字左右
-
-请只返回描述内容，不要包含其他说明文字。"""
-
             user_prompt = f"""请为以下NBA比赛生成详细的比赛描述：
 
 比赛：{game_info.away_team_name} vs {game_info.home_team_name}
@@ -236,21 +498,14 @@ class VideoPublisher:
 
             description = call_llm(
                 user_content=user_prompt,
-                system_content=system_prompt,
+                system_content=_DESCRIPTION_SYSTEM_PROMPT,
                 enable_search=True,  # 启用搜索功能，让模型自己查找比赛信息
             )
 
-            # 清理描述（移除可能的引号、多余换行等）
-            description = description.strip().strip('"').strip("'").strip()
-            # 移除可能的"描述："等前缀
-            if "描述：" in description:
-                description = description.split("描述：", 1)[-1]
-            if "描述:" in description:
-                description = description.split("描述:", 1)[-1]
-            if "简介：" in description:
-                description = description.split("简介：", 1)[-1]
-            if "简介:" in description:
-                description = description.split("简介:", 1)[-1]
+            # 清理描述（移除可能的引号、多余换行和"描述："等前缀）
+            description = _TRAILING_QUOTES_RE.sub(
+                "", _DESCRIPTION_CLEAN_RE.sub("", description, count=1)
+            )
 
             logger.info(f"成功生成比赛详细信息，长度: {len(description)} 字符")
             return description
@@ -272,7 +527,7 @@ class VideoPublisher:
         """
         生成视频封面图
 
-        从视频的第30帧提取，并裁剪上方0-450px区域。
+        从视频的第30帧提取，并裁剪上方区域（860px 宽度下为 0-450px，按宽度等比换算）。
 
         Args:
             video_path: 视频文件路径
@@ -288,7 +543,7 @@ class VideoPublisher:
             logger.info(f"开始生成封面图: {video_path}")
 
             # 获取视频信息以确定宽度
-            probe = ffmpeg.probe(str(video_path))
+            probe = probe_video(video_path)
             video_stream = next(
                 (stream for stream in probe["streams"] if stream["codec_type"] == "video"), None
             )
@@ -302,18 +557,27 @@ class VideoPublisher:
                 logger.error("无法获取视频宽度")
                 return None
 
+            # 封面高度按 860px 宽度对应 450px 的比例换算，不同录制分辨率下取景一致
+            crop_height = round(width * 450 / 860)
+
             # 生成封面图输出路径
             cover_path = video_path.parent / f"{video_path.stem}_cover.jpg"
 
-            logger.info(f"从视频第30帧提取，裁剪上方0-450px区域")
-            logger.info(f"视频宽度: {width}px，裁剪高度: 450px")
+            logger.info(f"从视频第30帧提取，裁剪上方0-{crop_height}px区域")
+            logger.info(f"视频宽度: {width}px，裁剪高度: {crop_height}px")
 
             # 使用 ffmpeg 提取第30帧并裁剪
-            # select=eq(n\,29): 选择第30帧（从0开始计数，所以是29）
-            # crop=width:450:0:0: 裁剪上方450px区域（宽度:高度:x:y）
-            stream = ffmpeg.input(str(video_path))
-            stream = ffmpeg.filter(stream, "select", "eq(n,29)")  # 选择第30帧（索引从0开始）
-            stream = ffmpeg.filter(stream, "crop", width, 450, 0, 0)  # 裁剪上方450px
+            # 已知帧率时在输入端按时间跳转（-ss 放在 -i 之前），从最近的关键帧开始解码，
+            # 取 28.5 帧对应的时间，避免浮点误差跳过第30帧（索引29）；
+            # 帧率未知时退回 select=eq(n\,29)，从头解码到第30帧
+            # crop=width:crop_height:0:0: 裁剪上方区域（宽度:高度:x:y）
+            fps = probe_frame_rate(video_stream)
+            if fps > 0:
+                stream = ffmpeg.input(str(video_path), ss=round(28.5 / fps, 4))
+            else:
+                stream = ffmpeg.input(str(video_path))
+                stream = ffmpeg.filter(stream, "select", "eq(n,29)")  # 选择第30帧（索引从0开始）
+            stream = ffmpeg.filter(stream, "crop", width, crop_height, 0, 0)  # 裁剪上方区域
             stream = ffmpeg.output(
                 stream,
                 str(cover_path),
@@ -344,53 +608,12 @@ class VideoPublisher:
         """
         获取体育篮球分区的ID
 
-        参考文档: https://nemo2011.github.io/bilibili-api/#/modules/video_zone
+        分区ID基本不会变化，进程内只查找一次，见 _lookup_basketball_zone_id。
 
         Returns:
             Optional[int]: 篮球分区的 tid，如果未找到返回 None
         """
-        if not video_zone:
-            logger.error("video_zone 模块不可用，无法获取分区信息")
-            return None
-
-        try:
-            # 方法1: 根据名称查找"篮球"分区
-            main_zone, sub_zone = video_zone.get_zone_info_by_name("篮球")
-
-            if sub_zone and "tid" in sub_zone:
-                tid = sub_zone["tid"]
-                logger.info(f"找到篮球分区: {sub_zone.get('name', 'N/A')}, tid={tid}")
-                return tid
-            elif main_zone and "tid" in main_zone:
-                tid = main_zone["tid"]
-                logger.info(f"找到篮球分区: {main_zone.get('name', 'N/A')}, tid={tid}")
-                return tid
-
-            # 方法2: 遍历所有分区查找体育-篮球
-            logger.info("通过名称未找到，遍历所有分区查找体育-篮球...")
-            zone_list = video_zone.get_zone_list_sub()
-
-            for main_zone in zone_list:
-                # 查找体育分区
-                if "体育" in main_zone.get("name", ""):
-                    if "sub" in main_zone:
-                        for sub_zone in main_zone["sub"]:
-                            if "篮球" in sub_zone.get("name", ""):
-                                tid = sub_zone.get("tid")
-                                if tid:
-                                    logger.info(
-                                        f"找到体育-篮球分区: {main_zone.get('name', 'N/A')} - "
-                                        f"{sub_zone.get('name', 'N/A')}, tid={tid}"
-                                    )
-                                    return tid
-
-            logger.warning("未找到篮球分区，使用默认值 171")
-            return 171  # 默认篮球分区ID
-
-        except Exception as e:
-            logger.error(f"获取篮球分区ID失败: {e}", exc_info=True)
-            logger.warning("使用默认值 171")
-            return 171  # 默认篮球分区ID
+        return _lookup_basketball_zone_id()
 
     def _generate_video_tags(self, game_info) -> list[str]:
         """
@@ -416,16 +639,6 @@ class VideoPublisher:
                 tags.append(game_info.competition_stage_desc)
 
             # 使用大模型生成更多相关标签
-            system_prompt = """你是一个专业的视频标签生成助手。根据比赛信息生成5-10个相关的视频标签。
-
-标签要求：
-- 与比赛内容相关
-- 能够吸引目标观众
-- 包含球队、球员、比赛类型等关键词
-- 每个标签2-6个字
-
-请只返回标签，用逗号分隔，不要包含其他说明文字。"""
-
             user_prompt = f"""请为以下NBA比赛生成视频标签：
 
 比赛：{game_info.away_team_name} vs {game_info.home_team_name}
@@ -435,7 +648,7 @@ class VideoPublisher:
             try:
                 llm_tags = call_llm(
                     user_content=user_prompt,
-                    system_content=system_prompt,
+                    system_content=_TAGS_SYSTEM_PROMPT,
                     enable_search=False,
                 )
                 # 解析标签
@@ -507,6 +720,12 @@ class VideoPublisher:
                     logger.warning("无法获取篮球分区ID，使用默认值 171")
                     tid = 171
 
+            # 发布入口已检查过，这里再检查一次，防止直接调用上传时重复上传
+            publish_record = get_publish_record(video_path)
+            if publish_record:
+                logger.info(f"视频已发布过，跳过上传: BVID={publish_record.get('bvid')}")
+                return True
+
             logger.info(f"开始上传视频到B站: {video_path}")
             logger.info(f"标题: {title}")
             logger.info(f"标签: {tags}")
@@ -550,9 +769,9 @@ class VideoPublisher:
             logger.info("开始上传视频文件...")
             logger.info("上传过程可能需要较长时间，请耐心等待...")
 
-            # start() 方法是异步的，使用 asyncio.run() 同步等待上传完成
+            # start() 方法是异步的，在常驻事件循环中执行并同步等待上传完成
             # 成功时返回包含 bvid 的字典，失败时返回 None 或抛出异常
-            result = asyncio.run(uploader.start())
+            result = self._run_async(self._upload_in_order(uploader))
 
             if result and isinstance(result, dict):
                 bvid = result.get("bvid") or result.get("data", {}).get("bvid")
@@ -560,14 +779,15 @@ class VideoPublisher:
                     logger.info(f"✓ 视频上传成功！")
                     logger.info(f"  视频ID (BVID): {bvid}")
                     logger.info(f"  视频链接: https://www.bilibili.com/video/{bvid}")
-                    return True
                 else:
                     logger.warning(f"上传返回结果但未找到 bvid: {result}")
                     # 即使没有 bvid，如果返回了结果，也认为上传成功
-                    return True
+                _save_publish_record(Path(video_path), bvid, title)
+                return True
             elif result:
                 # 如果返回了非字典类型的结果，也认为可能成功
                 logger.info(f"视频上传完成，返回结果: {result}")
+                _save_publish_record(Path(video_path), None, title)
                 return True
             else:
                 logger.error("视频上传失败：未返回结果")
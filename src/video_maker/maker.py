@@ -5,8 +5,6 @@
 包括视频预处理（帧数转换、格式转换等）、视频合成等功能。
 """
 
-import ffmpeg
-import json
 from pathlib import Path
 from typing import Optional, Dict, Any
 
@@ -46,41 +44,17 @@ class VideoMaker:
 
         logger.info(f"开始处理视频: {video_path}")
 
-        # 用于存储中间文件路径，处理成功后删除
-        intermediate_files = []
-
         try:
-            # 1. 裁剪视频前6秒
-            trimmed_video_path = VideoProcessor.trim_video(video_path, start_time=6)
-            if not trimmed_video_path:
-                logger.error("视频裁剪失败")
-                return None
-            intermediate_files.append(trimmed_video_path)
-
-            # 2. 裁切视频，将头部120px的区域裁切掉
-            cropped_video_path = VideoProcessor.crop_video(trimmed_video_path, crop_top=120)
-            if not cropped_video_path:
-                logger.error("视频裁切失败")
-                return None
-            intermediate_files.append(cropped_video_path)
-
-            # 3. 将视频转换为60帧
-            processed_video_path = VideoProcessor.convert_to_60fps(cropped_video_path)
-            if not processed_video_path:
-                logger.error("视频帧数转换失败")
-                return None
-            intermediate_files.append(processed_video_path)
-
-            # 4. 将音频添加到视频中
+            # 一次 ffmpeg 调用完成：裁剪视频前6秒、裁切头部90px（录制分辨率 645x1398 下的页面头部）、
+            # 转换为60帧、添加音频
             audio_path = content.get("audio_path") or Path("materials/audio/bgm.mp3")
-            final_video_path = VideoProcessor.add_audio_to_video(processed_video_path, audio_path)
+            final_video_path = VideoProcessor.process_pipeline(
+                video_path, audio_path, trim_start=6, crop_top=90, target_fps=60
+            )
             if not final_video_path:
-                logger.error("音频合并失败")
+                logger.error("视频处理失败")
                 return None
 
-            # 处理成功，删除中间文件
-            VideoProcessor.cleanup_intermediate_files(intermediate_files)
-
             logger.info(f"视频处理完成: {final_video_path}")
             return str(final_video_path)
 
@@ -29,6 +29,11 @@ def check_today_games():
     games_ended_low_rating = []
     games_not_ended = []
 
+    # 所有比赛的状态都在同一个赛程页面上，一次请求批量获取
+    status_map = fetcher.get_game_statuses(
+        match_id for game in games if (match_id := game.get("matchId", ""))
+    )
+
     # 检查每场比赛
     for i, game in enumerate(games, 1):
         match_id = game.get("matchId", "")
@@ -40,7 +45,7 @@ def check_today_games():
             continue
 
         # 获取状态和评分信息
-        status_info = fetcher.get_game_status(match_id)
+        status_info = status_map.get(match_id)
 
         if not status_info:
             logger.warning(f"⚠️  比赛 {i}: {away} vs {home} - 无法获取状态信息")
@@ -67,63 +72,69 @@ def check_today_games():
         else:
             games_not_ended.append(game_info)
 
-    # 输出结果
-    logger.info("\n" + "=" * 80)
-    logger.info(f"✅ 满足生成视频条件的比赛: {len(games_to_generate)} 场")
-    logger.info("=" * 80)
+    # 输出结果：报告逐行拼好后一次性输出，避免每行一次日志调用，多线程下也不会与其他日志交错
+    sep = "=" * 80
+    report = []
+    line = report.append
+
+    line("\n" + sep)
+    line(f"✅ 满足生成视频条件的比赛: {len(games_to_generate)} 场")
+    line(sep)
 
     if games_to_generate:
         for game in games_to_generate:
-            logger.info(
+            line(
                 f"  {game['index']}. {game['away']} vs {game['home']} "
                 f"(评分: {game['rating_count']:,})"
             )
     else:
-        logger.info("  无")
+        line("  无")
 
-    logger.info("\n" + "=" * 80)
-    logger.info(f"⏸️  已结束但评分不足3万的比赛: {len(games_ended_low_rating)} 场")
-    logger.info("=" * 80)
+    line("\n" + sep)
+    line(f"⏸️  已结束但评分不足3万的比赛: {len(games_ended_low_rating)} 场")
+    line(sep)
 
     if games_ended_low_rating:
         for game in games_ended_low_rating:
             rating_text = f"{game['rating_count']:,}".replace(",", "")
             shortage = 30000 - game["rating_count"]
-            logger.info(
+            line(
                 f"  {game['index']}. {game['away']} vs {game['home']} "
                 f"(评分: {rating_text}, 还差: {shortage:,})"
             )
     else:
-        logger.info("  无")
+        line("  无")
 
-    logger.info("\n" + "=" * 80)
-    logger.info(f"⏳ 尚未结束的比赛: {len(games_not_ended)} 场")
-    logger.info("=" * 80)
+    line("\n" + sep)
+    line(f"⏳ 尚未结束的比赛: {len(games_not_ended)} 场")
+    line(sep)
 
     if games_not_ended:
         for game in games_not_ended:
-            logger.info(
+            line(
                 f"  {game['index']}. {game['away']} vs {game['home']} "
                 f"(状态: {game['status']}, 评分: {game['rating_count']:,})"
             )
     else:
-        logger.info("  无")
+        line("  无")
 
     # 总结
-    logger.info("\n" + "=" * 80)
-    logger.info("📊 总结")
-    logger.info("=" * 80)
-    logger.info(f"  总比赛数: {len(games)}")
-    logger.info(f"  ✅ 可生成视频: {len(games_to_generate)} 场")
-    logger.info(f"  ⏸️  已结束但评分不足: {len(games_ended_low_rating)} 场")
-    logger.info(f"  ⏳ 尚未结束: {len(games_not_ended)} 场")
-    logger.info("=" * 80)
+    line("\n" + sep)
+    line("📊 总结")
+    line(sep)
+    line(f"  总比赛数: {len(games)}")
+    line(f"  ✅ 可生成视频: {len(games_to_generate)} 场")
+    line(f"  ⏸️  已结束但评分不足: {len(games_ended_low_rating)} 场")
+    line(f"  ⏳ 尚未结束: {len(games_not_ended)} 场")
+    line(sep)
 
     # 如果有可生成视频的比赛，输出下一步操作提示
     if games_to_generate:
-        logger.info("\n💡 下一步操作:")
-        logger.info("  可以运行调度器来为这些比赛生成视频")
-        logger.info("  命令: uv run python -m test.example_usage")
+        line("\n💡 下一步操作:")
+        line("  可以运行调度器来为这些比赛生成视频")
+        line("  命令: uv run python -m test.example_usage")
+
+    logger.info("\n".join(report))
 
 
 if __name__ == "__main__":
@@ -3,116 +3,261 @@
 用于诊断B站上传失败问题
 """
 
+import argparse
+import os
+import subprocess
 import sys
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from pathlib import Path
-import ffmpeg
+import orjson
 from loguru import logger
 
+# 需要检查的视频文件扩展名
+VIDEO_SUFFIXES = {"mp4", "webm"}
 
-def check_video_info(video_path: Path):
-    """检查视频文件的详细信息"""
-    logger.info(f"检查视频文件: {video_path}")
-    logger.info("=" * 60)
+# B站上传要求
+MAX_FILE_SIZE = 8 * 1024 * 1024 * 1024  # 8GB
+SUPPORTED_CODECS = {"h264", "h265", "hevc"}
 
-    if not video_path.exists():
-        logger.error(f"视频文件不存在: {video_path}")
-        return
 
-    # 文件基本信息
+@dataclass
+class Verdict:
+    """快速检查结果"""
+
+    ok: bool
+    reason: str
+    width: int = 0
+    height: int = 0
+    duration: float = 0.0
+    codec: str = ""
+
+
+def quick_check(video_path: Path) -> Verdict:
+    """
+    快速检查视频是否满足B站上传要求
+
+    只通过 ffprobe -show_entries 读取分辨率、编码和时长几个字段，
+    输出远小于完整 probe，适合批量初筛。
+
+    Args:
+        video_path: 视频文件路径
+
+    Returns:
+        Verdict: 检查结果
+    """
     file_size = video_path.stat().st_size
-    logger.info(f"文件大小: {file_size / (1024 * 1024):.2f} MB")
+    if file_size == 0:
+        return Verdict(ok=False, reason="文件为空")
+    if file_size > MAX_FILE_SIZE:
+        return Verdict(ok=False, reason=f"文件过大 ({file_size / 1048576.0:.2f}MB > 8GB)")
+
+    proc = subprocess.run(
+        [
+            "ffprobe",
+            "-v",
+            "quiet",
+            "-print_format",
+            "json",
+            "-select_streams",
+            "v:0",
+            "-show_entries",
+            "stream=width,height,codec_name:format=duration",
+            str(video_path),
+        ],
+        capture_output=True,
+        check=True,
+    )
+    probe = orjson.loads(proc.stdout)
+    streams = probe.get("streams") or [{}]
+    width = int(streams[0].get("width", 0))
+    height = int(streams[0].get("height", 0))
+    codec = streams[0].get("codec_name", "")
+    duration = float(probe.get("format", {}).get("duration", 0) or 0)
+
+    if width < 640 or height < 360:
+        reason = f"分辨率过小 ({width}x{height} < 640x360)"
+    elif not 1 <= duration <= 7200:
+        reason = f"时长不符合要求 ({duration:.1f}秒，应在1-7200秒之间)"
+    elif codec not in SUPPORTED_CODECS:
+        reason = f"编码格式可能不支持 ({codec})，推荐使用 h264 或 h265"
+    else:
+        reason = ""
+
+    return Verdict(
+        ok=not reason,
+        reason=reason,
+        width=width,
+        height=height,
+        duration=duration,
+        codec=codec,
+    )
+
+
+def probe_video(video_path: Path) -> dict:
+    """
+    获取视频文件的 ffprobe 信息（不输出日志，便于并发调用）
+
+    结果缓存在同目录的 ``<文件名>.probecache.json`` 中，文件大小和修改时间
+    未变化时直接复用，跳过 ffprobe 子进程。
+
+    Args:
+        video_path: 视频文件路径
+
+    Returns:
+        ffprobe 返回的信息字典
+    """
+    stat = video_path.stat()
+    key = [stat.st_size, stat.st_mtime_ns]
+    cache_path = video_path.with_name(video_path.name + ".probecache.json")
+
+    if cache_path.exists():
+        try:
+            cached = orjson.loads(cache_path.read_bytes())
+            if cached.get("key") == key:
+                return cached["probe"]
+        except (orjson.JSONDecodeError, KeyError, OSError):
+            pass
+
+    # 直接调用 ffprobe，用 orjson 解析字节输出，省去 str 解码与 stdlib json 的开销
+    proc = subprocess.run(
+        [
+            "ffprobe",
+            "-v",
+            "quiet",
+            "-print_format",
+            "json",
+            "-show_format",
+            "-show_streams",
+            str(video_path),
+        ],
+        capture_output=True,
+        check=True,
+    )
+    probe = orjson.loads(proc.stdout)
 
     try:
-        # 使用 ffprobe 获取视频信息
-        probe = ffmpeg.probe(str(video_path))
-
-        # 格式信息
-        format_info = probe.get("format", {})
-        logger.info("\n格式信息:")
-        logger.info(f"  格式名称: {format_info.get('format_name', 'N/A')}")
-        logger.info(f"  格式长名称: {format_info.get('format_long_name', 'N/A')}")
-        logger.info(f"  时长: {float(format_info.get('duration', 0)):.2f} 秒")
-        logger.info(f"  比特率: {int(format_info.get('bit_rate', 0)) / 1000:.0f} kbps")
-
-        # 视频流信息
-        video_streams = [s for s in probe["streams"] if s["codec_type"] == "video"]
-        if video_streams:
-            video = video_streams[0]
-            logger.info("\n视频流信息:")
-            logger.info(f"  编码格式: {video.get('codec_name', 'N/A')}")
-            logger.info(f"  编码长名称: {video.get('codec_long_name', 'N/A')}")
-            logger.info(f"  分辨率: {video.get('width', 0)}x{video.get('height', 0)}")
-            logger.info(f"  帧率: {video.get('r_frame_rate', 'N/A')}")
-            logger.info(f"  像素格式: {video.get('pix_fmt', 'N/A')}")
-            logger.info(
-                f"  比特率: {int(video.get('bit_rate', 0)) / 1000:.0f} kbps"
-                if "bit_rate" in video
-                else "  比特率: N/A"
-            )
-
-            # B站视频要求检查
-            logger.info("\nB站视频要求检查:")
-            width = video.get("width", 0)
-            height = video.get("height", 0)
-            duration = float(format_info.get("duration", 0))
-
-            # 检查分辨率
-            if width >= 640 and height >= 360:
-                logger.info(f"  ✓ 分辨率符合要求 ({width}x{height} >= 640x360)")
-            else:
-                logger.warning(f"  ✗ 分辨率过小 ({width}x{height} < 640x360)")
+        cache_path.write_bytes(orjson.dumps({"key": key, "probe": probe}))
+    except OSError:
+        pass
 
-            # 检查时长
-            if 1 <= duration <= 7200:  # 1秒到2小时
-                logger.info(f"  ✓ 时长符合要求 ({duration:.1f}秒)")
-            else:
-                logger.warning(f"  ✗ 时长不符合要求 ({duration:.1f}秒，应在1-7200秒之间)")
+    return probe
 
-            # 检查文件大小
-            max_size = 8 * 1024 * 1024 * 1024  # 8GB
-            if file_size <= max_size:
-                logger.info(f"  ✓ 文件大小符合要求 ({file_size / (1024 * 1024):.2f}MB <= 8GB)")
-            else:
-                logger.warning(f"  ✗ 文件过大 ({file_size / (1024 * 1024):.2f}MB > 8GB)")
 
-            # 检查编码格式
-            codec = video.get("codec_name", "")
-            if codec in ["h264", "h265", "hevc"]:
-                logger.info(f"  ✓ 编码格式符合要求 ({codec})")
-            else:
-                logger.warning(f"  ⚠ 编码格式可能不支持 ({codec})，推荐使用 h264 或 h265")
-
-        # 音频流信息
-        audio_streams = [s for s in probe["streams"] if s["codec_type"] == "audio"]
-        if audio_streams:
-            audio = audio_streams[0]
-            logger.info("\n音频流信息:")
-            logger.info(f"  编码格式: {audio.get('codec_name', 'N/A')}")
-            logger.info(f"  采样率: {audio.get('sample_rate', 'N/A')} Hz")
-            logger.info(f"  声道数: {audio.get('channels', 'N/A')}")
-            logger.info(
-                f"  比特率: {int(audio.get('bit_rate', 0)) / 1000:.0f} kbps"
-                if "bit_rate" in audio
-                else "  比特率: N/A"
-            )
+def render_report(video_path: Path, probe: dict):
+    """
+    根据 ffprobe 信息输出视频检查报告
+
+    Args:
+        video_path: 视频文件路径
+        probe: probe_video 返回的信息字典
+    """
+    logger.info(f"检查视频文件: {video_path}")
+    logger.info("=" * 60)
+
+    # 文件基本信息（各项数值只计算一次，后续输出和检查复用）
+    file_size = video_path.stat().st_size
+    file_size_mb = file_size / 1048576.0
+    logger.info(f"文件大小: {file_size_mb:.2f} MB")
+
+    # 格式信息
+    format_info = probe.get("format", {})
+    duration = float(format_info.get("duration", 0) or 0)
+    logger.info("\n格式信息:")
+    logger.info(f"  格式名称: {format_info.get('format_name', 'N/A')}")
+    logger.info(f"  格式长名称: {format_info.get('format_long_name', 'N/A')}")
+    logger.info(f"  时长: {duration:.2f} 秒")
+    logger.info(f"  比特率: {int(format_info.get('bit_rate', 0)) / 1000:.0f} kbps")
+
+    # 视频流信息
+    video_streams = [s for s in probe["streams"] if s["codec_type"] == "video"]
+    if video_streams:
+        video = video_streams[0]
+        width = int(video.get("width", 0))
+        height = int(video.get("height", 0))
+        codec = video.get("codec_name", "")
+        logger.info("\n视频流信息:")
+        logger.info(f"  编码格式: {codec or 'N/A'}")
+        logger.info(f"  编码长名称: {video.get('codec_long_name', 'N/A')}")
+        logger.info(f"  分辨率: {width}x{height}")
+        logger.info(f"  帧率: {video.get('r_frame_rate', 'N/A')}")
+        logger.info(f"  像素格式: {video.get('pix_fmt', 'N/A')}")
+        logger.info(
+            f"  比特率: {int(video.get('bit_rate', 0)) / 1000:.0f} kbps"
+            if "bit_rate" in video
+            else "  比特率: N/A"
+        )
+
+        # B站视频要求检查
+        logger.info("\nB站视频要求检查:")
+
+        # 检查分辨率
+        if width >= 640 and height >= 360:
+            logger.info(f"  ✓ 分辨率符合要求 ({width}x{height} >= 640x360)")
         else:
-            logger.warning("\n⚠ 未找到音频流")
+            logger.warning(f"  ✗ 分辨率过小 ({width}x{height} < 640x360)")
 
-        logger.info("\n" + "=" * 60)
+        # 检查时长
+        if 1 <= duration <= 7200:  # 1秒到2小时
+            logger.info(f"  ✓ 时长符合要求 ({duration:.1f}秒)")
+        else:
+            logger.warning(f"  ✗ 时长不符合要求 ({duration:.1f}秒，应在1-7200秒之间)")
+
+        # 检查文件大小
+        if file_size <= MAX_FILE_SIZE:
+            logger.info(f"  ✓ 文件大小符合要求 ({file_size_mb:.2f}MB <= 8GB)")
+        else:
+            logger.warning(f"  ✗ 文件过大 ({file_size_mb:.2f}MB > 8GB)")
+
+        # 检查编码格式
+        if codec in SUPPORTED_CODECS:
+            logger.info(f"  ✓ 编码格式符合要求 ({codec})")
+        else:
+            logger.warning(f"  ⚠ 编码格式可能不支持 ({codec})，推荐使用 h264 或 h265")
+
+    # 音频流信息
+    audio_streams = [s for s in probe["streams"] if s["codec_type"] == "audio"]
+    if audio_streams:
+        audio = audio_streams[0]
+        logger.info("\n音频流信息:")
+        logger.info(f"  编码格式: {audio.get('codec_name', 'N/A')}")
+        logger.info(f"  采样率: {audio.get('sample_rate', 'N/A')} Hz")
+        logger.info(f"  声道数: {audio.get('channels', 'N/A')}")
+        logger.info(
+            f"  比特率: {int(audio.get('bit_rate', 0)) / 1000:.0f} kbps"
+            if "bit_rate" in audio
+            else "  比特率: N/A"
+        )
+    else:
+        logger.warning("\n⚠ 未找到音频流")
+
+    logger.info("\n" + "=" * 60)
+
+
+def check_video_info(video_path: Path):
+    """检查视频文件的详细信息"""
+    if not video_path.exists():
+        logger.error(f"视频文件不存在: {video_path}")
+        return
 
-    except ffmpeg.Error as e:
-        logger.error(f"FFmpeg 错误: {e}")
+    try:
+        render_report(video_path, probe_video(video_path))
+    except subprocess.CalledProcessError as e:
+        logger.error(f"FFprobe 错误: {e}")
         if e.stderr:
             logger.error(f"详细信息: {e.stderr.decode()}")
     except Exception as e:
         logger.error(f"检查视频信息失败: {e}", exc_info=True)
 
 
+def _mask(value: str) -> str:
+    """凭证脱敏：只保留前20位和（较长时的）后10位"""
+    return f"{value[:20]}...{value[-10:] if len(value) > 30 else ''}"
+
+
 def check_credentials():
     """检查B站凭证配置"""
-    import os
-
     logger.info("\n检查B站登录凭证:")
     logger.info("=" * 60)
 
@@ -121,17 +266,17 @@ def check_credentials():
     buvid3 = os.getenv("BILIBILI_BUVID3")
 
     if sessdata:
-        logger.info(f"✓ SESSDATA: {sessdata[:20]}...{sessdata[-10:] if len(sessdata) > 30 else ''}")
+        logger.info(f"✓ SESSDATA: {_mask(sessdata)}")
     else:
         logger.warning("✗ SESSDATA: 未设置")
 
     if bili_jct:
-        logger.info(f"✓ bili_jct: {bili_jct[:20]}...{bili_jct[-10:] if len(bili_jct) > 30 else ''}")
+        logger.info(f"✓ bili_jct: {_mask(bili_jct)}")
     else:
         logger.warning("✗ bili_jct: 未设置")
 
     if buvid3:
-        logger.info(f"✓ buvid3: {buvid3[:20]}...{buvid3[-10:] if len(buvid3) > 30 else ''}")
+        logger.info(f"✓ buvid3: {_mask(buvid3)}")
     else:
         logger.warning("⚠ buvid3: 未设置（可选，但推荐设置）")
 
@@ -151,6 +296,10 @@ def check_credentials():
 
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description="检查视频文件信息")
+    parser.add_argument("--verbose", action="store_true", help="为所有视频输出完整报告")
+    verbose = parser.parse_args().verbose
+
     logger.remove()
     logger.add(sys.stdout, level="INFO")
 
@@ -165,7 +314,14 @@ def main():
         return
 
     # 查找所有视频文件
-    video_files = list(videos_dir.glob("*.mp4")) + list(videos_dir.glob("*.webm"))
+    # 单次 scandir 遍历目录，DirEntry 自带类型信息，无需额外 stat
+    with os.scandir(videos_dir) as entries:
+        video_files = [
+            Path(entry.path)
+            for entry in entries
+            if entry.is_file(follow_symlinks=False)
+            and entry.name.rpartition(".")[2].lower() in VIDEO_SUFFIXES
+        ]
 
     if not video_files:
         logger.error(f"\n在 {videos_dir} 中未找到视频文件")
@@ -173,8 +329,31 @@ def main():
 
     logger.info(f"\n找到 {len(video_files)} 个视频文件")
 
-    # 检查每个视频
-    for video_file in video_files:
+    # 并发执行快速检查，只对未通过（或指定 --verbose）的文件输出完整报告
+    report_files = []
+    with ThreadPoolExecutor(max_workers=min(8, len(video_files))) as executor:
+        futures = {executor.submit(quick_check, p): p for p in video_files}
+        for future in as_completed(futures):
+            video_file = futures[future]
+            try:
+                verdict = future.result()
+            except Exception as e:
+                logger.error(f"✗ {video_file.name}: 快速检查失败 ({e})")
+                report_files.append(video_file)
+                continue
+
+            if verdict.ok:
+                logger.info(
+                    f"✓ {video_file.name}: {verdict.width}x{verdict.height}, "
+                    f"{verdict.duration:.1f}秒, {verdict.codec}"
+                )
+            else:
+                logger.warning(f"✗ {video_file.name}: {verdict.reason}")
+
+            if verbose or not verdict.ok:
+                report_files.append(video_file)
+
+    for video_file in report_files:
         logger.info("\n")
         check_video_info(video_file)
 
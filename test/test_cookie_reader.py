@@ -8,7 +8,6 @@ import os
 import sys
 from pathlib import Path
 from loguru import logger
-from bilibili_api import Credential
 
 # 添加项目根目录到路径
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -123,6 +122,9 @@ def test_credential_validity(sessdata: str, bili_jct: str):
 
     try:
         logger.info("创建凭证对象...")
+        # bilibili_api 导入较重，只有验证凭证时才需要
+        from bilibili_api import Credential
+
         credential = Credential(sessdata=sessdata, bili_jct=bili_jct)
         logger.info("✓ 凭证对象创建成功")
 
@@ -72,22 +72,18 @@ def test_credentials():
         if is_valid:
             logger.info("  ✓ 凭证有效！")
 
-            # 获取用户信息
+            # 获取用户信息（纯本地解析，无需再启动一个事件循环）
             try:
+                # 获取用户ID（从cookie中解析）
+                import http.cookies
 
-                async def get_user_info():
-                    # 获取用户ID（从cookie中解析）
-                    import http.cookies
+                cookie = http.cookies.SimpleCookie()
+                cookie.load(f"SESSDATA={sessdata}")
 
-                    cookie = http.cookies.SimpleCookie()
-                    cookie.load(f"SESSDATA={sessdata}")
-
-                    # 从SESSDATA中解析用户信息
-                    # 注意：这里只是示例，实际获取用户信息需要调用API
-                    logger.info("\n4. 用户信息:")
-                    logger.info("  凭证验证通过，可以使用")
-
-                asyncio.run(get_user_info())
+                # 从SESSDATA中解析用户信息
+                # 注意：这里只是示例，实际获取用户信息需要调用API
+                logger.info("\n4. 用户信息:")
+                logger.info("  凭证验证通过，可以使用")
             except Exception as e:
                 logger.warning(f"  获取用户信息失败: {e}")
 
@@ -2,17 +2,25 @@
 测试评分数量筛选功能
 """
 
+from functools import lru_cache
+
 from loguru import logger
 from src.schedule.game_fetcher import GameFetcher
 
 
+@lru_cache(maxsize=1)
+def _fetcher() -> GameFetcher:
+    """各测试共用一个 GameFetcher，复用其 HTTP 连接池和页面缓存"""
+    return GameFetcher()
+
+
 def test_parse_rating_count():
     """测试评分数量解析功能"""
     logger.info("\n" + "=" * 60)
     logger.info("测试评分数量解析功能")
     logger.info("=" * 60)
 
-    fetcher = GameFetcher()
+    fetcher = _fetcher()
 
     # 测试用例
     test_cases = [
@@ -40,7 +48,7 @@ def test_get_game_status_with_rating():
     logger.info("测试获取比赛状态和评分数量")
     logger.info("=" * 60)
 
-    fetcher = GameFetcher()
+    fetcher = _fetcher()
 
     # 先获取今天的比赛列表
     games = fetcher.get_today_nba_games()
@@ -106,33 +114,33 @@ def test_rating_filter_integration():
         logger.warning("2. 所有比赛都不满足评分条件（已结束但评分<3万）")
         return
 
-    # 统计各状态的任务数量
-    from collections import Counter
     from src.schedule.models import TaskStatus
 
-    status_counts = Counter(task.status for task in tasks)
-
-    logger.info("\n任务状态统计:")
-    for status in TaskStatus:
-        count = status_counts.get(status, 0)
-        if count > 0:
-            logger.info(f"  {status.value}: {count}")
-
-    # 显示每个任务的详细信息
-    logger.info("\n任务详情:")
+    # 一次遍历同时统计各状态的任务数量并拼出每个任务的详情
+    status_counts = dict.fromkeys(TaskStatus, 0)
+    details = ["\n任务详情:"]
     for i, task in enumerate(tasks, 1):
+        status_counts[task.status] += 1
         game = task.game_info
-        logger.info(f"\n任务 {i}:")
-        logger.info(f"  比赛: {game.away_team_name} vs {game.home_team_name}")
-        logger.info(f"  状态: {task.status.value}")
-        logger.info(f"  比赛状态: {game.match_status}")
-        logger.info(f"  评分数量: {game.rating_count}")
+        details.append(f"\n任务 {i}:")
+        details.append(f"  比赛: {game.away_team_name} vs {game.home_team_name}")
+        details.append(f"  状态: {task.status.value}")
+        details.append(f"  比赛状态: {game.match_status}")
+        details.append(f"  评分数量: {game.rating_count}")
 
         if task.status == TaskStatus.PENDING:
-            logger.info("  ✓ 可以立即执行")
+            details.append("  ✓ 可以立即执行")
         elif task.status == TaskStatus.WAITING_GAME_END:
             next_check = task.config.get("next_check_time", "未设置")
-            logger.info(f"  ⏳ 等待中，下次检查: {next_check}")
+            details.append(f"  ⏳ 等待中，下次检查: {next_check}")
+
+    logger.info("\n任务状态统计:")
+    for status, count in status_counts.items():
+        if count > 0:
+            logger.info(f"  {status.value}: {count}")
+
+    # 显示每个任务的详细信息
+    logger.info("\n".join(details))
 
 
 def main():
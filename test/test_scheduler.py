@@ -8,18 +8,20 @@
 """
 
 from datetime import datetime, timedelta
+from typing import Optional
+
 from loguru import logger
 
 from src.schedule import TaskScheduler, CronScheduler, TaskStatus
 
 
-def test_daily_check():
-    """测试每日检查功能"""
+def test_daily_check(scheduler: Optional[TaskScheduler] = None):
+    """测试每日检查功能（可传入共享的调度器实例）"""
     logger.info("=" * 80)
     logger.info("测试1: 每日检查功能")
     logger.info("=" * 80)
 
-    scheduler = TaskScheduler()
+    scheduler = scheduler or TaskScheduler()
     tasks = scheduler.start_daily_tasks()
 
     logger.info(f"获取到 {len(tasks)} 场比赛")
@@ -45,13 +47,13 @@ def test_daily_check():
     logger.info(f"统计: 待执行 {pending_count} 个, 等待比赛结束 {waiting_count} 个")
 
 
-def test_waiting_check():
-    """测试等待任务检查功能"""
+def test_waiting_check(scheduler: Optional[TaskScheduler] = None):
+    """测试等待任务检查功能（可传入共享的调度器实例）"""
     logger.info("=" * 80)
     logger.info("测试2: 等待任务检查功能")
     logger.info("=" * 80)
 
-    scheduler = TaskScheduler()
+    scheduler = scheduler or TaskScheduler()
 
     # 获取所有等待中的任务
     waiting_tasks = scheduler.task_store.get_tasks_by_status(TaskStatus.WAITING_GAME_END)
@@ -72,13 +74,13 @@ def test_waiting_check():
         logger.info(f"比赛是否结束: {is_finished}")
 
 
-def test_task_persistence():
-    """测试任务持久化"""
+def test_task_persistence(scheduler: Optional[TaskScheduler] = None):
+    """测试任务持久化（可传入共享的调度器实例）"""
     logger.info("=" * 80)
     logger.info("测试3: 任务持久化")
     logger.info("=" * 80)
 
-    scheduler = TaskScheduler()
+    scheduler = scheduler or TaskScheduler()
 
     # 获取所有任务
     all_tasks = scheduler.get_all_tasks()
@@ -109,14 +111,15 @@ def test_game_status_check():
     games = fetcher.get_today_nba_games()
     logger.info(f"获取到 {len(games)} 场比赛")
 
-    # 测试获取每场比赛的状态
-    for game in games[:3]:  # 只测试前3场
-        match_id = game.get("matchId") or game.get("match_id", "")
-        if not match_id:
-            continue
-
+    # 测试获取每场比赛的状态（只测试前3场，一次请求批量获取）
+    match_ids = [
+        match_id
+        for game in games[:3]
+        if (match_id := game.get("matchId") or game.get("match_id", ""))
+    ]
+    statuses = fetcher.get_game_statuses(match_ids)
+    for match_id, status in statuses.items():
         logger.info(f"检查比赛 {match_id}")
-        status = fetcher.get_game_status(match_id)
         logger.info(f"状态: {status}")
         logger.info("-" * 40)
 
@@ -128,16 +131,19 @@ def main():
     logger.info("")
 
     try:
+        # 调度器初始化需读取 Chrome cookies、加载任务存储等，测试1~3 共用同一实例
+        scheduler = TaskScheduler()
+
         # 测试1: 每日检查
-        test_daily_check()
+        test_daily_check(scheduler)
         logger.info("")
 
         # 测试2: 等待任务检查
-        test_waiting_check()
+        test_waiting_check(scheduler)
         logger.info("")
 
         # 测试3: 任务持久化
-        test_task_persistence()
+        test_task_persistence(scheduler)
         logger.info("")
 
         # 测试4: 比赛状态获取